@@ -13,6 +13,9 @@ class JobEnvelope(BaseModel):
     job_type: str
     correlation_id: str
     payload: dict[str, Any]
+    # Set when the payload was too large to publish and is held in the orchestrator database;
+    # `payload` is then empty. See `app.job_payload_repository`.
+    payload_ref: str | None = None
     attempt: int = Field(default=0, ge=0)
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
@@ -24,10 +27,23 @@ class KnowledgeUpdateMessage(BaseModel):
     created_at: str | None = None
 
 
+class KnowledgeUpdateQuarantine(BaseModel):
+    """Extracted entities an earlier knowledge.update job set aside after they failed on their own.
+
+    A follow-up job carrying this skips entity extraction and processes only these entities
+    (shaped like step-two `extracted_entities`/`extracted_universes` items).
+    """
+
+    source_job_id: str
+    extracted_entities: list[dict[str, Any]]
+    extracted_universes: list[dict[str, Any]] = Field(default_factory=list)
+
+
 class KnowledgeUpdatePayload(BaseModel):
     journal_reference: str
     messages: list[KnowledgeUpdateMessage]
     requested_by_user_id: str
+    quarantine: KnowledgeUpdateQuarantine | None = None
 
 
 class JobResultEvent(BaseModel):
@@ -48,6 +64,7 @@ class JobStatusEvent(BaseModel):
     attempt: int
     detail: str | None = None
     terminal: bool
+    next_attempt_at: datetime | None = None
     emitted_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
 
@@ -59,6 +76,35 @@ class DeadLetterEvent(BaseModel):
     emitted_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
 
+class JobStepMetrics(BaseModel):
+    step: str
+    started_at: datetime
+    finished_at: datetime
+    duration_ms: float
+    resumed: bool = False
+
+
+class JobOperationMetrics(BaseModel):
+    step: str
+    operation: str
+    kind: str
+    calls: int = 0
+    attempts: int = 0
+    total_ms: float = 0.0
+    max_ms: float = 0.0
+    input_tokens: int = 0
+    output_tokens: int = 0
+
+
+class JobMetrics(BaseModel):
+    wall_time_ms: float
+    critical_path: list[str] = Field(default_factory=list)
+    steps: list[JobStepMetrics] = Field(default_factory=list)
+    operations: list[JobOperationMetrics] = Field(default_factory=list)
+    total_input_tokens: int = 0
+    total_output_tokens: int = 0
+
+
 class WorkerJobRunnerProtocol(Protocol):
     async def run_job(self, job: JobEnvelope) -> None:
         """Execute a single job in a worker runtime."""
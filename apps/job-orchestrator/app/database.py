@@ -38,3 +38,9 @@ class Database:
             raise RuntimeError("database pool is not connected")
         async with self._pool.acquire() as conn:
             return await conn.fetchrow(query, *args)
+
+    async def fetch(self, query: str, *args: object):
+        if self._pool is None:
+            raise RuntimeError("database pool is not connected")
+        async with self._pool.acquire() as conn:
+            return await conn.fetch(query, *args)
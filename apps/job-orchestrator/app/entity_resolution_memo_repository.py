@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+from app.database import Database
+
+
+class EntityResolutionMemoRepository:
+    def __init__(self, database: Database) -> None:
+        self._db = database
+
+    async def load(
+        self,
+        user_id: str,
+        keys: list[tuple[str, str]],
+        ttl_seconds: float,
+    ) -> dict[tuple[str, str], tuple[str, float]]:
+        if not keys:
+            return {}
+        rows = await self._db.fetch(
+            """
+            SELECT memo.node_type, memo.normalized_name, memo.entity_id, memo.confidence
+            FROM orchestrator_entity_resolution_memo AS memo
+            JOIN unnest($2::text[], $3::text[]) AS wanted(node_type, normalized_name)
+              ON memo.node_type = wanted.node_type AND memo.normalized_name = wanted.normalized_name
+            WHERE memo.user_id = $1
+              AND memo.updated_at > NOW() - make_interval(secs => $4)
+            """,
+            user_id,
+            [node_type for node_type, _ in keys],
+            [normalized_name for _, normalized_name in keys],
+            float(ttl_seconds),
+        )
+        return {(row["node_type"], row["normalized_name"]): (row["entity_id"], float(row["confidence"])) for row in rows}
+
+    async def save(self, user_id: str, entries: dict[tuple[str, str], tuple[str, float]]) -> None:
+        if not entries:
+            return
+        keys = list(entries)
+        await self._db.execute(
+            """
+            INSERT INTO orchestrator_entity_resolution_memo
+                (user_id, node_type, normalized_name, entity_id, confidence)
+            SELECT $1, node_type, normalized_name, entity_id, confidence
+            FROM unnest($2::text[], $3::text[], $4::text[], $5::float8[])
+                AS entry(node_type, normalized_name, entity_id, confidence)
+            ON CONFLICT (user_id, node_type, normalized_name)
+            DO UPDATE SET entity_id = EXCLUDED.entity_id, confidence = EXCLUDED.confidence, updated_at = NOW()
+            """,
+            user_id,
+            [node_type for node_type, _ in keys],
+            [normalized_name for _, normalized_name in keys],
+            [entries[key][0] for key in keys],
+            [entries[key][1] for key in keys],
+        )
+
+    async def forget_entities(self, user_id: str, entity_ids: list[str]) -> None:
+        if not entity_ids:
+            return
+        await self._db.execute(
+            """
+            DELETE FROM orchestrator_entity_resolution_memo
+            WHERE user_id = $1 AND entity_id = ANY($2::text[])
+            """,
+            user_id,
+            entity_ids,
+        )
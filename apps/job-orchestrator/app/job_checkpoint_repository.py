@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+import json
+
+from app.database import Database
+
+
+class JobCheckpointRepository:
+    def __init__(self, database: Database) -> None:
+        self._db = database
+
+    async def load(self, job_id: str, step_name: str, input_hash: str) -> object | None:
+        row = await self._db.fetchrow(
+            """
+            SELECT output
+            FROM orchestrator_job_step_checkpoints
+            WHERE job_id = $1 AND step_name = $2 AND input_hash = $3
+            """,
+            job_id,
+            step_name,
+            input_hash,
+        )
+        if row is None:
+            return None
+        output = row["output"]
+        return json.loads(output) if isinstance(output, str) else output
+
+    async def save(self, job_id: str, step_name: str, input_hash: str, output: object) -> None:
+        await self._db.execute(
+            """
+            INSERT INTO orchestrator_job_step_checkpoints (job_id, step_name, input_hash, output)
+            VALUES ($1, $2, $3, $4::jsonb)
+            ON CONFLICT (job_id, step_name)
+            DO UPDATE SET input_hash = EXCLUDED.input_hash, output = EXCLUDED.output, created_at = NOW()
+            """,
+            job_id,
+            step_name,
+            input_hash,
+            json.dumps(output),
+        )
+
+    async def clear(self, job_id: str) -> None:
+        await self._db.execute(
+            """
+            DELETE FROM orchestrator_job_step_checkpoints
+            WHERE job_id = $1
+            """,
+            job_id,
+        )
@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import logging
+from typing import Any, Awaitable, Callable
+
+from nats.aio.msg import Msg
+
+logger = logging.getLogger(__name__)
+
+
+class PullJobConsumer:
+    """Fetch job messages from a durable pull consumer, never more than there are free worker slots.
+
+    Messages are only pulled once a slot is free, so no job waits in a client-side buffer with
+    its ack timer running. While a job runs, `in_progress()` heartbeats keep resetting its ack
+    wait, so long jobs are not redelivered mid-run. Several worker replicas can bind the same
+    durable; JetStream hands each message to exactly one of their fetch requests.
+    """
+
+    def __init__(
+        self,
+        subscription: Any,
+        handle: Callable[[Msg], Awaitable[None]],
+        *,
+        max_in_flight: int,
+        heartbeat_seconds: float,
+        fetch_timeout_seconds: float = 5.0,
+    ) -> None:
+        self._subscription = subscription
+        self._handle = handle
+        self._max_in_flight = max_in_flight
+        self._heartbeat_seconds = heartbeat_seconds
+        self._fetch_timeout_seconds = fetch_timeout_seconds
+        self._in_flight: set[asyncio.Task[None]] = set()
+
+    async def run(self) -> None:
+        try:
+            while True:
+                free_slots = self._max_in_flight - len(self._in_flight)
+                if free_slots <= 0:
+                    await asyncio.wait(self._in_flight, return_when=asyncio.FIRST_COMPLETED)
+                    continue
+                try:
+                    messages = await self._subscription.fetch(batch=free_slots, timeout=self._fetch_timeout_seconds)
+                except TimeoutError:
+                    # nats.errors.TimeoutError: no job arrived before the fetch request expired.
+                    continue
+                logger.debug("fetched job messages", extra={"count": len(messages), "free_slots": free_slots})
+                for msg in messages:
+                    task = asyncio.create_task(self._process(msg))
+                    self._in_flight.add(task)
+                    task.add_done_callback(self._in_flight.discard)
+        finally:
+            # Unacknowledged messages of cancelled jobs are redelivered once their ack wait expires.
+            for task in self._in_flight:
+                task.cancel()
+            await asyncio.gather(*self._in_flight, return_exceptions=True)
+
+    async def _process(self, msg: Msg) -> None:
+        heartbeat = asyncio.create_task(self._heartbeat(msg))
+        try:
+            await self._handle(msg)
+        except Exception:  # noqa: BLE001
+            logger.exception("job message handling failed", extra={"subject": msg.subject})
+        finally:
+            heartbeat.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await heartbeat
+
+    async def _heartbeat(self, msg: Msg) -> None:
+        while True:
+            await asyncio.sleep(self._heartbeat_seconds)
+            try:
+                await msg.in_progress()
+            except Exception:  # noqa: BLE001
+                logger.warning("job message in-progress heartbeat failed", extra={"subject": msg.subject}, exc_info=True)
@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import zlib
+from typing import Any
+
+from app.contracts import JobEnvelope
+from app.database import Database
+
+
+class JobPayloadRepository:
+    """Claim-check store for job payloads too large to publish on JetStream.
+
+    Payloads are kept once per job as zlib-compressed JSON next to the SHA-256 digest of the
+    uncompressed JSON, which is what the published envelope carries as `payload_ref`.
+    """
+
+    def __init__(self, database: Database) -> None:
+        self._db = database
+
+    async def store(self, job_id: str, encoded_payload: bytes) -> str:
+        payload_ref = hashlib.sha256(encoded_payload).hexdigest()
+        await self._db.execute(
+            """
+            INSERT INTO orchestrator_job_payloads (job_id, payload_sha256, payload)
+            VALUES ($1, $2, $3)
+            ON CONFLICT (job_id)
+            DO UPDATE SET payload_sha256 = EXCLUDED.payload_sha256, payload = EXCLUDED.payload, created_at = NOW()
+            """,
+            job_id,
+            payload_ref,
+            zlib.compress(encoded_payload),
+        )
+        return payload_ref
+
+    async def load(self, job_id: str, payload_ref: str) -> dict[str, Any] | None:
+        row = await self._db.fetchrow(
+            """
+            SELECT payload
+            FROM orchestrator_job_payloads
+            WHERE job_id = $1 AND payload_sha256 = $2
+            """,
+            job_id,
+            payload_ref,
+        )
+        if row is None:
+            return None
+        return json.loads(zlib.decompress(row["payload"]))
+
+    async def delete(self, job_id: str) -> None:
+        await self._db.execute(
+            """
+            DELETE FROM orchestrator_job_payloads
+            WHERE job_id = $1
+            """,
+            job_id,
+        )
+
+
+async def check_in_payload(job: JobEnvelope, repository: JobPayloadRepository, threshold_bytes: int) -> JobEnvelope:
+    """Move a payload larger than `threshold_bytes` into the store and return the envelope to publish."""
+
+    if threshold_bytes <= 0 or job.payload_ref is not None:
+        return job
+    encoded_payload = json.dumps(job.payload, separators=(",", ":")).encode("utf-8")
+    if len(encoded_payload) <= threshold_bytes:
+        return job
+    payload_ref = await repository.store(job.job_id, encoded_payload)
+    return job.model_copy(update={"payload": {}, "payload_ref": payload_ref})
+
+
+async def check_out_payload(job: JobEnvelope, repository: JobPayloadRepository) -> JobEnvelope:
+    """Return the envelope with its claim-checked payload restored; a no-op for inline payloads."""
+
+    if job.payload_ref is None:
+        return job
+    payload = await repository.load(job.job_id, job.payload_ref)
+    if payload is None:
+        raise RuntimeError(f"claim-checked payload {job.payload_ref} for job {job.job_id} is missing")
+    return job.model_copy(update={"payload": payload, "payload_ref": None})
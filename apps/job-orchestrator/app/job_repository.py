@@ -1,8 +1,10 @@
 from __future__ import annotations
 
 import json
+from datetime import datetime
+from typing import Any
 
-from app.contracts import JobEnvelope
+from app.contracts import JobEnvelope, JobMetrics
 from app.database import Database
 
 
@@ -30,7 +32,7 @@ class JobRepository:
         await self._db.execute(
             """
             UPDATE orchestrator_jobs
-            SET status = 'processing', attempt = $2, updated_at = NOW()
+            SET status = 'processing', attempt = $2, next_attempt_at = NULL, updated_at = NOW()
             WHERE job_id = $1
             """,
             job_id,
@@ -51,7 +53,12 @@ class JobRepository:
             job_id,
         )
 
-    async def mark_retrying_failure(self, job_id: str, error_message: str) -> None:
+    async def mark_retrying_failure(
+        self,
+        job_id: str,
+        error_message: str,
+        next_attempt_at: datetime | None = None,
+    ) -> None:
         await self._db.execute(
             """
             UPDATE orchestrator_jobs
@@ -59,11 +66,13 @@ class JobRepository:
                 last_error = $2,
                 is_terminal = FALSE,
                 terminal_reason = NULL,
+                next_attempt_at = $3,
                 updated_at = NOW()
             WHERE job_id = $1
             """,
             job_id,
             error_message,
+            next_attempt_at,
         )
 
     async def mark_terminal_failure(self, job_id: str, error_message: str, terminal_reason: str) -> None:
@@ -82,10 +91,46 @@ class JobRepository:
             terminal_reason,
         )
 
+    async def record_metrics(self, job_id: str, metrics: JobMetrics) -> None:
+        await self._db.execute(
+            """
+            UPDATE orchestrator_jobs
+            SET metrics = $2::jsonb
+            WHERE job_id = $1
+            """,
+            job_id,
+            metrics.model_dump_json(),
+        )
+
+    async def record_follow_up_payload(self, job_id: str, payload: dict[str, Any] | None) -> None:
+        await self._db.execute(
+            """
+            UPDATE orchestrator_jobs
+            SET follow_up_payload = $2::jsonb
+            WHERE job_id = $1
+            """,
+            job_id,
+            json.dumps(payload) if payload is not None else None,
+        )
+
+    async def fetch_follow_up_payload(self, job_id: str) -> dict[str, Any] | None:
+        row = await self._db.fetchrow(
+            """
+            SELECT follow_up_payload
+            FROM orchestrator_jobs
+            WHERE job_id = $1
+            """,
+            job_id,
+        )
+        if row is None or row["follow_up_payload"] is None:
+            return None
+        payload = row["follow_up_payload"]
+        return json.loads(payload) if isinstance(payload, str) else payload
+
     async def get_status(self, job_id: str):
         return await self._db.fetchrow(
             """
-            SELECT job_id, status, attempt, last_error, is_terminal, terminal_reason, updated_at
+            SELECT job_id, status, attempt, last_error, is_terminal, terminal_reason, updated_at, next_attempt_at, metrics
             FROM orchestrator_jobs
             WHERE job_id = $1
             """,
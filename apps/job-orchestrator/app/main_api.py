@@ -7,7 +7,9 @@ import signal
 import grpc
 from app.database import Database
 from nats.aio.subscription import Subscription
+from app.contracts import JobEnvelope
 from app.jetstream import connect_jetstream, ensure_jobs_stream
+from app.job_payload_repository import JobPayloadRepository, check_in_payload
 from app.job_repository import JobRepository
 from app.logging import configure_logging
 from app.settings import get_settings
@@ -30,6 +32,7 @@ async def main() -> None:
     nc, js = await connect_jetstream(settings.exobrain_nats_url)
     await ensure_jobs_stream(js)
     repository = JobRepository(db)
+    payload_repository = JobPayloadRepository(db)
 
     async def fetch_status(job_id: str):
         return await repository.get_status(job_id)
@@ -50,8 +53,16 @@ async def main() -> None:
 
         return _Wrapper()
 
+    async def check_in(job: JobEnvelope) -> JobEnvelope:
+        return await check_in_payload(job, payload_repository, settings.job_payload_claim_check_bytes)
+
     server = grpc.aio.server()
-    servicer = JobOrchestratorServicer(js.publish, fetch_job_status=fetch_status, subscribe_job_status=subscribe_status)
+    servicer = JobOrchestratorServicer(
+        js.publish,
+        fetch_job_status=fetch_status,
+        subscribe_job_status=subscribe_status,
+        check_in_payload=check_in,
+    )
     job_orchestrator_pb2_grpc.add_JobOrchestratorServicer_to_server(servicer, server)
 
     bind_target = settings.job_orchestrator_api_bind_target
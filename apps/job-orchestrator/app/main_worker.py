@@ -5,19 +5,38 @@ import logging
 
 from nats.js.api import ConsumerConfig
 
+from app.contracts import WorkerJobRunnerProtocol
 from app.database import Database
+from app.job_consumer import PullJobConsumer
+from app.job_payload_repository import JobPayloadRepository
 from app.job_repository import JobRepository
 from app.jetstream import connect_jetstream, ensure_jobs_stream
 from app.logging import configure_logging
 from app.orchestrator import JobOrchestrator
 from app.settings import get_settings
-from app.worker import LocalProcessWorkerRunner
+from app.worker import LocalProcessWorkerRunner, PooledProcessWorkerRunner
+from app.worker.job_registry import RetryBackoff
 
 settings = get_settings()
 configure_logging(settings.effective_log_level)
 logger = logging.getLogger(__name__)
 
 
+def _build_runner() -> WorkerJobRunnerProtocol:
+    if settings.worker_runtime == "pool":
+        return PooledProcessWorkerRunner(
+            max_workers=settings.worker_replica_count,
+            max_jobs_per_process=settings.worker_pool_max_jobs_per_process,
+            max_rss_bytes=settings.worker_pool_max_rss_mb * 1024 * 1024,
+            log_level=settings.effective_log_level,
+        )
+    return LocalProcessWorkerRunner(
+        log_max_bytes=settings.worker_log_max_bytes,
+        log_backup_count=settings.worker_log_backup_count,
+        stderr_tail_lines=settings.worker_log_stderr_tail_lines,
+    )
+
+
 async def main() -> None:
     if not settings.job_orchestrator_worker_enabled:
         logger.info("job orchestrator worker disabled via config")
@@ -35,39 +54,74 @@ async def main() -> None:
     await ensure_jobs_stream(js)
 
     repository = JobRepository(db)
+    runner = _build_runner()
+    if isinstance(runner, PooledProcessWorkerRunner):
+        await runner.start()
     orchestrator = JobOrchestrator(
         repository=repository,
-        runner=LocalProcessWorkerRunner(),
+        runner=runner,
         events_subject_prefix=settings.job_events_subject_prefix,
         dlq_subject=settings.job_dlq_subject,
         max_attempts=settings.job_max_attempts,
         dlq_raw_message_max_chars=settings.job_dlq_raw_message_max_chars,
         publish_event=js.publish,
+        payload_repository=JobPayloadRepository(db),
+        claim_check_threshold_bytes=settings.job_payload_claim_check_bytes,
+        retry_backoff=RetryBackoff(
+            base_delay_seconds=settings.job_retry_base_delay_seconds,
+            max_delay_seconds=settings.job_retry_max_delay_seconds,
+        ),
     )
-    concurrency_guard = asyncio.Semaphore(settings.worker_replica_count)
-
-    async def handle(msg):
-        logger.debug("received job message", extra={"subject": msg.subject})
-        async with concurrency_guard:
-            await orchestrator.process_message(msg)
-
-    await js.subscribe(
-        settings.job_queue_subject,
-        durable=settings.job_consumer_durable,
-        cb=handle,
-        manual_ack=True,
-        config=ConsumerConfig(ack_wait=settings.job_consumer_ack_wait_seconds),
-    )
+    consumer_config = ConsumerConfig(ack_wait=settings.job_consumer_ack_wait_seconds)
+
+    if settings.job_consumer_mode == "pull":
+        subscription = await js.pull_subscribe(
+            settings.job_queue_subject,
+            durable=settings.job_consumer_durable,
+            config=consumer_config,
+        )
+        consume = PullJobConsumer(
+            subscription,
+            orchestrator.process_message,
+            max_in_flight=settings.worker_replica_count,
+            heartbeat_seconds=settings.job_consumer_heartbeat_seconds,
+        ).run
+    else:
+        concurrency_guard = asyncio.Semaphore(settings.worker_replica_count)
+
+        async def handle(msg):
+            logger.debug("received job message", extra={"subject": msg.subject})
+            async with concurrency_guard:
+                await orchestrator.process_message(msg)
+
+        await js.subscribe(
+            settings.job_queue_subject,
+            durable=settings.job_consumer_durable,
+            cb=handle,
+            manual_ack=True,
+            config=consumer_config,
+        )
+
+        async def consume() -> None:
+            while True:
+                await asyncio.sleep(3600)
+
     logger.info(
         "job orchestrator worker started",
-        extra={"subject": settings.job_queue_subject, "replicas": settings.worker_replica_count, "durable": settings.job_consumer_durable},
+        extra={
+            "subject": settings.job_queue_subject,
+            "replicas": settings.worker_replica_count,
+            "durable": settings.job_consumer_durable,
+            "consumer_mode": settings.job_consumer_mode,
+        },
     )
 
     try:
-        while True:
-            await asyncio.sleep(3600)
+        await consume()
     finally:
         await nc.drain()
+        if isinstance(runner, PooledProcessWorkerRunner):
+            runner.close()
         await db.close()
         logger.info("job orchestrator shutdown complete")
 
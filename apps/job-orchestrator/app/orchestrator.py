@@ -1,14 +1,18 @@
 from __future__ import annotations
 
 import logging
+import random
+from datetime import datetime, timedelta, timezone
 from typing import Awaitable, Callable
+from uuid import NAMESPACE_URL, uuid5
 
 from nats.aio.msg import Msg
 from pydantic import ValidationError
 
 from app.contracts import DeadLetterEvent, JobEnvelope, JobResultEvent, JobStatusEvent, WorkerJobRunnerProtocol
+from app.job_payload_repository import JobPayloadRepository, check_in_payload
 from app.job_repository import JobRepository
-from app.worker.job_registry import JOB_PAYLOAD_MODEL_BY_TYPE
+from app.worker.job_registry import JOB_PAYLOAD_MODEL_BY_TYPE, JOB_RETRY_BACKOFF_BY_TYPE, RetryBackoff
 
 logger = logging.getLogger(__name__)
 
@@ -24,8 +28,14 @@ class JobOrchestrator:
         max_attempts: int,
         dlq_raw_message_max_chars: int,
         publish_event: Callable[[str, bytes], Awaitable[None]],
+        payload_repository: JobPayloadRepository | None = None,
+        claim_check_threshold_bytes: int = 0,
+        retry_backoff: RetryBackoff | None = None,
     ) -> None:
         self._repository = repository
+        self._retry_backoff = retry_backoff
+        self._payload_repository = payload_repository
+        self._claim_check_threshold_bytes = claim_check_threshold_bytes
         self._runner = runner
         self._events_subject_prefix = events_subject_prefix
         self._dlq_subject = dlq_subject
@@ -85,8 +95,16 @@ class JobOrchestrator:
             logger.info("starting job execution", extra={"job_id": run_job.job_id, "job_type": run_job.job_type, "attempt": delivery_attempt})
             await self._runner.run_job(run_job)
             await self._repository.mark_completed(run_job.job_id)
+            await self._release_payload(run_job)
+            follow_up_job_id = await self._enqueue_follow_up(run_job)
             await self._emit_result(run_job, "completed", attempt=delivery_attempt)
-            await self._emit_status(run_job.job_id, "SUCCEEDED", attempt=delivery_attempt, terminal=True)
+            await self._emit_status(
+                run_job.job_id,
+                "SUCCEEDED",
+                attempt=delivery_attempt,
+                detail=f"quarantined items continue in follow-up job {follow_up_job_id}" if follow_up_job_id else None,
+                terminal=True,
+            )
             logger.info("job execution completed", extra={"job_id": run_job.job_id, "job_type": run_job.job_type, "attempt": delivery_attempt})
             await msg.ack()
         except Exception as exc:  # noqa: BLE001
@@ -95,6 +113,7 @@ class JobOrchestrator:
                 extra={"job_id": run_job.job_id, "attempt": delivery_attempt, "max_attempts": self._max_attempts},
             )
             if delivery_attempt >= self._max_attempts:
+                # A claim-checked payload is kept: the dead-lettered envelope only carries its payload_ref.
                 await self._repository.mark_terminal_failure(run_job.job_id, str(exc), "max-attempts")
                 logger.error("max retries reached, sending to DLQ", extra={"job_id": run_job.job_id})
                 await self._emit_result(run_job, "failed", attempt=delivery_attempt, detail=str(exc))
@@ -109,10 +128,73 @@ class JobOrchestrator:
                 await msg.ack()
                 return
 
-            await self._repository.mark_retrying_failure(run_job.job_id, str(exc))
-            await self._emit_status(run_job.job_id, "RETRYING", attempt=delivery_attempt, detail=str(exc), terminal=False)
-            logger.warning("retrying job", extra={"job_id": run_job.job_id, "next_attempt": delivery_attempt + 1})
-            await msg.nak()
+            delay_seconds = self._retry_delay_seconds(run_job.job_type, delivery_attempt)
+            next_attempt_at = datetime.now(timezone.utc) + timedelta(seconds=delay_seconds)
+            await self._repository.mark_retrying_failure(run_job.job_id, str(exc), next_attempt_at)
+            await self._emit_status(
+                run_job.job_id,
+                "RETRYING",
+                attempt=delivery_attempt,
+                detail=str(exc),
+                terminal=False,
+                next_attempt_at=next_attempt_at,
+            )
+            logger.warning(
+                "retrying job",
+                extra={
+                    "job_id": run_job.job_id,
+                    "next_attempt": delivery_attempt + 1,
+                    "delay_seconds": delay_seconds,
+                    "next_attempt_at": next_attempt_at.isoformat(),
+                },
+            )
+            await msg.nak(delay=delay_seconds or None)
+
+    def _retry_delay_seconds(self, job_type: str, failed_attempt: int) -> float:
+        """Exponential backoff with up to 20% jitter, so retries of a saturated dependency spread out."""
+
+        backoff = JOB_RETRY_BACKOFF_BY_TYPE.get(job_type, self._retry_backoff)
+        if backoff is None or backoff.base_delay_seconds <= 0:
+            return 0.0
+        delay = min(backoff.max_delay_seconds, backoff.base_delay_seconds * (2 ** (failed_attempt - 1)))
+        return delay + random.uniform(0.0, delay * 0.2)
+
+    async def _enqueue_follow_up(self, job: JobEnvelope) -> str | None:
+        """Request a follow-up job for items the completed job quarantined, if it recorded any.
+
+        The follow-up job id is derived from the source job id, so a repeated enqueue is
+        dropped as a duplicate. Enqueue failures are logged and never fail the completed job;
+        the payload stays on the job row.
+        """
+
+        try:
+            payload = await self._repository.fetch_follow_up_payload(job.job_id)
+            if payload is None:
+                return None
+            follow_up = JobEnvelope(
+                job_id=str(uuid5(NAMESPACE_URL, f"exobrain:job:{job.job_id}:follow-up")),
+                job_type=job.job_type,
+                correlation_id=job.correlation_id,
+                payload=payload,
+            )
+            if self._payload_repository is not None:
+                follow_up = await check_in_payload(follow_up, self._payload_repository, self._claim_check_threshold_bytes)
+            await self._publish_event(f"jobs.{job.job_type}.requested", follow_up.model_dump_json().encode("utf-8"))
+        except Exception:  # noqa: BLE001
+            logger.exception("follow-up job enqueue failed", extra={"job_id": job.job_id})
+            return None
+        logger.info("enqueued follow-up job", extra={"job_id": job.job_id, "follow_up_job_id": follow_up.job_id})
+        return follow_up.job_id
+
+    async def _release_payload(self, job: JobEnvelope) -> None:
+        """Drop the claim-checked payload of a job that completed."""
+
+        if job.payload_ref is None or self._payload_repository is None:
+            return
+        try:
+            await self._payload_repository.delete(job.job_id)
+        except Exception:  # noqa: BLE001
+            logger.exception("claim-checked payload cleanup failed", extra={"job_id": job.job_id})
 
     @staticmethod
     def _delivery_attempt(msg: Msg) -> int:
@@ -123,7 +205,8 @@ class JobOrchestrator:
     @staticmethod
     def _validate_payload(job: JobEnvelope) -> str | None:
         payload_model = JOB_PAYLOAD_MODEL_BY_TYPE.get(job.job_type)
-        if payload_model is None:
+        if payload_model is None or job.payload_ref is not None:
+            # Claim-checked payloads were validated before they were stored.
             return None
 
         try:
@@ -133,8 +216,23 @@ class JobOrchestrator:
             return str(exc)
 
 
-    async def _emit_status(self, job_id: str, state: str, attempt: int, terminal: bool, detail: str | None = None) -> None:
-        event = JobStatusEvent(job_id=job_id, state=state, attempt=attempt, detail=detail, terminal=terminal)
+    async def _emit_status(
+        self,
+        job_id: str,
+        state: str,
+        attempt: int,
+        terminal: bool,
+        detail: str | None = None,
+        next_attempt_at: datetime | None = None,
+    ) -> None:
+        event = JobStatusEvent(
+            job_id=job_id,
+            state=state,
+            attempt=attempt,
+            detail=detail,
+            terminal=terminal,
+            next_attempt_at=next_attempt_at,
+        )
         subject = f"jobs.status.{job_id}"
         await self._publish_event(subject, event.model_dump_json().encode("utf-8"))
 
@@ -1,5 +1,8 @@
 from __future__ import annotations
 
+import asyncio
+import logging
+import weakref
 from typing import Any
 
 import httpx
@@ -8,10 +11,55 @@ from langchain_core.messages import AIMessage, BaseMessage
 from langchain_core.outputs import ChatGeneration, ChatResult
 from langchain_core.utils.function_calling import convert_to_json_schema, convert_to_openai_tool
 
+from app.settings import get_settings
+
+logger = logging.getLogger(__name__)
+
 _TOOLS_KWARG = "model_provider_tools"
 _TOOL_CHOICE_KWARG = "model_provider_tool_choice"
 _STRUCTURED_OUTPUT_KWARG = "model_provider_structured_output"
 
+# httpx clients are bound to the event loop that opened their connections, so share one per loop.
+_shared_http_clients: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient] = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _build_shared_http_client() -> httpx.AsyncClient:
+    settings = get_settings()
+    limits = httpx.Limits(
+        max_connections=settings.model_provider_http_max_connections,
+        max_keepalive_connections=settings.model_provider_http_max_keepalive_connections,
+        keepalive_expiry=settings.model_provider_http_keepalive_expiry_seconds,
+    )
+    timeout = httpx.Timeout(settings.knowledge_update_model_provider_timeout_seconds)
+    if settings.model_provider_http2:
+        try:
+            return httpx.AsyncClient(limits=limits, timeout=timeout, http2=True)
+        except ImportError:
+            logger.warning("model-provider HTTP/2 requested but the h2 package is not installed; using HTTP/1.1")
+    return httpx.AsyncClient(limits=limits, timeout=timeout)
+
+
+def get_shared_http_client() -> httpx.AsyncClient:
+    """Return the keep-alive client shared by every model-provider call on the running loop."""
+
+    loop = asyncio.get_running_loop()
+    client = _shared_http_clients.get(loop)
+    if client is None or client.is_closed:
+        client = _build_shared_http_client()
+        _shared_http_clients[loop] = client
+    return client
+
+
+async def aclose_shared_http_client() -> None:
+    """Close the shared client of the running loop; call before the loop shuts down."""
+
+    client = _shared_http_clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
+
+
 
 def build_strict_response_format(schema: dict[str, Any] | type) -> dict[str, Any]:
     schema_payload: dict[str, Any]
@@ -77,9 +125,11 @@ class ModelProviderChatModel(BaseChatModel):
         **kwargs: Any,
     ) -> ChatResult:
         payload = self._build_payload(messages, stop=stop, **kwargs)
-        client = self.async_http_client or httpx.AsyncClient(timeout=self.timeout)
-
-        response = await client.post(f"{self.base_url}/internal/chat/messages", json=payload)
+        url = f"{self.base_url}/internal/chat/messages"
+        if self.async_http_client is not None:
+            response = await self.async_http_client.post(url, json=payload)
+        else:
+            response = await get_shared_http_client().post(url, json=payload, timeout=self.timeout)
         response.raise_for_status()
         return self._chat_result_from_response(response.json())
 
@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+import math
+import operator
+from typing import Any, Sequence
+
+import httpx
+
+from app.services.model_provider_chat_model import get_shared_http_client
+
+
+async def embed_texts(
+    texts: Sequence[str],
+    *,
+    model: str,
+    base_url: str,
+    timeout: float = 30.0,
+    async_http_client: httpx.AsyncClient | None = None,
+) -> list[list[float]]:
+    """Embed texts in one model-provider `/v1/embeddings` call, returned in input order."""
+
+    if not texts:
+        return []
+    payload: dict[str, Any] = {"model": model, "input": list(texts)}
+    url = f"{base_url}/embeddings"
+    if async_http_client is not None:
+        response = await async_http_client.post(url, json=payload)
+    else:
+        response = await get_shared_http_client().post(url, json=payload, timeout=timeout)
+    response.raise_for_status()
+    data = response.json().get("data")
+    if not isinstance(data, list) or len(data) != len(texts):
+        raise ValueError("model-provider embeddings response does not match the request input")
+    ordered = sorted(data, key=lambda item: int(item.get("index", 0)))
+    return [[float(value) for value in item["embedding"]] for item in ordered]
+
+
+def normalize_vectors(vectors: Sequence[Sequence[float]]) -> list[list[float]]:
+    """Scale vectors to unit length so cosine similarity reduces to a dot product."""
+
+    normalized: list[list[float]] = []
+    for vector in vectors:
+        norm = math.sqrt(math.fsum(value * value for value in vector))
+        normalized.append([value / norm for value in vector] if norm else [0.0] * len(vector))
+    return normalized
+
+
+def cosine_similarity_matrix(
+    queries: Sequence[Sequence[float]],
+    keys: Sequence[Sequence[float]],
+) -> list[list[float]]:
+    """Cosine similarity of every query against every key, normalizing each vector once."""
+
+    unit_queries = normalize_vectors(queries)
+    unit_keys = normalize_vectors(keys)
+    return [[sum(map(operator.mul, query, key)) for key in unit_keys] for query in unit_queries]
@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import json
+import logging
+from typing import Any
+
+import httpx
+
+from app.services.model_provider_chat_model import get_shared_http_client
+
+logger = logging.getLogger(__name__)
+
+
+class StructuredCompletionClient:
+    """One structured completion per call against the model-provider native chat contract.
+
+    Posts the system prompt and the given messages to `/internal/chat/messages` with the strict
+    `response_format` (see `build_strict_response_format`) as `structured_output`. Replies keep
+    the shape of an agent reply: `structured_response` holds the parsed JSON object, or None
+    when the model returned anything else, and `usage` the provider token counts. Callers
+    validate `structured_response` into their Pydantic model and wrap calls in their own retries.
+    """
+
+    def __init__(
+        self,
+        *,
+        model: str,
+        base_url: str,
+        system_prompt: str,
+        response_format: dict[str, Any],
+        timeout: float = 30.0,
+        temperature: float = 0.0,
+        async_http_client: httpx.AsyncClient | None = None,
+    ) -> None:
+        self.model = model
+        self.base_url = base_url
+        self.system_prompt = system_prompt
+        self.response_format = response_format
+        self.timeout = timeout
+        self.temperature = temperature
+        self.async_http_client = async_http_client
+
+    def _build_payload(self, messages: list[dict[str, str]]) -> dict[str, Any]:
+        return {
+            "model": self.model,
+            "messages": [
+                {"role": "system", "content": [{"type": "text", "text": self.system_prompt}]},
+                *(
+                    {"role": message["role"], "content": [{"type": "text", "text": message["content"]}]}
+                    for message in messages
+                ),
+            ],
+            "structured_output": self.response_format["json_schema"],
+            "temperature": self.temperature,
+            "stream": False,
+        }
+
+    async def ainvoke(self, input: dict[str, list[dict[str, str]]]) -> dict[str, Any]:
+        payload = self._build_payload(input["messages"])
+        url = f"{self.base_url}/internal/chat/messages"
+        if self.async_http_client is not None:
+            response = await self.async_http_client.post(url, json=payload)
+        else:
+            response = await get_shared_http_client().post(url, json=payload, timeout=self.timeout)
+        response.raise_for_status()
+        body = response.json()
+        content = (body.get("message") or {}).get("content") or []
+        text = "".join(block.get("text", "") for block in content if block.get("type") == "text")
+        try:
+            structured = json.loads(text)
+        except json.JSONDecodeError:
+            logger.debug("model-provider structured completion returned non-JSON text", extra={"model": self.model})
+            structured = None
+        return {
+            "structured_response": structured if isinstance(structured, dict) else None,
+            "usage": body.get("usage") or {},
+        }
@@ -1,4 +1,5 @@
 from functools import lru_cache
+from typing import Literal
 
 from pydantic import Field, field_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
@@ -19,6 +20,8 @@ class Settings(BaseSettings):
     job_events_subject_prefix: str = Field(default="jobs.events", alias="JOB_EVENTS_SUBJECT_PREFIX")
     job_dlq_subject: str = Field(default="jobs.dlq", alias="JOB_DLQ_SUBJECT")
     job_max_attempts: int = Field(default=3, alias="JOB_MAX_ATTEMPTS", ge=1)
+    job_retry_base_delay_seconds: float = Field(default=5.0, alias="JOB_RETRY_BASE_DELAY_SECONDS", ge=0)
+    job_retry_max_delay_seconds: float = Field(default=300.0, alias="JOB_RETRY_MAX_DELAY_SECONDS", ge=0)
     job_dlq_raw_message_max_chars: int = Field(default=4096, alias="JOB_DLQ_RAW_MESSAGE_MAX_CHARS", ge=256)
     job_consumer_durable: str = Field(default="job-orchestrator-worker-v2", alias="JOB_CONSUMER_DURABLE")
     job_consumer_ack_wait_seconds: float = Field(
@@ -26,7 +29,20 @@ class Settings(BaseSettings):
         alias="JOB_CONSUMER_ACK_WAIT_SECONDS",
         ge=120.0,
     )
+    job_consumer_mode: Literal["push", "pull"] = Field(default="push", alias="JOB_CONSUMER_MODE")
+    job_consumer_heartbeat_seconds: float = Field(default=30.0, alias="JOB_CONSUMER_HEARTBEAT_SECONDS", gt=0)
+    job_payload_claim_check_bytes: int = Field(default=256 * 1024, alias="JOB_PAYLOAD_CLAIM_CHECK_BYTES", ge=0)
     worker_replica_count: int = Field(default=1, alias="WORKER_REPLICA_COUNT", ge=1)
+    worker_runtime: Literal["subprocess", "pool"] = Field(default="subprocess", alias="WORKER_RUNTIME")
+    worker_pool_max_jobs_per_process: int = Field(
+        default=50,
+        alias="WORKER_POOL_MAX_JOBS_PER_PROCESS",
+        ge=1,
+    )
+    worker_pool_max_rss_mb: int = Field(default=1024, alias="WORKER_POOL_MAX_RSS_MB", ge=64)
+    worker_log_max_bytes: int = Field(default=10 * 1024 * 1024, alias="WORKER_LOG_MAX_BYTES", ge=1024)
+    worker_log_backup_count: int = Field(default=3, alias="WORKER_LOG_BACKUP_COUNT", ge=0)
+    worker_log_stderr_tail_lines: int = Field(default=200, alias="WORKER_LOG_STDERR_TAIL_LINES", ge=1)
     knowledge_interface_grpc_target: str = Field(
         default="localhost:50051",
         alias="KNOWLEDGE_INTERFACE_GRPC_TARGET",
@@ -40,15 +56,84 @@ class Settings(BaseSettings):
         default="http://localhost:8010/v1",
         alias="MODEL_PROVIDER_BASE_URL",
     )
+    model_provider_http_max_connections: int = Field(
+        default=20,
+        alias="MODEL_PROVIDER_HTTP_MAX_CONNECTIONS",
+        ge=1,
+    )
+    model_provider_http_max_keepalive_connections: int = Field(
+        default=10,
+        alias="MODEL_PROVIDER_HTTP_MAX_KEEPALIVE_CONNECTIONS",
+        ge=0,
+    )
+    model_provider_http_keepalive_expiry_seconds: float = Field(
+        default=30.0,
+        alias="MODEL_PROVIDER_HTTP_KEEPALIVE_EXPIRY_SECONDS",
+        gt=0,
+    )
+    model_provider_http2: bool = Field(default=False, alias="MODEL_PROVIDER_HTTP2")
     knowledge_update_extraction_model: str = Field(
         default="worker",
         alias="KNOWLEDGE_UPDATE_EXTRACTION_MODEL",
     )
+    knowledge_update_extraction_window_tokens: int = Field(
+        default=12_000,
+        alias="KNOWLEDGE_UPDATE_EXTRACTION_WINDOW_TOKENS",
+        ge=500,
+    )
     knowledge_update_model_provider_timeout_seconds: float = Field(
         default=120.0,
         alias="KNOWLEDGE_UPDATE_MODEL_PROVIDER_TIMEOUT_SECONDS",
         ge=120.0,
     )
+    knowledge_update_max_concurrency: int = Field(
+        default=4,
+        alias="KNOWLEDGE_UPDATE_MAX_CONCURRENCY",
+        ge=1,
+    )
+    knowledge_update_upsert_chunk_bytes: int = Field(
+        default=1_048_576,
+        alias="KNOWLEDGE_UPDATE_UPSERT_CHUNK_BYTES",
+        ge=1024,
+    )
+    knowledge_update_entity_quarantine_enabled: bool = Field(
+        default=True,
+        alias="KNOWLEDGE_UPDATE_ENTITY_QUARANTINE_ENABLED",
+    )
+    knowledge_update_checkpoints_enabled: bool = Field(
+        default=True,
+        alias="KNOWLEDGE_UPDATE_CHECKPOINTS_ENABLED",
+    )
+    knowledge_update_metrics_enabled: bool = Field(
+        default=True,
+        alias="KNOWLEDGE_UPDATE_METRICS_ENABLED",
+    )
+    knowledge_update_schema_cache_ttl_seconds: float = Field(
+        default=300.0,
+        alias="KNOWLEDGE_UPDATE_SCHEMA_CACHE_TTL_SECONDS",
+        ge=0,
+    )
+    knowledge_update_resolution_memo_ttl_seconds: float = Field(
+        default=2_592_000.0,
+        alias="KNOWLEDGE_UPDATE_RESOLUTION_MEMO_TTL_SECONDS",
+        ge=0,
+    )
+    knowledge_update_embedding_model: str = Field(
+        default="",
+        alias="KNOWLEDGE_UPDATE_EMBEDDING_MODEL",
+    )
+    knowledge_update_embedding_match_threshold: float = Field(
+        default=0.92,
+        alias="KNOWLEDGE_UPDATE_EMBEDDING_MATCH_THRESHOLD",
+        ge=0,
+        le=1,
+    )
+    knowledge_update_embedding_distinct_threshold: float = Field(
+        default=0.5,
+        alias="KNOWLEDGE_UPDATE_EMBEDDING_DISTINCT_THRESHOLD",
+        ge=0,
+        le=1,
+    )
     job_orchestrator_api_bind_address: str | None = Field(
         default=None,
         alias="JOB_ORCHESTRATOR_API_BIND_ADDRESS",
@@ -9,7 +9,7 @@ from uuid import UUID, uuid4
 import grpc
 from pydantic import ValidationError
 
-from app.contracts import JobEnvelope, JobStatusEvent
+from app.contracts import JobEnvelope, JobMetrics, JobStatusEvent
 from app.transport.grpc import job_orchestrator_pb2, job_orchestrator_pb2_grpc
 from app.worker.job_registry import JOB_PAYLOAD_MODEL_BY_TYPE
 
@@ -42,8 +42,10 @@ class JobOrchestratorServicer(job_orchestrator_pb2_grpc.JobOrchestratorServicer)
         *,
         fetch_job_status: Callable[[str], Awaitable[dict[str, Any] | None]] | None = None,
         subscribe_job_status: Callable[[str], Awaitable[AsyncIterator[bytes]]] | None = None,
+        check_in_payload: Callable[[JobEnvelope], Awaitable[JobEnvelope]] | None = None,
     ) -> None:
         self._publish_job = publish_job
+        self._check_in_payload = check_in_payload
         self._fetch_job_status = fetch_job_status
         self._subscribe_job_status = subscribe_job_status
 
@@ -76,6 +78,8 @@ class JobOrchestratorServicer(job_orchestrator_pb2_grpc.JobOrchestratorServicer)
             attempt=0,
             created_at=datetime.now(timezone.utc),
         )
+        if self._check_in_payload is not None:
+            job = await self._check_in_payload(job)
         subject = f"jobs.{job.job_type}.requested"
         await self._publish_job(subject, job.model_dump_json().encode("utf-8"))
         await self._publish_job(
@@ -165,6 +169,34 @@ class JobOrchestratorServicer(job_orchestrator_pb2_grpc.JobOrchestratorServicer)
             detail=status.get("last_error") or "",
             terminal=bool(status.get("is_terminal")),
             updated_at=JobOrchestratorServicer._format_timestamp(status.get("updated_at")),
+            next_attempt_at=JobOrchestratorServicer._format_timestamp(status.get("next_attempt_at")),
+            metrics=JobOrchestratorServicer._metrics_to_proto(status.get("metrics")),
+        )
+
+    @staticmethod
+    def _metrics_to_proto(value: Any) -> job_orchestrator_pb2.JobMetrics | None:
+        if value is None:
+            return None
+        metrics = JobMetrics.model_validate_json(value) if isinstance(value, str) else JobMetrics.model_validate(value)
+        return job_orchestrator_pb2.JobMetrics(
+            wall_time_ms=metrics.wall_time_ms,
+            critical_path=metrics.critical_path,
+            steps=[
+                job_orchestrator_pb2.JobStepMetrics(
+                    step=step.step,
+                    started_at=step.started_at.isoformat(),
+                    finished_at=step.finished_at.isoformat(),
+                    duration_ms=step.duration_ms,
+                    resumed=step.resumed,
+                )
+                for step in metrics.steps
+            ],
+            operations=[
+                job_orchestrator_pb2.JobOperationMetrics(**operation.model_dump())
+                for operation in metrics.operations
+            ],
+            total_input_tokens=metrics.total_input_tokens,
+            total_output_tokens=metrics.total_output_tokens,
         )
 
     @staticmethod
@@ -177,6 +209,7 @@ class JobOrchestratorServicer(job_orchestrator_pb2_grpc.JobOrchestratorServicer)
             detail=status.get("last_error") or "",
             terminal=bool(status.get("is_terminal")),
             emitted_at=JobOrchestratorServicer._format_timestamp(status.get("updated_at")),
+            next_attempt_at=JobOrchestratorServicer._format_timestamp(status.get("next_attempt_at")),
         )
 
     @staticmethod
@@ -188,6 +221,7 @@ class JobOrchestratorServicer(job_orchestrator_pb2_grpc.JobOrchestratorServicer)
             detail=event.detail or "",
             terminal=event.terminal,
             emitted_at=event.emitted_at.isoformat(),
+            next_attempt_at=event.next_attempt_at.isoformat() if event.next_attempt_at else "",
         )
 
     @staticmethod
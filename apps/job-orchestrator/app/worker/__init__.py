@@ -1,3 +1,4 @@
+from app.worker.pool_runner import PooledProcessWorkerRunner
 from app.worker.process_runner import LocalProcessWorkerRunner
 
-__all__ = ["LocalProcessWorkerRunner"]
+__all__ = ["LocalProcessWorkerRunner", "PooledProcessWorkerRunner"]
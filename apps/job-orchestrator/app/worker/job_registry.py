@@ -1,9 +1,20 @@
 from __future__ import annotations
 
+from dataclasses import dataclass
+
 from pydantic import BaseModel
 
 from app.contracts import KnowledgeUpdatePayload
 
+
+@dataclass(frozen=True)
+class RetryBackoff:
+    """Exponential redelivery delay for a failed job: `base_delay_seconds * 2 ** (attempt - 1)`, capped."""
+
+    base_delay_seconds: float
+    max_delay_seconds: float
+
+
 JOB_MODULE_BY_TYPE: dict[str, str] = {
     "knowledge.update": "app.worker.jobs.knowledge_update",
 }
@@ -11,3 +22,8 @@ JOB_MODULE_BY_TYPE: dict[str, str] = {
 JOB_PAYLOAD_MODEL_BY_TYPE: dict[str, type[BaseModel]] = {
     "knowledge.update": KnowledgeUpdatePayload,
 }
+
+# knowledge.update failures are mostly model-provider rate limits and outages, which outlast a short pause.
+JOB_RETRY_BACKOFF_BY_TYPE: dict[str, RetryBackoff] = {
+    "knowledge.update": RetryBackoff(base_delay_seconds=30.0, max_delay_seconds=600.0),
+}
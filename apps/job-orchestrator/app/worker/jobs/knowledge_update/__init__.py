@@ -3,14 +3,34 @@ from __future__ import annotations
 import argparse
 import asyncio
 import sys
+import time
 
+import asyncpg
 import grpc
 
-from app.contracts import JobEnvelope, KnowledgeUpdatePayload
+from app.contracts import JobEnvelope, JobMetrics, KnowledgeUpdatePayload
+from app.database import Database
+from app.entity_resolution_memo_repository import EntityResolutionMemoRepository
+from app.job_checkpoint_repository import JobCheckpointRepository
+from app.job_payload_repository import JobPayloadRepository, check_out_payload
+from app.job_repository import JobRepository
 from app.logging import configure_logging
-from app.settings import get_settings
+from app.services.model_provider_chat_model import aclose_shared_http_client
+from app.settings import Settings, get_settings
 from app.worker.jobs.knowledge_update import core
+from app.worker.jobs.knowledge_update.checkpoints import StepCheckpoints
+from app.worker.jobs.knowledge_update.concurrency import job_concurrency_scope
+from app.worker.jobs.knowledge_update.quarantine import (
+    build_quarantine,
+    committed_relationships,
+    committed_resolutions,
+    entity_isolation_scope,
+)
+from app.worker.jobs.knowledge_update.resolution_memo import EntityResolutionMemo
+from app.worker.jobs.knowledge_update.rpc_cache import KnowledgeInterfaceCache, SchemaContextCache, schema_fingerprint
 from app.worker.jobs.knowledge_update.schemas import validate_upsert_graph_delta_payload
+from app.worker.jobs.knowledge_update.step_graph import StepSpec, run_step_graph
+from app.worker.jobs.knowledge_update.telemetry import job_telemetry_scope
 from app.worker.jobs.knowledge_update.steps import (
     step01_graph_seed,
     step02_entity_extraction,
@@ -23,6 +43,14 @@ from app.worker.jobs.knowledge_update.steps import (
     step09_merge_graph,
     step10_mentions,
 )
+from app.worker.jobs.knowledge_update.types import (
+    CandidateMatchResult,
+    EntityExtractionResult,
+    FinalEntityContextGraph,
+    MatchedRelationship,
+    RelationshipPair,
+    ResolvedEntity,
+)
 
 KnowledgeUpdateStepError = core.KnowledgeUpdateStepError
 _call_with_retry = core._call_with_retry
@@ -63,13 +91,296 @@ def _configure_worker_logging() -> None:
 _preflight_validate_graph_delta_entities = core._preflight_validate_graph_delta_entities
 _preflight_validate_graph_delta_edges = core._preflight_validate_graph_delta_edges
 
+_CHECKPOINT_CONNECT_TIMEOUT_SECONDS = 5.0
 
-async def run(job: JobEnvelope) -> None:
-    settings = get_settings()
+
+def _build_step_graph(
+    channel: grpc.aio.Channel,
+    job_id: str,
+    payload: KnowledgeUpdatePayload,
+    settings: Settings,
+    resolution_memo: EntityResolutionMemo | None = None,
+) -> list[StepSpec]:
+    def _merge_graph_delta(
+        extraction: EntityExtractionResult,
+        relationships: list[MatchedRelationship],
+        final_graphs: list[FinalEntityContextGraph],
+    ) -> core.knowledge_pb2.UpsertGraphDeltaRequest:
+        return step09_merge_graph.run(
+            payload,
+            None,  # Step 0 graph delta merge intentionally disabled for sparse test runs.
+            extraction,
+            committed_relationships(relationships, final_graphs),
+            final_graphs,
+            job_id,
+        )
+
+    async def _extract_entities(batch_document: str) -> EntityExtractionResult:
+        if payload.quarantine is not None:
+            # Follow-up jobs re-process the entities an earlier job quarantined, not the whole batch.
+            return EntityExtractionResult.model_validate(
+                {
+                    "extracted_entities": payload.quarantine.extracted_entities,
+                    "extracted_universes": payload.quarantine.extracted_universes,
+                }
+            )
+        return await step02_entity_extraction.run(channel, payload, batch_document, settings)
+
+    return [
+        StepSpec(
+            name="step two",
+            inputs=("batch_document",),
+            output="extraction",
+            output_type=EntityExtractionResult,
+            run=_extract_entities,
+        ),
+        StepSpec(
+            name="step three",
+            inputs=("extraction",),
+            output="candidate_matching",
+            output_type=list[CandidateMatchResult],
+            run=lambda extraction: step03_candidate_matching.run(channel, payload, extraction, resolution_memo),
+        ),
+        StepSpec(
+            name="step four",
+            inputs=("extraction", "batch_document"),
+            output="entity_contexts",
+            output_type=list[str | None],
+            run=lambda extraction, batch_document: step04_entity_context.run(extraction, batch_document, settings),
+        ),
+        StepSpec(
+            name="step five",
+            inputs=("candidate_matching", "entity_contexts"),
+            output="resolved_entities",
+            output_type=list[ResolvedEntity],
+            run=lambda candidate_matching, entity_contexts: step05_entity_resolution.run(
+                channel,
+                payload,
+                candidate_matching,
+                entity_contexts,
+                settings,
+            ),
+        ),
+        StepSpec(
+            name="step six",
+            inputs=("resolved_entities", "batch_document"),
+            output="entity_pairs",
+            output_type=list[RelationshipPair],
+            run=lambda resolved_entities, batch_document: step06_relationship_extraction.run(
+                resolved_entities,
+                batch_document,
+                settings,
+            ),
+        ),
+        StepSpec(
+            name="step seven",
+            inputs=("resolved_entities", "entity_contexts", "entity_pairs"),
+            output="relationships",
+            output_type=list[MatchedRelationship],
+            run=lambda resolved_entities, entity_contexts, entity_pairs: step07_relationship_match.run(
+                channel,
+                payload,
+                resolved_entities,
+                entity_contexts,
+                entity_pairs,
+                settings,
+            ),
+        ),
+        StepSpec(
+            name="step eight",
+            inputs=("resolved_entities", "entity_contexts"),
+            output="final_graphs",
+            output_type=list[FinalEntityContextGraph],
+            run=lambda resolved_entities, entity_contexts: step08_entity_graph.run(
+                channel,
+                payload,
+                resolved_entities,
+                entity_contexts,
+                settings,
+            ),
+        ),
+        StepSpec(
+            name="step nine",
+            inputs=("extraction", "relationships", "final_graphs"),
+            output="merged_graph_delta",
+            run=_merge_graph_delta,
+        ),
+    ]
+
+
+async def _connect_orchestrator_database(settings: Settings, *, required: bool = False) -> Database | None:
+    if not (
+        required
+        or settings.knowledge_update_checkpoints_enabled
+        or settings.knowledge_update_metrics_enabled
+        or settings.knowledge_update_entity_quarantine_enabled
+        or settings.knowledge_update_resolution_memo_ttl_seconds > 0
+    ):
+        return None
+    database = Database(settings.job_orchestrator_db_dsn, reshape_schema_query=settings.reshape_schema_query)
+    try:
+        await asyncio.wait_for(database.connect(), timeout=_CHECKPOINT_CONNECT_TIMEOUT_SECONDS)
+    except (OSError, TimeoutError, asyncpg.PostgresError) as exc:
+        core.logger.warning(
+            "knowledge.update checkpoints, metrics, resolution memo and entity quarantine disabled: orchestrator database unavailable",
+            extra={"error": str(exc)},
+        )
+        return None
+    return database
+
+
+async def _record_job_metrics(database: Database, job_id: str, metrics: JobMetrics) -> None:
+    try:
+        await JobRepository(database).record_metrics(job_id, metrics)
+    except (OSError, asyncpg.PostgresError, asyncpg.InterfaceError) as exc:
+        core.logger.warning("knowledge.update metrics write failed", extra={"job_id": job_id, "error": str(exc)})
+
+
+async def _record_quarantine(
+    database: Database,
+    job_id: str,
+    payload: KnowledgeUpdatePayload,
+    step_values: dict[str, object],
+) -> None:
+    """Store the follow-up payload for quarantined entities, or clear one left by an earlier attempt.
+
+    Runs before the upsert so a failed write retries the job instead of losing the entities.
+    """
+
+    quarantine = build_quarantine(
+        job_id,
+        step_values["extraction"],
+        step_values["resolved_entities"],
+        step_values["final_graphs"],
+    )
+    follow_up_payload = (
+        payload.model_copy(update={"quarantine": quarantine}).model_dump(mode="json") if quarantine is not None else None
+    )
+    await JobRepository(database).record_follow_up_payload(job_id, follow_up_payload)
+    if quarantine is not None:
+        core.logger.warning(
+            "knowledge.update quarantined entities for a follow-up job",
+            extra={
+                "job_id": job_id,
+                "quarantined_entities": [entity.get("name") for entity in quarantine.extracted_entities],
+            },
+        )
+
+
+async def _run_with_channel(
+    job: JobEnvelope,
+    channel: grpc.aio.Channel,
+    settings: Settings,
+    orchestrator_database: Database | None,
+    *,
+    share_schema_cache: bool = False,
+) -> None:
+    if job.payload_ref is not None:
+        if orchestrator_database is None:
+            raise RuntimeError(
+                f"knowledge.update job {job.job_id} payload is claim-checked but the orchestrator database is unavailable"
+            )
+        job = await check_out_payload(job, JobPayloadRepository(orchestrator_database))
+
+    started = time.monotonic()
+    with job_telemetry_scope() as telemetry:
+        try:
+            await _run_pipeline(job, channel, settings, orchestrator_database, share_schema_cache=share_schema_cache)
+        finally:
+            metrics = telemetry.build(wall_time_ms=(time.monotonic() - started) * 1000)
+            core.logger.info(
+                "knowledge.update job metrics",
+                extra={
+                    "job_id": job.job_id,
+                    "wall_time_ms": metrics.wall_time_ms,
+                    "critical_path": metrics.critical_path,
+                    "total_input_tokens": metrics.total_input_tokens,
+                    "total_output_tokens": metrics.total_output_tokens,
+                },
+            )
+            if orchestrator_database is not None and settings.knowledge_update_metrics_enabled:
+                await _record_job_metrics(orchestrator_database, job.job_id, metrics)
+
+
+_schema_context_cache = SchemaContextCache()
+
+
+async def _knowledge_interface_cache(
+    channel: grpc.aio.Channel,
+    settings: Settings,
+    *,
+    share_schema_cache: bool,
+) -> KnowledgeInterfaceCache:
+    """Wrap the channel for one job, sharing schema contexts across jobs while the schema is unchanged.
+
+    Only long-lived pooled workers share the cache; a per-job subprocess would pay the `GetSchema`
+    fingerprint call for a cache that dies with it.
+    """
+
+    ttl_seconds = settings.knowledge_update_schema_cache_ttl_seconds
+    if not share_schema_cache or ttl_seconds <= 0:
+        return KnowledgeInterfaceCache(channel)
+
+    get_schema = channel.unary_unary(
+        "/exobrain.knowledge.v1.KnowledgeInterface/GetSchema",
+        request_serializer=core.knowledge_pb2.GetSchemaRequest.SerializeToString,
+        response_deserializer=core.knowledge_pb2.GetSchemaReply.FromString,
+    )
+    try:
+        schema_reply = await core._call_with_retry(
+            step_name="schema version",
+            operation="GetSchema",
+            call=lambda: get_schema(core.knowledge_pb2.GetSchemaRequest()),
+        )
+    except KnowledgeUpdateStepError as exc:
+        core.logger.warning(
+            "knowledge.update schema version unavailable, skipping shared schema cache",
+            extra={"error": str(exc)},
+        )
+        return KnowledgeInterfaceCache(channel)
+
+    _schema_context_cache.use_schema_version(schema_fingerprint(schema_reply))
+    return KnowledgeInterfaceCache(
+        channel,
+        schema_cache=_schema_context_cache,
+        schema_cache_ttl_seconds=ttl_seconds,
+    )
+
+
+async def _run_pipeline(
+    job: JobEnvelope,
+    channel: grpc.aio.Channel,
+    settings: Settings,
+    orchestrator_database: Database | None,
+    *,
+    share_schema_cache: bool = False,
+) -> None:
     target = settings.knowledge_interface_grpc_target
     payload = KnowledgeUpdatePayload.model_validate(job.payload)
+    checkpoints = (
+        StepCheckpoints(JobCheckpointRepository(orchestrator_database), job.job_id)
+        if orchestrator_database is not None and settings.knowledge_update_checkpoints_enabled
+        else None
+    )
+    resolution_memo = (
+        EntityResolutionMemo(
+            EntityResolutionMemoRepository(orchestrator_database),
+            payload.requested_by_user_id,
+            settings.knowledge_update_resolution_memo_ttl_seconds,
+        )
+        if orchestrator_database is not None and settings.knowledge_update_resolution_memo_ttl_seconds > 0
+        else None
+    )
+
+    # Quarantined entities are handed to a follow-up job through the orchestrator database; a
+    # follow-up job itself fails as a whole so quarantine never chains.
+    isolate_entities = (
+        settings.knowledge_update_entity_quarantine_enabled
+        and orchestrator_database is not None
+        and payload.quarantine is None
+    )
 
-    async with grpc.aio.insecure_channel(target) as channel:
+    with job_concurrency_scope(settings.knowledge_update_max_concurrency), entity_isolation_scope(isolate_entities):
         try:
             await asyncio.wait_for(
                 channel.channel_ready(),
@@ -82,94 +393,94 @@ async def run(job: JobEnvelope) -> None:
                 f"{settings.knowledge_interface_connect_timeout_seconds}s"
             ) from exc
 
-        # Step 0 (chat-message graph seed) is intentionally disabled for sparse test runs.
-        # step_zero_graph_delta = await step01_graph_seed.run(channel, payload)
-        # validate_upsert_graph_delta_payload("step zero", step_zero_graph_delta)
-        step_one_markdown_document = core._step_two_store_batch_document(payload)
-        step_two_extraction = await step02_entity_extraction.run(channel, payload, step_one_markdown_document, settings)
-        step_three_candidate_matching = await step03_candidate_matching.run(channel, payload, step_two_extraction)
-        step_four_entity_contexts = await step04_entity_context.run(step_two_extraction, step_one_markdown_document, settings)
-        step_five_resolved_entities = await step05_entity_resolution.run(
-            channel,
-            payload,
-            step_three_candidate_matching,
-            step_four_entity_contexts,
-            settings,
-        )
-        step_six_entity_pairs = await step06_relationship_extraction.run(
-            step_five_resolved_entities,
-            step_one_markdown_document,
-            settings,
-        )
-        step_seven_relationships = await step07_relationship_match.run(
-            channel,
-            payload,
-            step_five_resolved_entities,
-            step_four_entity_contexts,
-            step_six_entity_pairs,
-            settings,
-        )
-        step_eight_final_entity_context_graphs = await step08_entity_graph.run(
-            channel,
-            payload,
-            step_five_resolved_entities,
-            step_four_entity_contexts,
-            settings,
-        )
-        step_nine_merged_graph_delta = step09_merge_graph.run(
-            payload,
-            {},  # Step 0 graph delta merge intentionally disabled for sparse test runs.
-            step_two_extraction,
-            step_seven_relationships,
-            step_eight_final_entity_context_graphs,
-        )
-        validate_upsert_graph_delta_payload("step nine", step_nine_merged_graph_delta)
-        # Step 10 (mentions finalization) is intentionally disabled for sparse test runs.
-        # step_ten_final_graph_delta = await step10_mentions.run(
-        #     step_nine_merged_graph_delta,
-        #     settings,
-        #     payload.requested_by_user_id,
-        # )
-        step_ten_final_graph_delta = step_nine_merged_graph_delta
-        await core._preflight_validate_graph_delta_entities(
-            channel,
-            step_ten_final_graph_delta,
-            payload.requested_by_user_id,
-        )
-        core._preflight_validate_graph_delta_edges(step_ten_final_graph_delta)
+        # Lookups repeated across steps (and the preflight) are served from one job-scoped cache.
+        knowledge_interface = await _knowledge_interface_cache(channel, settings, share_schema_cache=share_schema_cache)
+        try:
+            # Step 0 (chat-message graph seed) is intentionally disabled for sparse test runs.
+            # step_zero_graph_delta = await step01_graph_seed.run(knowledge_interface, payload)
+            step_graph = await run_step_graph(
+                _build_step_graph(knowledge_interface, job.job_id, payload, settings, resolution_memo),
+                {"batch_document": core._step_two_store_batch_document(payload)},
+                checkpoints=checkpoints,
+            )
+            step_nine_merged_graph_delta = step_graph.values["merged_graph_delta"]
+            # Step 10 (mentions finalization) is intentionally disabled for sparse test runs.
+            # step_ten_final_graph_delta = await step10_mentions.run(
+            #     step_nine_merged_graph_delta,
+            #     settings,
+            #     payload.requested_by_user_id,
+            # )
+            step_ten_final_graph_delta = step_nine_merged_graph_delta
+            await core._preflight_validate_graph_delta_entities(
+                knowledge_interface,
+                step_ten_final_graph_delta,
+                payload.requested_by_user_id,
+            )
+            core._preflight_validate_graph_delta_edges(step_ten_final_graph_delta)
+            if isolate_entities:
+                await _record_quarantine(orchestrator_database, job.job_id, payload, step_graph.values)
 
-        upsert_graph_delta = channel.unary_unary(
-            "/exobrain.knowledge.v1.KnowledgeInterface/UpsertGraphDelta",
-            request_serializer=core.knowledge_pb2.UpsertGraphDeltaRequest.SerializeToString,
-            response_deserializer=core.knowledge_pb2.UpsertGraphDeltaReply.FromString,
-        )
-        upsert_request = validate_upsert_graph_delta_payload("step ten", step_ten_final_graph_delta)
-        upsert_reply = await core._call_with_retry(
-            step_name="step eleven",
-            operation="UpsertGraphDelta",
-            call=lambda: upsert_graph_delta(upsert_request),
-        )
-        core.logger.info(
-            "knowledge.update step eleven upserted final graph delta",
-            extra={
-                "entities_upserted": upsert_reply.entities_upserted,
-                "blocks_upserted": upsert_reply.blocks_upserted,
-                "edges_upserted": upsert_reply.edges_upserted,
-            },
-        )
+            await core._upsert_graph_delta(knowledge_interface, step_ten_final_graph_delta, settings, checkpoints)
+            if resolution_memo is not None:
+                await resolution_memo.remember(
+                    step_graph.values["candidate_matching"],
+                    committed_resolutions(step_graph.values["resolved_entities"], step_graph.values["final_graphs"]),
+                )
+            if checkpoints is not None:
+                await checkpoints.clear()
+        finally:
+            knowledge_interface.log_stats()
+
+
+async def run(job: JobEnvelope) -> None:
+    settings = get_settings()
+    orchestrator_database = await _connect_orchestrator_database(settings, required=job.payload_ref is not None)
+    try:
+        async with grpc.aio.insecure_channel(settings.knowledge_interface_grpc_target) as channel:
+            await _run_with_channel(job, channel, settings, orchestrator_database)
+    finally:
+        if orchestrator_database is not None:
+            await orchestrator_database.close()
+
+
+_pooled_channels: dict[str, grpc.aio.Channel] = {}
+_pooled_orchestrator_databases: dict[str, Database] = {}
+
+
+async def run_pooled(job: JobEnvelope) -> None:
+    """Entry point for long-lived worker processes: keep one channel per target and one
+    orchestrator database pool open across jobs."""
+
+    settings = get_settings()
+    target = settings.knowledge_interface_grpc_target
+    channel = _pooled_channels.get(target)
+    if channel is None:
+        channel = grpc.aio.insecure_channel(target)
+        _pooled_channels[target] = channel
+
+    orchestrator_database = _pooled_orchestrator_databases.get(settings.job_orchestrator_db_dsn)
+    if orchestrator_database is None:
+        orchestrator_database = await _connect_orchestrator_database(settings, required=job.payload_ref is not None)
+        if orchestrator_database is not None:
+            _pooled_orchestrator_databases[settings.job_orchestrator_db_dsn] = orchestrator_database
+    await _run_with_channel(job, channel, settings, orchestrator_database, share_schema_cache=True)
+
+
+async def _run_standalone(job: JobEnvelope) -> None:
+    try:
+        await run(job)
+    finally:
+        await aclose_shared_http_client()
 
 
 def main() -> None:
     _configure_worker_logging()
 
     parser = argparse.ArgumentParser(description="Run knowledge.update worker job")
-    parser.add_argument("--job-envelope", required=True, help="Serialized JobEnvelope JSON payload")
-    args = parser.parse_args()
-
-    job = JobEnvelope.model_validate_json(args.job_envelope)
+    job = core._parse_job_envelope_args(parser)
 
     try:
-        asyncio.run(run(job))
+        asyncio.run(_run_standalone(job))
     except Exception as exc:  # noqa: BLE001
         print(core._format_exception_for_stderr(exc), file=sys.stderr)
         raise SystemExit(1) from None
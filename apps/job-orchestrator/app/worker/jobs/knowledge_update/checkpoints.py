@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+from typing import Mapping
+
+import asyncpg
+from pydantic import TypeAdapter, ValidationError
+from pydantic_core import to_jsonable_python
+
+from app.job_checkpoint_repository import JobCheckpointRepository
+
+logger = logging.getLogger(__name__)
+
+_CHECKPOINT_STORE_ERRORS = (OSError, asyncpg.PostgresError, asyncpg.InterfaceError)
+
+
+def hash_step_inputs(step_name: str, inputs: Mapping[str, object]) -> str:
+    canonical = json.dumps(
+        {"step": step_name, "inputs": to_jsonable_python(dict(inputs))},
+        sort_keys=True,
+        separators=(",", ":"),
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class StepCheckpoints:
+    """Job-scoped view over persisted step outputs.
+
+    Checkpointing is an optimization: store failures and stale or undecodable rows are logged
+    and treated as a miss, so the step simply runs again.
+    """
+
+    def __init__(self, repository: JobCheckpointRepository, job_id: str) -> None:
+        self._repository = repository
+        self._job_id = job_id
+
+    async def load(self, step_name: str, input_hash: str, output_type: object) -> tuple[bool, object]:
+        try:
+            stored = await self._repository.load(self._job_id, step_name, input_hash)
+        except _CHECKPOINT_STORE_ERRORS as exc:
+            logger.warning(
+                "knowledge.update checkpoint load failed",
+                extra={"job_id": self._job_id, "step": step_name, "error": str(exc)},
+            )
+            return False, None
+        if stored is None:
+            return False, None
+        try:
+            return True, TypeAdapter(output_type).validate_python(stored)
+        except ValidationError as exc:
+            logger.warning(
+                "knowledge.update checkpoint no longer matches step output type",
+                extra={"job_id": self._job_id, "step": step_name, "error": str(exc)},
+            )
+            return False, None
+
+    async def save(self, step_name: str, input_hash: str, output_type: object, value: object) -> None:
+        try:
+            await self._repository.save(
+                self._job_id,
+                step_name,
+                input_hash,
+                TypeAdapter(output_type).dump_python(value, mode="json"),
+            )
+        except _CHECKPOINT_STORE_ERRORS as exc:
+            logger.warning(
+                "knowledge.update checkpoint save failed",
+                extra={"job_id": self._job_id, "step": step_name, "error": str(exc)},
+            )
+
+    async def clear(self) -> None:
+        try:
+            await self._repository.clear(self._job_id)
+        except _CHECKPOINT_STORE_ERRORS as exc:
+            logger.warning(
+                "knowledge.update checkpoint cleanup failed",
+                extra={"job_id": self._job_id, "error": str(exc)},
+            )
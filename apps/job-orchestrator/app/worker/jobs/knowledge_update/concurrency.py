@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+import asyncio
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Awaitable, Callable, Iterable, Iterator, TypeVar
+
+from app.settings import get_settings
+
+_ItemT = TypeVar("_ItemT")
+_ResultT = TypeVar("_ResultT")
+
+_job_semaphore: ContextVar[asyncio.Semaphore | None] = ContextVar("knowledge_update_job_semaphore", default=None)
+
+
+@contextmanager
+def job_concurrency_scope(max_concurrency: int) -> Iterator[asyncio.Semaphore]:
+    """Share one semaphore between every bounded fan-out started inside the current job."""
+
+    semaphore = asyncio.Semaphore(max_concurrency)
+    token = _job_semaphore.set(semaphore)
+    try:
+        yield semaphore
+    finally:
+        _job_semaphore.reset(token)
+
+
+def _current_semaphore() -> asyncio.Semaphore:
+    semaphore = _job_semaphore.get()
+    if semaphore is None:
+        semaphore = asyncio.Semaphore(get_settings().knowledge_update_max_concurrency)
+    return semaphore
+
+
+async def gather_bounded(
+    items: Iterable[_ItemT],
+    call: Callable[[_ItemT], Awaitable[_ResultT]],
+) -> list[_ResultT]:
+    """Run `call` for every item under the job semaphore and return results in input order.
+
+    The first failure cancels the remaining items and is re-raised unchanged, so step-scoped
+    errors surface exactly as they did from sequential loops. Calls must not start a nested
+    `gather_bounded`, because the outer items already hold semaphore slots.
+    """
+
+    semaphore = _current_semaphore()
+
+    async def _run(item: _ItemT) -> _ResultT:
+        async with semaphore:
+            return await call(item)
+
+    tasks = [asyncio.ensure_future(_run(item)) for item in items]
+    if not tasks:
+        return []
+    try:
+        return list(await asyncio.gather(*tasks))
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import re
+from typing import Iterable, Mapping
+
+from app.worker.jobs.knowledge_update.mention_index import MentionIndex
+
+_TURN_HEADER_PATTERN = re.compile(r"^--- TURN .* ---$", re.MULTILINE)
+
+
+def split_batch_turns(document: str) -> tuple[str, list[str]]:
+    """Split a `_build_batch_document` string into its header and its `--- TURN ---` sections."""
+
+    starts = [match.start() for match in _TURN_HEADER_PATTERN.finditer(document)]
+    if not starts:
+        return document, []
+    header = document[: starts[0]]
+    turns = [document[start:end].rstrip() for start, end in zip(starts, [*starts[1:], len(document)])]
+    return header, turns
+
+
+def turn_windows(turn_count: int, size: int, overlap: int) -> list[range]:
+    """Cover `turn_count` turns with windows of `size` turns that share `overlap` turns."""
+
+    if turn_count <= size:
+        return [range(turn_count)]
+    step = max(size - overlap, 1)
+    windows: list[range] = []
+    for start in range(0, turn_count, step):
+        windows.append(range(start, min(start + size, turn_count)))
+        if start + size >= turn_count:
+            break
+    return windows
+
+
+def token_budget_windows(turn_tokens: list[int], max_tokens: int, overlap: int) -> list[range]:
+    """Cover consecutive turns with windows of at most `max_tokens` that share `overlap` turns.
+
+    A turn larger than the budget gets a window of its own rather than being split.
+    """
+
+    windows: list[range] = []
+    start = 0
+    while start < len(turn_tokens):
+        end = start
+        total = 0
+        while end < len(turn_tokens) and (end == start or total + turn_tokens[end] <= max_tokens):
+            total += turn_tokens[end]
+            end += 1
+        windows.append(range(start, end))
+        if end >= len(turn_tokens):
+            break
+        start = max(end - overlap, start + 1)
+    return windows
+
+
+class CooccurrenceMatrix:
+    """Which batch turns each entity is named in (by name or alias).
+
+    Entities that are never named literally (for example only referred to by pronoun) are
+    "unlocated"; they cannot be pruned and stay candidates for every pair and every window.
+    """
+
+    def __init__(self, turns: list[str], surface_forms: Mapping[str, Iterable[str]]) -> None:
+        index = MentionIndex((entity_id, form) for entity_id, forms in surface_forms.items() for form in forms)
+        self.turns_by_entity: dict[str, set[int]] = {entity_id: set() for entity_id in surface_forms}
+        for turn_index, turn in enumerate(turns):
+            for form in index.find(turn):
+                for entity_id in index.owners[form]:
+                    self.turns_by_entity[entity_id].add(turn_index)
+        self.unlocated = {entity_id for entity_id, turn_indexes in self.turns_by_entity.items() if not turn_indexes}
+
+    def entities_in(self, window: range) -> list[str]:
+        return [
+            entity_id
+            for entity_id, turn_indexes in self.turns_by_entity.items()
+            if entity_id in self.unlocated or any(turn_index in window for turn_index in turn_indexes)
+        ]
+
+    def co_occur(self, entity_id_1: str, entity_id_2: str, *, radius: int, window: range | None = None) -> bool:
+        if entity_id_1 in self.unlocated or entity_id_2 in self.unlocated:
+            return True
+        first = self.turns_by_entity[entity_id_1]
+        second = self.turns_by_entity[entity_id_2]
+        if window is not None:
+            first = {turn_index for turn_index in first if turn_index in window}
+            second = {turn_index for turn_index in second if turn_index in window}
+        return any(abs(turn_1 - turn_2) <= radius for turn_1 in first for turn_2 in second)
+
+    def candidate_pairs(self, window: range, *, radius: int) -> list[tuple[str, str]]:
+        entity_ids = self.entities_in(window)
+        return [
+            (entity_id_1, entity_id_2)
+            for position, entity_id_1 in enumerate(entity_ids)
+            for entity_id_2 in entity_ids[position + 1 :]
+            if self.co_occur(entity_id_1, entity_id_2, radius=radius, window=window)
+        ]
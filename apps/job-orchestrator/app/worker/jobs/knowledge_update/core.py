@@ -2,26 +2,56 @@ from __future__ import annotations
 
 import argparse
 import asyncio
+import hashlib
 import json
 import logging
 import random
 import re
 import sys
+import time
 import traceback
-from typing import Awaitable, Callable, TypeVar
+from typing import Awaitable, Callable, Sequence, TypeVar
 from uuid import UUID, NAMESPACE_URL, uuid4, uuid5
 
 import grpc
-from google.protobuf.json_format import ParseError
-from google.protobuf.json_format import MessageToDict, ParseDict
+from google.protobuf.json_format import MessageToDict
 from pydantic import BaseModel, ValidationError
 
 from app.contracts import JobEnvelope, KnowledgeUpdatePayload
 from app.services.grpc import knowledge_pb2
-from app.settings import Settings, get_settings
+from app.settings import Settings
+from app.worker.jobs.knowledge_update.concurrency import gather_bounded
+from app.worker.jobs.knowledge_update.checkpoints import StepCheckpoints
+from app.worker.jobs.knowledge_update.graph_delta import (
+    GraphDeltaBuilder,
+    chunk_graph_delta,
+    property_value,
+    property_value_field,
+    string_property,
+)
+from app.worker.jobs.knowledge_update import prompt_context
+from app.worker.jobs.knowledge_update.embedding_screen import (
+    ScreenedCandidates,
+    candidate_context_text,
+    extracted_entity_text,
+    screen_candidates,
+)
+from app.worker.jobs.knowledge_update.cooccurrence import (
+    CooccurrenceMatrix,
+    split_batch_turns,
+    token_budget_windows,
+    turn_windows,
+)
+from app.worker.jobs.knowledge_update.entity_dedup import merge_window_extractions
+from app.worker.jobs.knowledge_update.prompts import build_prompt, estimate_tokens
+from app.worker.jobs.knowledge_update.quarantine import gather_isolated
+from app.worker.jobs.knowledge_update.mention_index import MentionIndex, mention_candidates
+from app.worker.jobs.knowledge_update.resolution_memo import EntityResolutionMemo
+from app.worker.jobs.knowledge_update.telemetry import current_telemetry
 from app.worker.jobs.knowledge_update_types import (
     CandidateMatchResult,
     EntityExtractionResult,
+    ExtractedEntity,
     FinalEntityContextBlock,
     FinalEntityContextGraph,
     MatchedRelationship,
@@ -33,7 +63,10 @@ logger = logging.getLogger(__name__)
 
 
 _MATCH_DECISION_PATTERN = re.compile(r"^MATCH\((?P<entity_id>[^)]+)\)$")
-_PARSE_DICT_FIELD_PATTERN = re.compile(r"Failed to parse (?P<field>[A-Za-z_][A-Za-z0-9_]*) field")
+_STEP_TWO_WINDOW_OVERLAP_TURNS = 1
+_STEP_SIX_WINDOW_TURNS = 12
+_STEP_SIX_COOCCURRENCE_TURN_RADIUS = 1
+_STEP_TEN_MAX_CANDIDATES_PER_CALL = 40
 _ModelT = TypeVar("_ModelT", bound=BaseModel)
 _ResultT = TypeVar("_ResultT")
 
@@ -131,11 +164,21 @@ async def _call_with_retry(
     base_delay_seconds: float = 0.2,
     max_delay_seconds: float = 2.0,
 ) -> _ResultT:
+    telemetry = current_telemetry()
+    attempt_durations_ms: list[float] = []
     for attempt in range(1, max_attempts + 1):
+        started = time.monotonic()
         try:
-            return await call()
+            result = await call()
         except Exception as exc:  # noqa: BLE001
+            attempt_durations_ms.append((time.monotonic() - started) * 1000)
             if not _is_transient_error(exc) or attempt >= max_attempts:
+                if telemetry is not None:
+                    telemetry.record_operation(
+                        step_name=step_name,
+                        operation=operation,
+                        attempt_durations_ms=attempt_durations_ms,
+                    )
                 logger.error(
                     "knowledge.update step operation failed",
                     extra={
@@ -168,6 +211,17 @@ async def _call_with_retry(
                 },
             )
             await asyncio.sleep(delay_seconds)
+            continue
+
+        attempt_durations_ms.append((time.monotonic() - started) * 1000)
+        if telemetry is not None:
+            telemetry.record_operation(
+                step_name=step_name,
+                operation=operation,
+                attempt_durations_ms=attempt_durations_ms,
+                result=result,
+            )
+        return result
 
     raise RuntimeError("knowledge.update retry loop exhausted")
 
@@ -187,23 +241,6 @@ def _validate_model(step_name: str, model: type[_ModelT], payload: object) -> _M
         raise RuntimeError(f"knowledge.update {step_name} validation failed: {summary}") from exc
 
 
-def _extract_parse_dict_field_path(exc: ParseError) -> str:
-    parts = _PARSE_DICT_FIELD_PATTERN.findall(str(exc))
-    if parts:
-        return ".".join(parts)
-    return "<unknown>"
-
-
-def _validate_upsert_graph_delta_payload(step_name: str, payload: dict[str, object]) -> knowledge_pb2.UpsertGraphDeltaRequest:
-    try:
-        return ParseDict(payload, knowledge_pb2.UpsertGraphDeltaRequest())
-    except ParseError as exc:
-        field_path = _extract_parse_dict_field_path(exc)
-        raise RuntimeError(
-            f"knowledge.update {step_name} validation failed at '{field_path}': {exc}"
-        ) from exc
-
-
 class _StepFiveComparisonDecision(BaseModel):
     model_config = {"extra": "forbid"}
 
@@ -259,14 +296,6 @@ def _message_entity_name(journal_reference: str, sequence_number: int) -> str:
     return f"{journal_reference} message {sequence_number}"
 
 
-def _default_edge_properties(confidence: float, provenance_hint: str = "placeholder") -> list[dict[str, object]]:
-    return [
-        {"key": "confidence", "float_value": float(confidence)},
-        {"key": "status", "string_value": "asserted"},
-        {"key": "provenance_hint", "string_value": provenance_hint},
-    ]
-
-
 def _require_created_at(created_at: str | None, sequence_number: int) -> str:
     if created_at:
         return created_at
@@ -283,7 +312,7 @@ def _message_to_dict(reply: object, *, rpc_name: str) -> dict[str, object]:
 async def _build_upsert_graph_delta_step_one(
     channel: grpc.aio.Channel,
     payload: KnowledgeUpdatePayload,
-) -> dict[str, object]:
+) -> knowledge_pb2.UpsertGraphDeltaRequest:
     get_user_init_graph = channel.unary_unary(
         "/exobrain.knowledge.v1.KnowledgeInterface/GetUserInitGraph",
         request_serializer=knowledge_pb2.GetUserInitGraphRequest.SerializeToString,
@@ -300,80 +329,29 @@ async def _build_upsert_graph_delta_step_one(
         ),
     )
 
-    request = knowledge_pb2.UpsertGraphDeltaRequest()
+    builder = GraphDeltaBuilder(payload.requested_by_user_id)
     for sequence_number, message in enumerate(payload.messages, start=1):
         created_at = _require_created_at(message.created_at, sequence_number)
         message_entity_id = str(uuid5(NAMESPACE_URL, f"{payload.journal_reference}:message:{sequence_number}"))
         message_block_id = str(uuid5(NAMESPACE_URL, f"{payload.journal_reference}:block:{sequence_number}"))
 
-        request.entities.append(
-            knowledge_pb2.EntityNode(
-                id=message_entity_id,
-                type_id="node.chat_message",
-                user_id=payload.requested_by_user_id,
-                visibility=knowledge_pb2.PRIVATE,
-                properties=[
-                    knowledge_pb2.PropertyValue(
-                        key="name", string_value=_message_entity_name(payload.journal_reference, sequence_number)
-                    ),
-                    knowledge_pb2.PropertyValue(key="start", datetime_value=created_at),
-                    knowledge_pb2.PropertyValue(key="end", datetime_value=created_at),
-                ],
-            )
-        )
-        request.blocks.append(
-            knowledge_pb2.BlockNode(
-                id=message_block_id,
-                type_id="node.block",
-                user_id=payload.requested_by_user_id,
-                visibility=knowledge_pb2.PRIVATE,
-                properties=[
-                    knowledge_pb2.PropertyValue(key="text", string_value=message.content or ""),
-                ],
-            )
-        )
-        request.edges.extend(
+        builder.add_entity(
+            message_entity_id,
+            "node.chat_message",
             [
-                knowledge_pb2.GraphEdge(
-                    from_id=message_entity_id,
-                    to_id=init_graph.person_entity_id,
-                    edge_type="SENT_TO",
-                    user_id=payload.requested_by_user_id,
-                    visibility=knowledge_pb2.PRIVATE,
-                    properties=[
-                        knowledge_pb2.PropertyValue(key="confidence", float_value=1.0),
-                        knowledge_pb2.PropertyValue(key="status", string_value="asserted"),
-                        knowledge_pb2.PropertyValue(key="provenance_hint", string_value="placeholder"),
-                    ],
-                ),
-                knowledge_pb2.GraphEdge(
-                    from_id=message_entity_id,
-                    to_id=init_graph.assistant_entity_id,
-                    edge_type="SENT_BY",
-                    user_id=payload.requested_by_user_id,
-                    visibility=knowledge_pb2.PRIVATE,
-                    properties=[
-                        knowledge_pb2.PropertyValue(key="confidence", float_value=1.0),
-                        knowledge_pb2.PropertyValue(key="status", string_value="asserted"),
-                        knowledge_pb2.PropertyValue(key="provenance_hint", string_value="placeholder"),
-                    ],
-                ),
-                knowledge_pb2.GraphEdge(
-                    from_id=message_entity_id,
-                    to_id=message_block_id,
-                    edge_type="DESCRIBED_BY",
-                    user_id=payload.requested_by_user_id,
-                    visibility=knowledge_pb2.PRIVATE,
-                    properties=[
-                        knowledge_pb2.PropertyValue(key="confidence", float_value=1.0),
-                        knowledge_pb2.PropertyValue(key="status", string_value="asserted"),
-                        knowledge_pb2.PropertyValue(key="provenance_hint", string_value="placeholder"),
-                    ],
+                knowledge_pb2.PropertyValue(
+                    key="name", string_value=_message_entity_name(payload.journal_reference, sequence_number)
                 ),
-            ]
+                knowledge_pb2.PropertyValue(key="start", datetime_value=created_at),
+                knowledge_pb2.PropertyValue(key="end", datetime_value=created_at),
+            ],
         )
+        builder.add_block(message_block_id, message.content or "")
+        builder.add_edge(message_entity_id, init_graph.person_entity_id, "SENT_TO")
+        builder.add_edge(message_entity_id, init_graph.assistant_entity_id, "SENT_BY")
+        builder.add_edge(message_entity_id, message_block_id, "DESCRIBED_BY")
 
-    return _message_to_dict(request, rpc_name="UpsertGraphDeltaRequest")
+    return builder.build()
 
 
 def _canonicalize_speaker(role: str | None) -> str:
@@ -467,14 +445,35 @@ def _build_step_two_entity_extraction_system_prompt(entity_schema_context: dict[
     return build_step_two_entity_extraction_system_prompt(entity_schema_context)
 
 
+def _step_two_window_documents(markdown_document: str, window_tokens: int) -> list[str]:
+    """Split a batch document that exceeds `window_tokens` into overlapping turn-aligned windows.
+
+    Every window repeats the batch header and the last turn of the previous window, so an
+    entity introduced at a window boundary keeps its context.
+    """
+
+    if estimate_tokens(markdown_document) <= window_tokens:
+        return [markdown_document]
+    header, turns = split_batch_turns(markdown_document)
+    if len(turns) < 2:
+        return [markdown_document]
+    header = header.rstrip()
+    windows = token_budget_windows(
+        [estimate_tokens(turn) for turn in turns],
+        max(window_tokens - estimate_tokens(header), 1),
+        overlap=_STEP_TWO_WINDOW_OVERLAP_TURNS,
+    )
+    return ["\n\n".join([header, *(turns[index] for index in window)]).strip() for window in windows]
+
+
 async def _run_step_two_entity_extraction(
     channel: grpc.aio.Channel,
     payload: KnowledgeUpdatePayload,
     markdown_document: str,
     settings: Settings,
 ) -> EntityExtractionResult:
-    from langchain.agents import create_agent
-    from app.services.model_provider_chat_model import ModelProviderChatModel, build_strict_response_format
+    from app.services.model_provider_chat_model import build_strict_response_format
+    from app.services.model_provider_structured_completion import StructuredCompletionClient
 
     get_entity_extraction_schema_context_rpc = channel.unary_unary(
         "/exobrain.knowledge.v1.KnowledgeInterface/GetEntityExtractionSchemaContext",
@@ -492,25 +491,36 @@ async def _run_step_two_entity_extraction(
     )
     context_dict = _message_to_dict(context_reply, rpc_name="GetEntityExtractionSchemaContext")
 
-    compiled_agent = create_agent(
-        model=ModelProviderChatModel(
-            model=settings.knowledge_update_extraction_model,
-            base_url=settings.model_provider_base_url,
-            timeout=settings.knowledge_update_model_provider_timeout_seconds,
-        ),
-        tools=[],
+    completion_client = StructuredCompletionClient(
+        model=settings.knowledge_update_extraction_model,
+        base_url=settings.model_provider_base_url,
+        timeout=settings.knowledge_update_model_provider_timeout_seconds,
         system_prompt=_build_step_two_entity_extraction_system_prompt(context_dict),
         response_format=build_strict_response_format(_build_step_two_entity_extraction_json_schema()),
     )
-    reply = await _call_with_retry(
-        step_name="step two",
-        operation="entity_extraction_agent.ainvoke",
-        call=lambda: compiled_agent.ainvoke({"messages": [{"role": "user", "content": markdown_document}]}),
-    )
-    structured = reply.get("structured_response") if isinstance(reply, dict) else None
-    if not isinstance(structured, dict):
-        raise RuntimeError("knowledge.update step two validation failed: missing structured_response")
-    return _validate_model("step two", EntityExtractionResult, structured)
+
+    async def _extract_window(window_document: str) -> EntityExtractionResult:
+        reply = await _call_with_retry(
+            step_name="step two",
+            operation="entity_extraction_agent.ainvoke",
+            call=lambda: completion_client.ainvoke({"messages": [{"role": "user", "content": window_document}]}),
+        )
+        structured = reply.get("structured_response") if isinstance(reply, dict) else None
+        if not isinstance(structured, dict):
+            raise RuntimeError("knowledge.update step two validation failed: missing structured_response")
+        return _validate_model("step two", EntityExtractionResult, structured)
+
+    window_documents = _step_two_window_documents(markdown_document, settings.knowledge_update_extraction_window_tokens)
+    if len(window_documents) > 1:
+        logger.info(
+            "knowledge.update step two split batch document into windows",
+            extra={
+                "document_tokens_estimate": estimate_tokens(markdown_document),
+                "windows": len(window_documents),
+                "window_tokens": settings.knowledge_update_extraction_window_tokens,
+            },
+        )
+    return merge_window_extractions(await gather_bounded(window_documents, _extract_window))
 
 
 def _classify_candidate_matches(candidates: list[dict[str, object]]) -> dict[str, object]:
@@ -541,19 +551,88 @@ def _classify_candidate_matches(candidates: list[dict[str, object]]) -> dict[str
     }
 
 
+async def _verify_remembered_entity(
+    channel: grpc.aio.Channel,
+    payload: KnowledgeUpdatePayload,
+    extracted_entity: ExtractedEntity,
+    entity_id: str,
+) -> dict[str, object] | None:
+    """Return the remembered entity if the graph still has it under the extracted type, else None.
+
+    RPC failures raise KnowledgeUpdateStepError: an unreachable knowledge interface says nothing
+    about whether the entity is gone.
+    """
+
+    get_entity_context_rpc = channel.unary_unary(
+        "/exobrain.knowledge.v1.KnowledgeInterface/GetEntityContext",
+        request_serializer=knowledge_pb2.GetEntityContextRequest.SerializeToString,
+        response_deserializer=knowledge_pb2.GetEntityContextReply.FromString,
+    )
+    # Same depth as step eight's context fetch, so the job cache serves that call afterwards.
+    context_reply = await _call_with_retry(
+        step_name="step three",
+        operation="GetEntityContext",
+        call=lambda: get_entity_context_rpc(
+            knowledge_pb2.GetEntityContextRequest(
+                entity_id=entity_id,
+                user_id=payload.requested_by_user_id,
+                max_block_level=2,
+            )
+        ),
+    )
+    if context_reply is None or context_reply.entity.id != entity_id:
+        return None
+    if context_reply.entity.type_id != extracted_entity.node_type:
+        return None
+    return {
+        "entity_id": entity_id,
+        "entity_name": context_reply.entity.name,
+        "entity_type_id": context_reply.entity.type_id,
+    }
+
+
 async def _run_step_three_entity_candidate_matching(
     channel: grpc.aio.Channel,
     payload: KnowledgeUpdatePayload,
     extraction: EntityExtractionResult,
+    resolution_memo: EntityResolutionMemo | None = None,
 ) -> list[CandidateMatchResult]:
     find_candidates_rpc = channel.unary_unary(
         "/exobrain.knowledge.v1.KnowledgeInterface/FindEntityCandidates",
         request_serializer=knowledge_pb2.FindEntityCandidatesRequest.SerializeToString,
         response_deserializer=knowledge_pb2.FindEntityCandidatesReply.FromString,
     )
+    memo_hits = await resolution_memo.lookup(extraction.extracted_entities) if resolution_memo is not None else {}
+    stale_entity_ids: list[str] = []
+
+    async def _match_entity(item: tuple[int, ExtractedEntity]) -> CandidateMatchResult:
+        index, extracted_entity = item
+        if index in memo_hits:
+            entity_id, confidence = memo_hits[index]
+            try:
+                remembered = await _verify_remembered_entity(channel, payload, extracted_entity, entity_id)
+            except KnowledgeUpdateStepError as exc:
+                # Treat as a miss but keep the memo row; only the graph reporting the entity gone invalidates it.
+                logger.info(
+                    "knowledge.update step three remembered entity could not be verified",
+                    extra={"entity_id": entity_id, "error": str(exc)},
+                )
+            else:
+                if remembered is not None:
+                    return _validate_model(
+                        "step three",
+                        CandidateMatchResult,
+                        {
+                            "entity_index": index,
+                            "extracted_entity": extracted_entity.model_dump(),
+                            "candidate_matches": [{**remembered, "score": confidence}],
+                            "status": "matched",
+                            "candidate_entity_ids": [],
+                            "matched_entity_id": entity_id,
+                        },
+                    )
+                stale_entity_ids.append(entity_id)
 
-    results: list[CandidateMatchResult] = []
-    for index, extracted_entity in enumerate(extraction.extracted_entities):
         alias_names = [alias for alias in extracted_entity.aliases if isinstance(alias, str)]
         entity_name = extracted_entity.name
         names = [name for name in [entity_name, *alias_names] if name]
@@ -572,19 +651,20 @@ async def _run_step_three_entity_candidate_matching(
                 )
             ),
         )
-        candidate_dicts = _message_to_dict(candidates_reply, rpc_name="FindEntityCandidates").get("candidates", [])
-        classification = _classify_candidate_matches(
-            [candidate for candidate in candidate_dicts if isinstance(candidate, dict)]
-        )
+        candidate_dicts = prompt_context.candidate_matches(candidates_reply)
+        classification = _classify_candidate_matches(candidate_dicts)
         result_payload = {
             "entity_index": index,
             "extracted_entity": extracted_entity.model_dump(),
-            "candidate_matches": [item for item in candidate_dicts if isinstance(item, dict)],
+            "candidate_matches": candidate_dicts,
             **classification,
         }
-        results.append(_validate_model("step three", CandidateMatchResult, result_payload))
+        return _validate_model("step three", CandidateMatchResult, result_payload)
 
-    return results
+    matches = await gather_bounded(list(enumerate(extraction.extracted_entities)), _match_entity)
+    if stale_entity_ids and resolution_memo is not None:
+        await resolution_memo.forget(stale_entity_ids)
+    return matches
 
 
 def _build_step_four_entity_context_schema() -> dict[str, object]:
@@ -602,9 +682,9 @@ async def _run_step_four_create_entity_contexts(
     extraction: EntityExtractionResult,
     markdown_document: str,
     settings: Settings,
-) -> list[str]:
-    from langchain.agents import create_agent
-    from app.services.model_provider_chat_model import ModelProviderChatModel, build_strict_response_format
+) -> list[str | None]:
+    from app.services.model_provider_chat_model import build_strict_response_format
+    from app.services.model_provider_structured_completion import StructuredCompletionClient
 
     system_prompt = "\n\n".join(
         [
@@ -621,37 +701,37 @@ async def _run_step_four_create_entity_contexts(
         ]
     )
 
-    compiled_agent = create_agent(
-        model=ModelProviderChatModel(
-            model="reasoner",
-            base_url=settings.model_provider_base_url,
-            timeout=settings.knowledge_update_model_provider_timeout_seconds,
-        ),
-        tools=[],
+    completion_client = StructuredCompletionClient(
+        model="reasoner",
+        base_url=settings.model_provider_base_url,
+        timeout=settings.knowledge_update_model_provider_timeout_seconds,
         system_prompt=system_prompt,
         response_format=build_strict_response_format(_build_step_four_entity_context_schema()),
     )
 
-    documents: list[str] = []
-    for extracted_entity in extraction.extracted_entities:
-        prompt = json.dumps(
-            {
-                "entity": extracted_entity.model_dump(),
-                "markdown_batch_document": markdown_document,
-            },
-            ensure_ascii=False,
+    async def _create_entity_context(extracted_entity: ExtractedEntity) -> str:
+        prompt = build_prompt(
+            step_name="step four",
+            shared={"markdown_batch_document": markdown_document},
+            specific={"entity": extracted_entity.model_dump()},
         )
         reply = await _call_with_retry(
             step_name="step four",
             operation="entity_context_agent.ainvoke",
-            call=lambda: compiled_agent.ainvoke({"messages": [{"role": "user", "content": prompt}]}),
+            call=lambda: completion_client.ainvoke({"messages": [{"role": "user", "content": prompt}]}),
         )
         structured = reply.get("structured_response") if isinstance(reply, dict) else None
         if not isinstance(structured, dict) or not isinstance(structured.get("focused_markdown"), str):
             raise RuntimeError("knowledge.update step four reasoner returned invalid focused_markdown")
         parsed = _validate_model("step four", _StepFourEntityContextResult, structured)
-        documents.append(parsed.focused_markdown)
-    return documents
+        return parsed.focused_markdown
+
+    return await gather_isolated(
+        extraction.extracted_entities,
+        _create_entity_context,
+        step_name="step four",
+        describe=lambda extracted_entity: extracted_entity.name,
+    )
 
 
 def _build_step_five_comparison_schema() -> dict[str, object]:
@@ -694,15 +774,93 @@ def _resolve_step_five_decision(decision: str, candidate_entity_ids: list[str])
     return matched_entity_id
 
 
+async def _screen_step_five_candidates(
+    candidate_matching: list[CandidateMatchResult],
+    entity_context_documents: list[str | None],
+    context_by_candidate_id: dict[str, dict[str, object]],
+    settings: Settings,
+) -> dict[int, ScreenedCandidates]:
+    """Embed extracted entities and candidate contexts once and resolve the clear comparisons.
+
+    Returns screens by extracted-entity index. An embedding failure only costs the fast path:
+    it is logged and every comparison goes to the model.
+    """
+
+    from app.services.model_provider_embeddings import cosine_similarity_matrix, embed_texts
+
+    comparisons = [
+        match_item
+        for match_item in candidate_matching
+        if match_item.status == "needs_detailed_comparison"
+        and any(isinstance(candidate_id, str) for candidate_id in match_item.candidate_entity_ids)
+    ]
+    if not comparisons:
+        return {}
+    candidate_ids = list(context_by_candidate_id)
+    texts = [
+        extracted_entity_text(
+            match_item.extracted_entity,
+            (entity_context_documents[match_item.entity_index] or "")
+            if 0 <= match_item.entity_index < len(entity_context_documents)
+            else "",
+        )
+        for match_item in comparisons
+    ] + [candidate_context_text(context_by_candidate_id[candidate_id]) for candidate_id in candidate_ids]
+
+    try:
+        vectors = await _call_with_retry(
+            step_name="step five",
+            operation="embedding_model.aembed",
+            call=lambda: embed_texts(
+                texts,
+                model=settings.knowledge_update_embedding_model,
+                base_url=settings.model_provider_base_url,
+                timeout=settings.knowledge_update_model_provider_timeout_seconds,
+            ),
+            max_attempts=2,
+        )
+    except KnowledgeUpdateStepError as exc:
+        logger.warning(
+            "knowledge.update step five embedding screen failed, comparing every candidate",
+            extra={"error": str(exc)},
+        )
+        return {}
+
+    similarities = cosine_similarity_matrix(vectors[: len(comparisons)], vectors[len(comparisons) :])
+    column_by_candidate_id = {candidate_id: column for column, candidate_id in enumerate(candidate_ids)}
+    screened: dict[int, ScreenedCandidates] = {}
+    for match_item, row in zip(comparisons, similarities):
+        screened[match_item.entity_index] = screen_candidates(
+            {
+                candidate_id: row[column_by_candidate_id[candidate_id]]
+                for candidate_id in match_item.candidate_entity_ids
+                if isinstance(candidate_id, str)
+            },
+            match_threshold=settings.knowledge_update_embedding_match_threshold,
+            distinct_threshold=settings.knowledge_update_embedding_distinct_threshold,
+        )
+    logger.info(
+        "knowledge.update step five embedding screen",
+        extra={
+            "comparisons": len(comparisons),
+            "matched": sum(1 for item in screened.values() if item.matched_entity_id),
+            "new_entities": sum(
+                1 for item in screened.values() if not item.matched_entity_id and not item.remaining_candidate_ids
+            ),
+        },
+    )
+    return screened
+
+
 async def _run_step_five_detailed_comparison(
     channel: grpc.aio.Channel,
     payload: KnowledgeUpdatePayload,
     candidate_matching: list[CandidateMatchResult],
-    entity_context_documents: list[str],
+    entity_context_documents: list[str | None],
     settings: Settings,
 ) -> list[ResolvedEntity]:
-    from langchain.agents import create_agent
-    from app.services.model_provider_chat_model import ModelProviderChatModel, build_strict_response_format
+    from app.services.model_provider_chat_model import build_strict_response_format
+    from app.services.model_provider_structured_completion import StructuredCompletionClient
 
     get_entity_context_rpc = channel.unary_unary(
         "/exobrain.knowledge.v1.KnowledgeInterface/GetEntityContext",
@@ -710,13 +868,10 @@ async def _run_step_five_detailed_comparison(
         response_deserializer=knowledge_pb2.GetEntityContextReply.FromString,
     )
 
-    comparison_agent = create_agent(
-        model=ModelProviderChatModel(
-            model="worker",
-            base_url=settings.model_provider_base_url,
-            timeout=settings.knowledge_update_model_provider_timeout_seconds,
-        ),
-        tools=[],
+    comparison_client = StructuredCompletionClient(
+        model="worker",
+        base_url=settings.model_provider_base_url,
+        timeout=settings.knowledge_update_model_provider_timeout_seconds,
         system_prompt=(
             "You are the knowledge.update detailed comparison worker. "
             "Compare extracted entity context markdown against candidate entity contexts. "
@@ -725,42 +880,84 @@ async def _run_step_five_detailed_comparison(
         response_format=build_strict_response_format(_build_step_five_comparison_schema()),
     )
 
-    resolved_entities: list[ResolvedEntity] = []
-    for match_item in candidate_matching:
+    # Entities quarantined in step four have no context document and are not resolved.
+    candidate_matching = [
+        match_item
+        for match_item in candidate_matching
+        if not 0 <= match_item.entity_index < len(entity_context_documents)
+        or entity_context_documents[match_item.entity_index] is not None
+    ]
+    candidate_ids_to_fetch = list(
+        dict.fromkeys(
+            candidate_id
+            for match_item in candidate_matching
+            if match_item.status == "needs_detailed_comparison"
+            for candidate_id in match_item.candidate_entity_ids
+            if isinstance(candidate_id, str)
+        )
+    )
+
+    async def _fetch_candidate_context(candidate_id: str) -> dict[str, object]:
+        context_reply = await _call_with_retry(
+            step_name="step five",
+            operation="GetEntityContext",
+            call=lambda: get_entity_context_rpc(
+                knowledge_pb2.GetEntityContextRequest(
+                    entity_id=candidate_id,
+                    user_id=payload.requested_by_user_id,
+                    max_block_level=1,
+                )
+            ),
+        )
+        return prompt_context.entity_context(context_reply)
+
+    fetched_contexts = await gather_bounded(candidate_ids_to_fetch, _fetch_candidate_context)
+    context_by_candidate_id = dict(zip(candidate_ids_to_fetch, fetched_contexts))
+    screened_by_index: dict[int, ScreenedCandidates] = {}
+    if settings.knowledge_update_embedding_model:
+        screened_by_index = await _screen_step_five_candidates(
+            candidate_matching,
+            entity_context_documents,
+            context_by_candidate_id,
+            settings,
+        )
+
+    async def _resolve_entity(match_item: CandidateMatchResult) -> ResolvedEntity:
         extracted_entity = match_item.extracted_entity
 
         status = match_item.status
         resolution_status = "new_entity"
+        match_similarity: float | None = None
         resolved_entity_id: str
+        screened = screened_by_index.get(match_item.entity_index) if status == "needs_detailed_comparison" else None
         if status == "matched" and match_item.matched_entity_id:
             resolved_entity_id = match_item.matched_entity_id
             resolution_status = "matched"
+        elif screened is not None and screened.matched_entity_id:
+            resolved_entity_id = screened.matched_entity_id
+            resolution_status = "matched"
+            match_similarity = screened.match_similarity
+        elif screened is not None and not screened.remaining_candidate_ids:
+            resolved_entity_id = str(uuid4())
         elif status == "needs_detailed_comparison":
             entity_index = int(match_item.entity_index)
-            focused_markdown = entity_context_documents[entity_index] if 0 <= entity_index < len(entity_context_documents) else ""
-            candidate_ids = [item for item in match_item.candidate_entity_ids if isinstance(item, str)]
-            candidate_contexts: list[dict[str, object]] = []
-            for candidate_id in candidate_ids:
-                context_reply = await _call_with_retry(
-                    step_name="step five",
-                    operation="GetEntityContext",
-                    call=lambda: get_entity_context_rpc(
-                        knowledge_pb2.GetEntityContextRequest(
-                            entity_id=candidate_id,
-                            user_id=payload.requested_by_user_id,
-                            max_block_level=1,
-                        )
-                    ),
-                )
-                candidate_contexts.append(_message_to_dict(context_reply, rpc_name="GetEntityContext"))
+            focused_markdown = (
+                (entity_context_documents[entity_index] or "") if 0 <= entity_index < len(entity_context_documents) else ""
+            )
+            candidate_ids = (
+                screened.remaining_candidate_ids
+                if screened is not None
+                else [item for item in match_item.candidate_entity_ids if isinstance(item, str)]
+            )
+            candidate_contexts = [context_by_candidate_id[candidate_id] for candidate_id in candidate_ids]
 
-            prompt = json.dumps(
-                {
+            prompt = build_prompt(
+                step_name="step five",
+                specific={
                     "extracted_entity": extracted_entity.model_dump(),
                     "extracted_entity_markdown": focused_markdown,
                     "candidate_contexts": candidate_contexts,
                 },
-                ensure_ascii=False,
             )
             prompt_message = {"role": "user", "content": prompt}
             validation_error: RuntimeError | None = None
@@ -770,7 +967,7 @@ async def _run_step_five_detailed_comparison(
                 reply = await _call_with_retry(
                     step_name="step five",
                     operation="detailed_comparison_agent.ainvoke",
-                    call=lambda: comparison_agent.ainvoke({"messages": [prompt_message]}),
+                    call=lambda: comparison_client.ainvoke({"messages": [prompt_message]}),
                 )
                 structured = reply.get("structured_response") if isinstance(reply, dict) else None
                 if not isinstance(structured, dict):
@@ -814,10 +1011,17 @@ async def _run_step_five_detailed_comparison(
             "extracted_entity": extracted_entity.model_dump(),
             "resolved_entity_id": resolved_entity_id,
             "resolution_status": resolution_status,
+            "match_similarity": match_similarity,
         }
-        resolved_entities.append(_validate_model("step five", ResolvedEntity, resolved_payload))
+        return _validate_model("step five", ResolvedEntity, resolved_payload)
 
-    return resolved_entities
+    resolved_entities = await gather_isolated(
+        candidate_matching,
+        _resolve_entity,
+        step_name="step five",
+        describe=lambda match_item: match_item.extracted_entity.name,
+    )
+    return [resolved for resolved in resolved_entities if resolved is not None]
 
 
 def _build_step_six_relationship_extraction_schema() -> dict[str, object]:
@@ -874,57 +1078,92 @@ async def _run_step_six_relationship_extraction(
     markdown_document: str,
     settings: Settings,
 ) -> list[RelationshipPair]:
-    from langchain.agents import create_agent
-    from app.services.model_provider_chat_model import ModelProviderChatModel, build_strict_response_format
+    from app.services.model_provider_chat_model import build_strict_response_format
+    from app.services.model_provider_structured_completion import StructuredCompletionClient
 
-    extracted_entities_with_ids = [
-        {
+    entity_by_id = {
+        item.resolved_entity_id: {
             "entity_id": item.resolved_entity_id,
             "name": item.extracted_entity.name,
             "node_type": item.extracted_entity.node_type,
         }
         for item in resolved_entities
-    ]
-    valid_entity_ids = {
-        entity.get("entity_id")
-        for entity in extracted_entities_with_ids
-        if isinstance(entity.get("entity_id"), str)
     }
+    valid_entity_ids = set(entity_by_id)
 
-    relationship_agent = create_agent(
-        model=ModelProviderChatModel(
-            model="worker",
-            base_url=settings.model_provider_base_url,
-            timeout=settings.knowledge_update_model_provider_timeout_seconds,
-        ),
-        tools=[],
+    header, turns = split_batch_turns(markdown_document)
+    matrix = CooccurrenceMatrix(
+        turns,
+        {
+            item.resolved_entity_id: [item.extracted_entity.name, *item.extracted_entity.aliases]
+            for item in resolved_entities
+        },
+    )
+    windows: list[tuple[str, list[str], list[tuple[str, str]]]] = []
+    for window in turn_windows(len(turns), _STEP_SIX_WINDOW_TURNS, _STEP_SIX_COOCCURRENCE_TURN_RADIUS):
+        candidate_pairs = matrix.candidate_pairs(window, radius=_STEP_SIX_COOCCURRENCE_TURN_RADIUS)
+        if not candidate_pairs:
+            continue
+        window_document = "\n\n".join([header.rstrip(), *(turns[index] for index in window)]).strip() if turns else header
+        windows.append((window_document, matrix.entities_in(window), candidate_pairs))
+    logger.info(
+        "knowledge.update step six co-occurrence pruning",
+        extra={
+            "entities": len(entity_by_id),
+            "turns": len(turns),
+            "unlocated_entities": len(matrix.unlocated),
+            "windows": len(windows),
+            "candidate_pairs": sum(len(candidate_pairs) for _, _, candidate_pairs in windows),
+        },
+    )
+    if not windows:
+        return []
+
+    relationship_client = StructuredCompletionClient(
+        model="worker",
+        base_url=settings.model_provider_base_url,
+        timeout=settings.knowledge_update_model_provider_timeout_seconds,
         system_prompt=(
             "You are the knowledge.update relationship extraction worker. "
             "Identify entity pairs that are related in the markdown batch document. "
+            "Only choose pairs from candidate_pairs. "
             "Return strict JSON only with entity_pairs."
         ),
         response_format=build_strict_response_format(_build_step_six_relationship_extraction_schema()),
     )
 
-    prompt = json.dumps(
-        {
-            "entities": extracted_entities_with_ids,
-            "markdown_batch_document": markdown_document,
-        },
-        ensure_ascii=False,
-    )
-    reply = await _call_with_retry(
-        step_name="step six",
-        operation="relationship_extraction_agent.ainvoke",
-        call=lambda: relationship_agent.ainvoke({"messages": [{"role": "user", "content": prompt}]}),
-    )
-    structured = reply.get("structured_response") if isinstance(reply, dict) else None
-    if not isinstance(structured, dict):
-        raise RuntimeError("knowledge.update step six validation failed: missing structured_response")
-    pairs_payload = _validate_model("step six", _StepSixRelationshipExtractionResult, structured)
-    return _deduplicate_entity_pairs(pairs_payload.entity_pairs, valid_entity_ids)
-
+    async def _extract_window(
+        window: tuple[str, list[str], list[tuple[str, str]]],
+    ) -> list[RelationshipPair]:
+        window_document, window_entity_ids, candidate_pairs = window
+        prompt = build_prompt(
+            step_name="step six",
+            shared={"markdown_batch_document": window_document},
+            specific={
+                "entities": [entity_by_id[entity_id] for entity_id in window_entity_ids],
+                "candidate_pairs": [
+                    {"entity_id_1": entity_id_1, "entity_id_2": entity_id_2}
+                    for entity_id_1, entity_id_2 in candidate_pairs
+                ],
+            },
+        )
+        reply = await _call_with_retry(
+            step_name="step six",
+            operation="relationship_extraction_agent.ainvoke",
+            call=lambda: relationship_client.ainvoke({"messages": [{"role": "user", "content": prompt}]}),
+        )
+        structured = reply.get("structured_response") if isinstance(reply, dict) else None
+        if not isinstance(structured, dict):
+            raise RuntimeError("knowledge.update step six validation failed: missing structured_response")
+        allowed = {tuple(sorted(pair)) for pair in candidate_pairs}
+        return [
+            pair
+            for pair in _validate_model("step six", _StepSixRelationshipExtractionResult, structured).entity_pairs
+            if tuple(sorted((pair.entity_id_1, pair.entity_id_2))) in allowed
+        ]
 
+    window_pairs = await gather_bounded(windows, _extract_window)
+    return _deduplicate_entity_pairs([pair for pairs in window_pairs for pair in pairs], valid_entity_ids)
 
 
 def _build_edge_extraction_schema_context_request(
@@ -962,12 +1201,12 @@ async def _run_step_seven_match_relationship_type_and_score(
     channel: grpc.aio.Channel,
     payload: KnowledgeUpdatePayload,
     resolved_entities: list[ResolvedEntity],
-    entity_context_documents: list[str],
+    entity_context_documents: list[str | None],
     entity_pairs: list[RelationshipPair],
     settings: Settings,
 ) -> list[MatchedRelationship]:
-    from langchain.agents import create_agent
-    from app.services.model_provider_chat_model import ModelProviderChatModel, build_strict_response_format
+    from app.services.model_provider_chat_model import build_strict_response_format
+    from app.services.model_provider_structured_completion import StructuredCompletionClient
 
     get_edge_extraction_schema_context_rpc = channel.unary_unary(
         "/exobrain.knowledge.v1.KnowledgeInterface/GetEdgeExtractionSchemaContext",
@@ -979,7 +1218,9 @@ async def _run_step_seven_match_relationship_type_and_score(
     for item in resolved_entities:
         entity_id = item.resolved_entity_id
         entity_index = int(item.entity_index)
-        focused_markdown = entity_context_documents[entity_index] if 0 <= entity_index < len(entity_context_documents) else ""
+        focused_markdown = (
+            (entity_context_documents[entity_index] or "") if 0 <= entity_index < len(entity_context_documents) else ""
+        )
         resolution_by_id[entity_id] = {
             "entity_id": entity_id,
             "node_type": item.extracted_entity.node_type,
@@ -987,13 +1228,10 @@ async def _run_step_seven_match_relationship_type_and_score(
             "focused_markdown": focused_markdown,
         }
 
-    relationship_match_agent = create_agent(
-        model=ModelProviderChatModel(
-            model="worker",
-            base_url=settings.model_provider_base_url,
-            timeout=settings.knowledge_update_model_provider_timeout_seconds,
-        ),
-        tools=[],
+    relationship_match_client = StructuredCompletionClient(
+        model="worker",
+        base_url=settings.model_provider_base_url,
+        timeout=settings.knowledge_update_model_provider_timeout_seconds,
         system_prompt=(
             "You are the knowledge.update relationship matching worker. "
             "Given two entities, their focused contexts, and allowed edge schema context, return the best "
@@ -1003,8 +1241,8 @@ async def _run_step_seven_match_relationship_type_and_score(
         response_format=build_strict_response_format(_build_step_seven_relationship_match_schema()),
     )
 
-    matched_relationships: list[MatchedRelationship] = []
     skipped_invalid = 0
+    valid_pairs: list[tuple[dict[str, object], dict[str, object], str, str]] = []
     for pair in entity_pairs:
         entity_id_1 = pair.entity_id_1
         entity_id_2 = pair.entity_id_2
@@ -1019,7 +1257,12 @@ async def _run_step_seven_match_relationship_type_and_score(
         if not node_type_1 or not node_type_2:
             skipped_invalid += 1
             continue
+        valid_pairs.append((entity_1, entity_2, node_type_1, node_type_2))
 
+    async def _match_pair(
+        item: tuple[dict[str, object], dict[str, object], str, str],
+    ) -> MatchedRelationship | None:
+        entity_1, entity_2, node_type_1, node_type_2 = item
         edge_context_reply = await _call_with_retry(
             step_name="step seven",
             operation="GetEdgeExtractionSchemaContext",
@@ -1031,36 +1274,37 @@ async def _run_step_seven_match_relationship_type_and_score(
                 )
             ),
         )
-        edge_context = _message_to_dict(edge_context_reply, rpc_name="GetEdgeExtractionSchemaContext")
-        prompt = json.dumps(
-            {
-                "entity_1": entity_1,
-                "entity_2": entity_2,
-                "edge_extraction_schema_context": edge_context,
-            },
-            ensure_ascii=False,
+        edge_context = prompt_context.edge_schema_context(edge_context_reply)
+        prompt = build_prompt(
+            step_name="step seven",
+            shared={"edge_extraction_schema_context": edge_context},
+            specific={"entity_1": entity_1, "entity_2": entity_2},
         )
 
         reply = await _call_with_retry(
             step_name="step seven",
             operation="relationship_match_agent.ainvoke",
-            call=lambda: relationship_match_agent.ainvoke({"messages": [{"role": "user", "content": prompt}]}),
+            call=lambda: relationship_match_client.ainvoke({"messages": [{"role": "user", "content": prompt}]}),
         )
         structured = reply.get("structured_response") if isinstance(reply, dict) else None
         if not isinstance(structured, dict):
             raise RuntimeError("knowledge.update step seven validation failed: missing structured_response")
         match_result = _validate_model("step seven", _StepSevenRelationshipMatchResult, structured)
-        if {match_result.from_entity_id, match_result.to_entity_id} != {entity_id_1, entity_id_2}:
+        if {match_result.from_entity_id, match_result.to_entity_id} != {entity_1["entity_id"], entity_2["entity_id"]}:
+            return None
+        return MatchedRelationship(
+            from_entity_id=match_result.from_entity_id,
+            to_entity_id=match_result.to_entity_id,
+            edge_type=match_result.edge_type,
+            confidence=float(match_result.confidence),
+        )
+
+    matched_relationships: list[MatchedRelationship] = []
+    for matched in await gather_bounded(valid_pairs, _match_pair):
+        if matched is None:
             skipped_invalid += 1
             continue
-        matched_relationships.append(
-            MatchedRelationship(
-                from_entity_id=match_result.from_entity_id,
-                to_entity_id=match_result.to_entity_id,
-                edge_type=match_result.edge_type,
-                confidence=float(match_result.confidence),
-            )
-        )
+        matched_relationships.append(matched)
 
     if skipped_invalid:
         logger.warning("knowledge.update step seven skipped invalid relationship matches", extra={"skipped": skipped_invalid})
@@ -1138,19 +1382,16 @@ def _normalize_step_eight_structured_response(
 
 
 def _extract_writable_property_keys(type_context: dict[str, object]) -> set[str]:
+    """Property names of a `prompt_context.writable_property_context` view."""
+
     context_properties = type_context.get("properties")
     if not isinstance(context_properties, list):
         return set()
-
-    writable_keys: set[str] = set()
-    for context_property in context_properties:
-        if not isinstance(context_property, dict):
-            continue
-        key = context_property.get("prop_name")
-        writable = context_property.get("writable")
-        if isinstance(key, str) and key and writable is True:
-            writable_keys.add(key)
-    return writable_keys
+    return {
+        context_property["prop_name"]
+        for context_property in context_properties
+        if isinstance(context_property, dict) and isinstance(context_property.get("prop_name"), str)
+    }
 
 
 def _assert_step_eight_required_entity_fields(payload: dict[str, object], entity_id: str) -> None:
@@ -1176,11 +1417,11 @@ async def _run_step_eight_build_final_entity_context_graphs(
     channel: grpc.aio.Channel,
     payload: KnowledgeUpdatePayload,
     resolved_entities: list[ResolvedEntity],
-    entity_context_documents: list[str],
+    entity_context_documents: list[str | None],
     settings: Settings,
 ) -> list[FinalEntityContextGraph]:
-    from langchain.agents import create_agent
-    from app.services.model_provider_chat_model import ModelProviderChatModel, build_strict_response_format
+    from app.services.model_provider_chat_model import build_strict_response_format
+    from app.services.model_provider_structured_completion import StructuredCompletionClient
 
     get_entity_type_property_context_rpc = channel.unary_unary(
         "/exobrain.knowledge.v1.KnowledgeInterface/GetEntityTypePropertyContext",
@@ -1194,9 +1435,8 @@ async def _run_step_eight_build_final_entity_context_graphs(
     )
 
     schema = _build_step_eight_final_entity_context_graph_schema()
-    final_graphs: list[FinalEntityContextGraph] = []
 
-    for resolved in resolved_entities:
+    async def _build_final_graph(resolved: ResolvedEntity) -> FinalEntityContextGraph:
         extracted = resolved.extracted_entity.model_dump()
         entity_id = resolved.resolved_entity_id
         node_type = resolved.extracted_entity.node_type
@@ -1214,12 +1454,14 @@ async def _run_step_eight_build_final_entity_context_graphs(
                 )
             ),
         )
-        type_context = _message_to_dict(type_context_reply, rpc_name="GetEntityTypePropertyContext")
+        type_context = prompt_context.writable_property_context(type_context_reply)
         writable_property_keys = _extract_writable_property_keys(type_context)
 
         resolution_status = resolved.resolution_status
         entity_index = resolved.entity_index
-        focused_markdown = entity_context_documents[entity_index] if 0 <= entity_index < len(entity_context_documents) else ""
+        focused_markdown = (
+            (entity_context_documents[entity_index] or "") if 0 <= entity_index < len(entity_context_documents) else ""
+        )
 
         existing_entity_context: dict[str, object] | None = None
         model_name = "worker"
@@ -1247,7 +1489,7 @@ async def _run_step_eight_build_final_entity_context_graphs(
                     )
                 ),
             )
-            existing_entity_context = _message_to_dict(context_reply, rpc_name="GetEntityContext")
+            existing_entity_context = prompt_context.entity_context(context_reply)
             system_prompt = (
                 "You are the knowledge.update final entity context graph reasoner. "
                 "Given existing entity context and focused markdown, propose minimal updates/additions to entity "
@@ -1260,31 +1502,28 @@ async def _run_step_eight_build_final_entity_context_graphs(
                 "Return strict JSON only with entity and blocks."
             )
 
-        compiled_agent = create_agent(
-            model=ModelProviderChatModel(
-                model=model_name,
-                base_url=settings.model_provider_base_url,
-                timeout=settings.knowledge_update_model_provider_timeout_seconds,
-            ),
-            tools=[],
+        completion_client = StructuredCompletionClient(
+            model=model_name,
+            base_url=settings.model_provider_base_url,
+            timeout=settings.knowledge_update_model_provider_timeout_seconds,
             system_prompt=system_prompt,
             response_format=build_strict_response_format(schema),
         )
-        prompt = json.dumps(
-            {
+        prompt = build_prompt(
+            step_name="step eight",
+            shared={"entity_type_property_context": type_context},
+            specific={
                 "entity_id": entity_id,
                 "resolution_status": resolution_status,
                 "extracted_entity": extracted,
                 "focused_markdown": focused_markdown,
-                "entity_type_property_context": type_context,
                 "existing_entity_context": existing_entity_context,
             },
-            ensure_ascii=False,
         )
         reply = await _call_with_retry(
             step_name="step eight",
             operation="final_entity_graph_agent.ainvoke",
-            call=lambda: compiled_agent.ainvoke({"messages": [{"role": "user", "content": prompt}]}),
+            call=lambda: completion_client.ainvoke({"messages": [{"role": "user", "content": prompt}]}),
         )
         structured = reply.get("structured_response") if isinstance(reply, dict) else None
         if not isinstance(structured, dict):
@@ -1295,23 +1534,15 @@ async def _run_step_eight_build_final_entity_context_graphs(
             writable_property_keys=writable_property_keys,
         )
         _assert_step_eight_required_entity_fields(normalized, entity_id)
-        final_graphs.append(_validate_model("step eight", FinalEntityContextGraph, normalized))
-
-    return final_graphs
-
+        return _validate_model("step eight", FinalEntityContextGraph, normalized)
 
-def _to_property_value_dict(key: str, value: object) -> dict[str, object] | None:
-    if isinstance(value, bool):
-        return {"key": key, "bool_value": value}
-    if isinstance(value, int) and not isinstance(value, bool):
-        return {"key": key, "int_value": value}
-    if isinstance(value, float):
-        return {"key": key, "float_value": value}
-    if isinstance(value, str):
-        return {"key": key, "string_value": value}
-    if isinstance(value, (list, dict)):
-        return {"key": key, "json_value": json.dumps(value, ensure_ascii=False)}
-    return None
+    final_graphs = await gather_isolated(
+        resolved_entities,
+        _build_final_graph,
+        step_name="step eight",
+        describe=lambda resolved: resolved.extracted_entity.name,
+    )
+    return [final_graph for final_graph in final_graphs if final_graph is not None]
 
 
 _ROOT_PARENT_SENTINELS = frozenset({"none", "(none)", "null", "nil"})
@@ -1353,23 +1584,6 @@ def _build_block_parent_debug_sample(
     return "[" + ", ".join(sample) + "]"
 
 
-_PROPERTY_VALUE_FIELDS = (
-    "bool_value",
-    "int_value",
-    "float_value",
-    "string_value",
-    "datetime_value",
-    "json_value",
-)
-
-
-def _extract_property_value_field(property_payload: dict[str, object]) -> str | None:
-    present_fields = [field for field in _PROPERTY_VALUE_FIELDS if field in property_payload]
-    if len(present_fields) == 1:
-        return present_fields[0]
-    return None
-
-
 def _is_value_type_compatible(*, expected_value_type: str, provided_field: str) -> bool:
     value_type = expected_value_type.strip().lower()
     compatibility: dict[str, set[str]] = {
@@ -1398,33 +1612,28 @@ def _validate_entity_payload_against_property_context(
     *,
     entity_id: str,
     type_id: str,
-    properties: list[dict[str, object]],
-    type_context: dict[str, object],
+    properties: Sequence[knowledge_pb2.PropertyValue],
+    type_context: knowledge_pb2.GetEntityTypePropertyContextReply,
 ) -> list[str]:
-    context_properties = type_context.get("properties")
-    if not isinstance(context_properties, list):
+    if not type_context.properties:
         return [f"type context missing properties for type '{type_id}'"]
 
-    writable_context_by_key: dict[str, dict[str, object]] = {}
+    writable_context_by_key: dict[str, knowledge_pb2.PropertyContext] = {}
     required_writable_keys: set[str] = set()
-    for context_property in context_properties:
-        if not isinstance(context_property, dict):
-            continue
-        key = context_property.get("prop_name")
-        writable = context_property.get("writable")
-        required = context_property.get("required")
-        if not isinstance(key, str) or not key:
+    for context_property in type_context.properties:
+        key = context_property.prop_name
+        if not key:
             continue
-        if writable is True:
+        if context_property.writable:
             writable_context_by_key[key] = context_property
-            if required is True:
+            if context_property.required:
                 required_writable_keys.add(key)
 
     issues: list[str] = []
     provided_keys: set[str] = set()
-    for index, property_payload in enumerate(properties):
-        key = property_payload.get("key")
-        if not isinstance(key, str) or not key:
+    for index, entity_property in enumerate(properties):
+        key = entity_property.key
+        if not key:
             issues.append(f"property at index {index} has missing/invalid key")
             continue
         provided_keys.add(key)
@@ -1433,13 +1642,13 @@ def _validate_entity_payload_against_property_context(
             issues.append(f"property '{key}' is not writable for type '{type_id}'")
             continue
 
-        provided_field = _extract_property_value_field(property_payload)
+        provided_field = property_value_field(entity_property)
         if provided_field is None:
             issues.append(f"property '{key}' must set exactly one value field")
             continue
 
-        expected_value_type = context_property.get("value_type")
-        if not isinstance(expected_value_type, str) or not expected_value_type:
+        expected_value_type = context_property.value_type
+        if not expected_value_type:
             issues.append(f"property '{key}' context is missing value_type")
             continue
         if not _is_value_type_compatible(expected_value_type=expected_value_type, provided_field=provided_field):
@@ -1456,7 +1665,7 @@ def _validate_entity_payload_against_property_context(
 
 async def _preflight_validate_graph_delta_entities(
     channel: grpc.aio.Channel,
-    graph_delta: dict[str, object],
+    graph_delta: knowledge_pb2.UpsertGraphDeltaRequest,
     requesting_user_id: str,
 ) -> None:
     get_entity_type_property_context_rpc = channel.unary_unary(
@@ -1465,28 +1674,19 @@ async def _preflight_validate_graph_delta_entities(
         response_deserializer=knowledge_pb2.GetEntityTypePropertyContextReply.FromString,
     )
 
-    type_context_by_type_id: dict[str, dict[str, object]] = {}
+    type_context_by_type_id: dict[str, knowledge_pb2.GetEntityTypePropertyContextReply] = {}
     entity_issues: list[str] = []
 
-    for entity in graph_delta.get("entities", []) or []:
-        if not isinstance(entity, dict):
-            continue
-        entity_id = entity.get("id")
-        type_id = entity.get("type_id")
-        raw_properties = entity.get("properties")
-
-        if not isinstance(entity_id, str) or not entity_id or not isinstance(type_id, str) or not type_id:
-            entity_issues.append(
-                f"entity_id={entity_id if isinstance(entity_id, str) else '<missing>'}: missing id/type_id"
-            )
-            continue
-        if not isinstance(raw_properties, list) or any(not isinstance(p, dict) for p in raw_properties):
-            entity_issues.append(f"entity_id={entity_id}: properties must be a list of objects")
+    for entity in graph_delta.entities:
+        entity_id = entity.id
+        type_id = entity.type_id
+        if not entity_id or not type_id:
+            entity_issues.append(f"entity_id={entity_id or '<missing>'}: missing id/type_id")
             continue
 
         type_context = type_context_by_type_id.get(type_id)
         if type_context is None:
-            type_context_reply = await _call_with_retry(
+            type_context = await _call_with_retry(
                 step_name="step ten preflight",
                 operation="GetEntityTypePropertyContext",
                 call=lambda: get_entity_type_property_context_rpc(
@@ -1497,13 +1697,14 @@ async def _preflight_validate_graph_delta_entities(
                     )
                 ),
             )
-            type_context = _message_to_dict(type_context_reply, rpc_name="GetEntityTypePropertyContext")
+            if type_context is None:
+                raise RuntimeError("knowledge.update received empty response from GetEntityTypePropertyContext")
             type_context_by_type_id[type_id] = type_context
 
         issues = _validate_entity_payload_against_property_context(
             entity_id=entity_id,
             type_id=type_id,
-            properties=raw_properties,
+            properties=entity.properties,
             type_context=type_context,
         )
         if issues:
@@ -1516,51 +1717,29 @@ async def _preflight_validate_graph_delta_entities(
         )
 
 
-def _preflight_validate_graph_delta_edges(graph_delta: dict[str, object]) -> None:
+def _preflight_validate_graph_delta_edges(graph_delta: knowledge_pb2.UpsertGraphDeltaRequest) -> None:
     edge_issues: list[str] = []
 
-    for index, edge in enumerate(graph_delta.get("edges", []) or []):
-        if not isinstance(edge, dict):
-            continue
-
-        properties = edge.get("properties")
-        if not isinstance(properties, list) or any(not isinstance(item, dict) for item in properties):
-            edge_issues.append(f"edge_index={index}: properties must be a list of objects")
-            continue
-
-        props_by_key = {
-            prop.get("key"): prop
-            for prop in properties
-            if isinstance(prop.get("key"), str) and prop.get("key")
-        }
+    for index, edge in enumerate(graph_delta.edges):
+        props_by_key = {prop.key: prop for prop in edge.properties if prop.key}
 
         confidence_prop = props_by_key.get("confidence")
         if confidence_prop is None:
             edge_issues.append(f"edge_index={index}: missing required edge property 'confidence'")
-        else:
-            confidence_field = _extract_property_value_field(confidence_prop)
-            if confidence_field not in {"float_value", "int_value"}:
-                edge_issues.append(
-                    f"edge_index={index}: property 'confidence' must use float_value or int_value"
-                )
+        elif property_value_field(confidence_prop) not in {"float_value", "int_value"}:
+            edge_issues.append(f"edge_index={index}: property 'confidence' must use float_value or int_value")
 
         status_prop = props_by_key.get("status")
         if status_prop is None:
             edge_issues.append(f"edge_index={index}: missing required edge property 'status'")
-        else:
-            status_field = _extract_property_value_field(status_prop)
-            if status_field != "string_value":
-                edge_issues.append(f"edge_index={index}: property 'status' must use string_value")
+        elif property_value_field(status_prop) != "string_value":
+            edge_issues.append(f"edge_index={index}: property 'status' must use string_value")
 
         provenance_hint_prop = props_by_key.get("provenance_hint")
         if provenance_hint_prop is None:
             edge_issues.append(f"edge_index={index}: missing required edge property 'provenance_hint'")
-        else:
-            provenance_hint_field = _extract_property_value_field(provenance_hint_prop)
-            if provenance_hint_field != "string_value":
-                edge_issues.append(
-                    f"edge_index={index}: property 'provenance_hint' must use string_value"
-                )
+        elif property_value_field(provenance_hint_prop) != "string_value":
+            edge_issues.append(f"edge_index={index}: property 'provenance_hint' must use string_value")
 
     if edge_issues:
         raise RuntimeError(
@@ -1571,41 +1750,27 @@ def _preflight_validate_graph_delta_edges(graph_delta: dict[str, object]) -> Non
 
 def _build_step_nine_merge_graph_delta(
     payload: KnowledgeUpdatePayload,
-    step_zero_graph_delta: dict[str, object],
+    step_zero_graph_delta: knowledge_pb2.UpsertGraphDeltaRequest | None,
     step_two_extraction: EntityExtractionResult,
     step_seven_relationships: list[MatchedRelationship],
     step_eight_final_entity_context_graphs: list[FinalEntityContextGraph],
-) -> dict[str, object]:
+    job_id: str,
+) -> knowledge_pb2.UpsertGraphDeltaRequest:
+    # Universe and placeholder block ids are derived from the job id, so a retry rebuilds the same
+    # delta and chunks committed by an earlier attempt are neither resent nor duplicated.
     # Step 0 chat-message graph delta merge intentionally disabled for sparse test runs.
     # Keep `step_zero_graph_delta` in the signature for easy re-enable later.
-    # merged = {
-    #     "universes": list(step_zero_graph_delta.get("universes", []) or []),
-    #     "entities": list(step_zero_graph_delta.get("entities", []) or []),
-    #     "blocks": list(step_zero_graph_delta.get("blocks", []) or []),
-    #     "edges": list(step_zero_graph_delta.get("edges", []) or []),
-    # }
-    merged = {
-        "universes": [],
-        "entities": [],
-        "blocks": [],
-        "edges": [],
-    }
+    # builder = GraphDeltaBuilder(payload.requested_by_user_id, request=step_zero_graph_delta)
+    builder = GraphDeltaBuilder(payload.requested_by_user_id)
 
     universe_id_by_name: dict[str, str] = {}
     for universe in step_two_extraction.extracted_universes:
         universe_name = universe.name
         if not universe_name:
             raise RuntimeError("knowledge.update step nine validation failed: extracted universe missing name")
-        universe_id = str(uuid4())
+        universe_id = str(uuid5(NAMESPACE_URL, f"{job_id}:universe:{universe_name}"))
         universe_id_by_name[universe_name] = universe_id
-        merged["universes"].append(
-            {
-                "id": universe_id,
-                "name": universe_name,
-                "user_id": payload.requested_by_user_id,
-                "visibility": "PRIVATE",
-            }
-        )
+        builder.add_universe(universe_id, universe_name)
 
     for item in step_eight_final_entity_context_graphs:
         entity_payload = item.entity
@@ -1620,24 +1785,20 @@ def _build_step_nine_merge_graph_delta(
             if isinstance(universe_name, str):
                 universe_id = universe_id_by_name.get(universe_name)
 
-        properties: list[dict[str, object]] = []
+        properties: list[knowledge_pb2.PropertyValue] = []
         for key, value in entity_payload.items():
             if key in {"entity_id", "node_type", "universe_id", "universe_name"}:
                 continue
-            property_value = _to_property_value_dict(key, value)
-            if property_value is not None:
-                properties.append(property_value)
-
-        entity_node: dict[str, object] = {
-            "id": entity_id,
-            "type_id": node_type,
-            "user_id": payload.requested_by_user_id,
-            "visibility": "PRIVATE",
-            "properties": properties,
-        }
-        if isinstance(universe_id, str) and universe_id:
-            entity_node["universe_id"] = universe_id
-        merged["entities"].append(entity_node)
+            entity_property = property_value(key, value)
+            if entity_property is not None:
+                properties.append(entity_property)
+
+        builder.add_entity(
+            entity_id,
+            node_type,
+            properties,
+            universe_id=universe_id if isinstance(universe_id, str) else None,
+        )
 
         blocks = item.blocks
         parent_by_block_id: dict[str, str | None] = {}
@@ -1696,76 +1857,32 @@ def _build_step_nine_merge_graph_delta(
                 UUID(raw_id)
                 id_map[raw_id] = raw_id
             except ValueError:
-                id_map[raw_id] = str(uuid4())
+                id_map[raw_id] = str(uuid5(NAMESPACE_URL, f"{job_id}:entity:{entity_id}:block:{raw_id}"))
 
-        root_block_id = roots[0]
-        entity_block_nodes: list[dict[str, object]] = []
-        entity_block_edges: list[dict[str, object]] = []
         for block in blocks:
-            raw_id = block.block_id
-            if raw_id not in id_map:
-                raise RuntimeError(f"knowledge.update step nine validation failed: entity {entity_id} references unknown block_id")
-
-            block_id = id_map[raw_id]
-            entity_block_nodes.append(
-                {
-                    "id": block_id,
-                    "type_id": "node.block",
-                    "user_id": payload.requested_by_user_id,
-                    "visibility": "PRIVATE",
-                    "properties": [{"key": "text", "string_value": block.text}],
-                }
-            )
-
-            parent_id = parent_by_block_id[raw_id]
+            block_id = id_map[block.block_id]
+            builder.add_block(block_id, block.text)
+            parent_id = parent_by_block_id[block.block_id]
             if parent_id is not None:
-                entity_block_edges.append(
-                    {
-                        "from_id": id_map[parent_id],
-                        "to_id": block_id,
-                        "edge_type": "SUMMARIZES",
-                        "user_id": payload.requested_by_user_id,
-                        "visibility": "PRIVATE",
-                        "properties": _default_edge_properties(1.0),
-                    }
-                )
-
-        entity_block_edges.append(
-            {
-                "from_id": entity_id,
-                "to_id": id_map[root_block_id],
-                "edge_type": "DESCRIBED_BY",
-                "user_id": payload.requested_by_user_id,
-                "visibility": "PRIVATE",
-                "properties": _default_edge_properties(1.0),
-            }
-        )
-        merged["blocks"].extend(entity_block_nodes)
-        merged["edges"].extend(entity_block_edges)
+                builder.add_edge(id_map[parent_id], block_id, "SUMMARIZES")
+        builder.add_edge(entity_id, id_map[roots[0]], "DESCRIBED_BY")
 
     for relationship in step_seven_relationships:
-        from_id = relationship.from_entity_id
-        to_id = relationship.to_entity_id
-        edge_type = relationship.edge_type
-        confidence = relationship.confidence
-        merged["edges"].append(
-            {
-                "from_id": from_id,
-                "to_id": to_id,
-                "edge_type": edge_type,
-                "user_id": payload.requested_by_user_id,
-                "visibility": "PRIVATE",
-                "properties": _default_edge_properties(confidence),
-            }
+        builder.add_edge(
+            relationship.from_entity_id,
+            relationship.to_entity_id,
+            relationship.edge_type,
+            confidence=relationship.confidence,
         )
 
+    merged = builder.build()
     logger.info(
         "knowledge.update step nine merged graph delta",
         extra={
-            "universes": len(merged["universes"]),
-            "entities": len(merged["entities"]),
-            "blocks": len(merged["blocks"]),
-            "edges": len(merged["edges"]),
+            "universes": len(merged.universes),
+            "entities": len(merged.entities),
+            "blocks": len(merged.blocks),
+            "edges": len(merged.edges),
         },
     )
     return merged
@@ -1794,217 +1911,219 @@ def _build_step_ten_mentions_schema() -> dict[str, object]:
     }
 
 
+def _entity_surface_forms(entity: knowledge_pb2.EntityNode) -> list[str]:
+    forms = [string_property(entity, "name")]
+    aliases_json = next((prop.json_value for prop in entity.properties if prop.key == "aliases"), "")
+    if aliases_json:
+        try:
+            aliases = json.loads(aliases_json)
+        except json.JSONDecodeError:
+            aliases = []
+        if isinstance(aliases, list):
+            forms.extend(alias for alias in aliases if isinstance(alias, str))
+    return [form for form in forms if form.strip()]
+
+
+def _chunk_ambiguous_mentions(ambiguous: dict[str, set[str]]) -> list[dict[str, set[str]]]:
+    chunks: list[dict[str, set[str]]] = []
+    current: dict[str, set[str]] = {}
+    current_pairs = 0
+    for block_id, entity_ids in ambiguous.items():
+        if current and current_pairs + len(entity_ids) > _STEP_TEN_MAX_CANDIDATES_PER_CALL:
+            chunks.append(current)
+            current, current_pairs = {}, 0
+        current[block_id] = entity_ids
+        current_pairs += len(entity_ids)
+    if current:
+        chunks.append(current)
+    return chunks
+
+
 async def _run_step_ten_finalize_graph_delta(
-    merged_graph_delta: dict[str, object],
+    merged_graph_delta: knowledge_pb2.UpsertGraphDeltaRequest,
     settings: Settings,
     requesting_user_id: str,
-) -> dict[str, object]:
-    from langchain.agents import create_agent
-    from app.services.model_provider_chat_model import ModelProviderChatModel, build_strict_response_format
+) -> knowledge_pb2.UpsertGraphDeltaRequest:
+    from app.services.model_provider_chat_model import build_strict_response_format
+    from app.services.model_provider_structured_completion import StructuredCompletionClient
 
-    blocks = [
-        {
-            "block_id": block.get("id"),
-            "text": next((p.get("string_value") for p in (block.get("properties") or []) if isinstance(p, dict) and p.get("key") == "text"), ""),
-        }
-        for block in (merged_graph_delta.get("blocks") or [])
-        if isinstance(block, dict)
-    ]
-    entities = [
-        {
-            "entity_id": entity.get("id"),
-            "name": next((p.get("string_value") for p in (entity.get("properties") or []) if isinstance(p, dict) and p.get("key") == "name"), ""),
-        }
-        for entity in (merged_graph_delta.get("entities") or [])
-        if isinstance(entity, dict)
-    ]
-    valid_block_ids = {item["block_id"] for item in blocks if isinstance(item.get("block_id"), str)}
-    valid_entity_ids = {item["entity_id"] for item in entities if isinstance(item.get("entity_id"), str)}
+    index = MentionIndex(
+        (entity.id, form) for entity in merged_graph_delta.entities for form in _entity_surface_forms(entity)
+    )
+    block_text_by_id = {block.id: string_property(block, "text") for block in merged_graph_delta.blocks}
+    entity_name_by_id = {entity.id: string_property(entity, "name") for entity in merged_graph_delta.entities}
+    confirmed, ambiguous = mention_candidates(index, block_text_by_id.items())
+    chunks = _chunk_ambiguous_mentions(ambiguous)
+    logger.info(
+        "knowledge.update step ten mention prefilter",
+        extra={
+            "blocks": len(block_text_by_id),
+            "entities": len(entity_name_by_id),
+            "confirmed_mentions": len(confirmed),
+            "ambiguous_mentions": sum(len(entity_ids) for entity_ids in ambiguous.values()),
+            "confirmation_calls": len(chunks),
+        },
+    )
 
-    agent = create_agent(
-        model=ModelProviderChatModel(
+    mention_client = None
+    if chunks:
+        mention_client = StructuredCompletionClient(
             model="worker",
             base_url=settings.model_provider_base_url,
             timeout=settings.knowledge_update_model_provider_timeout_seconds,
-        ),
-        tools=[],
-        system_prompt=(
-            "You are the knowledge.update graph finalizer worker. "
-            "Identify which blocks mention which entities. Return strict JSON only."
-        ),
-        response_format=build_strict_response_format(_StepTenMentionsResult),
-    )
-    prompt = json.dumps({"blocks": blocks, "entities": entities}, ensure_ascii=False)
-    reply = await _call_with_retry(
-        step_name="step ten",
-        operation="graph_finalizer_agent.ainvoke",
-        call=lambda: agent.ainvoke({"messages": [{"role": "user", "content": prompt}]}),
-    )
-    structured = reply.get("structured_response") if isinstance(reply, dict) else None
-    if not isinstance(structured, dict):
-        raise RuntimeError("knowledge.update step ten validation failed: missing structured_response")
-    mentions = _validate_model("step ten", _StepTenMentionsResult, structured).mentions
+            system_prompt=(
+                "You are the knowledge.update graph finalizer worker. "
+                "Each block lists candidate entities whose name or alias appears in its text. "
+                "Return only the candidates the block actually refers to. Return strict JSON only."
+            ),
+            response_format=build_strict_response_format(_StepTenMentionsResult),
+        )
+
+    async def _confirm_chunk(chunk: dict[str, set[str]]) -> list[_StepTenMention]:
+        prompt = build_prompt(
+            step_name="step ten",
+            specific={
+                "blocks": [
+                    {
+                        "block_id": block_id,
+                        "text": block_text_by_id[block_id],
+                        "candidate_entities": [
+                            {"entity_id": entity_id, "name": entity_name_by_id[entity_id]}
+                            for entity_id in sorted(entity_ids)
+                        ],
+                    }
+                    for block_id, entity_ids in chunk.items()
+                ]
+            },
+        )
+        reply = await _call_with_retry(
+            step_name="step ten",
+            operation="graph_finalizer_agent.ainvoke",
+            call=lambda: mention_client.ainvoke({"messages": [{"role": "user", "content": prompt}]}),
+        )
+        structured = reply.get("structured_response") if isinstance(reply, dict) else None
+        if not isinstance(structured, dict):
+            raise RuntimeError("knowledge.update step ten validation failed: missing structured_response")
+        return _validate_model("step ten", _StepTenMentionsResult, structured).mentions
+
+    confirmations = await gather_bounded(chunks, _confirm_chunk)
 
-    mentions_edges: list[dict[str, object]] = []
+    builder = GraphDeltaBuilder(requesting_user_id, request=merged_graph_delta)
+    mentions_edges_added = 0
     seen: set[tuple[str, str]] = set()
+    for block_id, entity_id in confirmed:
+        seen.add((block_id, entity_id))
+        builder.add_edge(block_id, entity_id, "MENTIONS", provenance_hint="mention_index")
+        mentions_edges_added += 1
+
     skipped_invalid = 0
-    for mention in mentions:
-        block_id = mention.block_id
-        entity_id = mention.entity_id
-        confidence = mention.confidence
-        if block_id not in valid_block_ids:
-            skipped_invalid += 1
-            continue
-        if entity_id not in valid_entity_ids:
-            skipped_invalid += 1
-            continue
-        key = (block_id, entity_id)
-        if key in seen:
-            skipped_invalid += 1
-            continue
-        seen.add(key)
-        mentions_edges.append(
-            {
-                "from_id": block_id,
-                "to_id": entity_id,
-                "edge_type": "MENTIONS",
-                "user_id": requesting_user_id,
-                "visibility": "PRIVATE",
-                "properties": _default_edge_properties(confidence),
-            }
-        )
+    for chunk, mentions in zip(chunks, confirmations):
+        for mention in mentions:
+            key = (mention.block_id, mention.entity_id)
+            # The model may only confirm candidates it was shown for this chunk.
+            if mention.entity_id not in chunk.get(mention.block_id, ()) or key in seen:
+                skipped_invalid += 1
+                continue
+            seen.add(key)
+            builder.add_edge(mention.block_id, mention.entity_id, "MENTIONS", confidence=mention.confidence)
+            mentions_edges_added += 1
 
     if skipped_invalid:
         logger.warning("knowledge.update step ten skipped invalid mentions", extra={"skipped": skipped_invalid})
 
-    merged_graph_delta["edges"] = [*(merged_graph_delta.get("edges", []) or []), *mentions_edges]
+    final_graph_delta = builder.build()
     logger.info(
         "knowledge.update step ten finalized graph delta",
-        extra={"mentions_edges_added": len(mentions_edges), "total_edges": len(merged_graph_delta.get("edges", []) or [])},
+        extra={"mentions_edges_added": mentions_edges_added, "total_edges": len(final_graph_delta.edges)},
     )
-    return merged_graph_delta
-
+    return final_graph_delta
 
-async def run(job: JobEnvelope) -> None:
-    """Run knowledge.update worker steps."""
 
-    settings = get_settings()
-    target = settings.knowledge_interface_grpc_target
-    payload = KnowledgeUpdatePayload.model_validate(job.payload)
-
-    async with grpc.aio.insecure_channel(target) as channel:
-        try:
-            await asyncio.wait_for(
-                channel.channel_ready(),
-                timeout=settings.knowledge_interface_connect_timeout_seconds,
-            )
-        except TimeoutError as exc:
-            raise RuntimeError(
-                "knowledge-interface connection timed out "
-                f"for target '{target}' after "
-                f"{settings.knowledge_interface_connect_timeout_seconds}s"
-            ) from exc
-
-        step_zero_graph_delta = await _build_upsert_graph_delta_step_one(channel, payload)
-        _validate_upsert_graph_delta_payload("step zero", step_zero_graph_delta)
-        step_one_markdown_document = _step_two_store_batch_document(payload)
-        step_two_extraction = await _run_step_two_entity_extraction(
-            channel,
-            payload,
-            step_one_markdown_document,
-            settings,
-        )
-        step_three_candidate_matching = await _run_step_three_entity_candidate_matching(
-            channel,
-            payload,
-            step_two_extraction,
-        )
-        step_four_entity_contexts = await _run_step_four_create_entity_contexts(
-            step_two_extraction,
-            step_one_markdown_document,
-            settings,
-        )
-        step_five_resolved_entities = await _run_step_five_detailed_comparison(
-            channel,
-            payload,
-            step_three_candidate_matching,
-            step_four_entity_contexts,
-            settings,
-        )
-        step_six_entity_pairs = await _run_step_six_relationship_extraction(
-            step_five_resolved_entities,
-            step_one_markdown_document,
-            settings,
-        )
-        step_seven_relationships = await _run_step_seven_match_relationship_type_and_score(
-            channel,
-            payload,
-            step_five_resolved_entities,
-            step_four_entity_contexts,
-            step_six_entity_pairs,
-            settings,
-        )
-        step_eight_final_entity_context_graphs = await _run_step_eight_build_final_entity_context_graphs(
-            channel,
-            payload,
-            step_five_resolved_entities,
-            step_four_entity_contexts,
-            settings,
-        )
-        step_nine_merged_graph_delta = _build_step_nine_merge_graph_delta(
-            payload,
-            step_zero_graph_delta,
-            step_two_extraction,
-            step_seven_relationships,
-            step_eight_final_entity_context_graphs,
-        )
-        _validate_upsert_graph_delta_payload("step nine", step_nine_merged_graph_delta)
-        step_ten_final_graph_delta = await _run_step_ten_finalize_graph_delta(
-            step_nine_merged_graph_delta,
-            settings,
-            payload.requested_by_user_id,
-        )
-
-        upsert_graph_delta = channel.unary_unary(
-            "/exobrain.knowledge.v1.KnowledgeInterface/UpsertGraphDelta",
-            request_serializer=knowledge_pb2.UpsertGraphDeltaRequest.SerializeToString,
-            response_deserializer=knowledge_pb2.UpsertGraphDeltaReply.FromString,
-        )
-        await _preflight_validate_graph_delta_entities(
-            channel,
-            step_ten_final_graph_delta,
-            payload.requested_by_user_id,
-        )
-        _preflight_validate_graph_delta_edges(step_ten_final_graph_delta)
-        upsert_request = _validate_upsert_graph_delta_payload("step ten", step_ten_final_graph_delta)
-        upsert_reply = await _call_with_retry(
-            step_name="step eleven",
-            operation="UpsertGraphDelta",
-            call=lambda: upsert_graph_delta(upsert_request),
-        )
+async def _upsert_graph_delta(
+    channel: grpc.aio.Channel,
+    graph_delta: knowledge_pb2.UpsertGraphDeltaRequest,
+    settings: Settings,
+    checkpoints: StepCheckpoints | None = None,
+) -> knowledge_pb2.UpsertGraphDeltaReply:
+    """Submit a validated delta, in dependency-ordered chunks when it exceeds the size budget.
+
+    Phases run one after another and the chunks of a phase run concurrently, each with its own
+    retries. Chunked submission is not one transaction, so with checkpoints every committed
+    chunk is recorded and skipped when the job is retried.
+    """
+
+    upsert_graph_delta = channel.unary_unary(
+        "/exobrain.knowledge.v1.KnowledgeInterface/UpsertGraphDelta",
+        request_serializer=knowledge_pb2.UpsertGraphDeltaRequest.SerializeToString,
+        response_deserializer=knowledge_pb2.UpsertGraphDeltaReply.FromString,
+    )
+    phases = chunk_graph_delta(graph_delta, settings.knowledge_update_upsert_chunk_bytes)
+    total = knowledge_pb2.UpsertGraphDeltaReply()
+    if len(phases) > 1:
         logger.info(
-            "knowledge.update step eleven upserted final graph delta",
+            "knowledge.update step eleven split graph delta into chunks",
             extra={
-                "entities_upserted": upsert_reply.entities_upserted,
-                "blocks_upserted": upsert_reply.blocks_upserted,
-                "edges_upserted": upsert_reply.edges_upserted,
+                "delta_bytes": graph_delta.ByteSize(),
+                "chunks_per_phase": [len(phase) for phase in phases],
             },
         )
 
+    for phase_index, phase in enumerate(phases):
+
+        async def _upsert_chunk(item: tuple[int, knowledge_pb2.UpsertGraphDeltaRequest]) -> dict[str, int]:
+            chunk_index, chunk = item
+            step_name = f"step eleven chunk {phase_index}.{chunk_index}"
+            input_hash = hashlib.sha256(chunk.SerializeToString(deterministic=True)).hexdigest()
+            if checkpoints is not None and len(phases) > 1:
+                found, counts = await checkpoints.load(step_name, input_hash, dict[str, int])
+                if found:
+                    return counts
+            reply = await _call_with_retry(
+                step_name="step eleven",
+                operation="UpsertGraphDelta",
+                call=lambda: upsert_graph_delta(chunk),
+            )
+            counts = {
+                "entities_upserted": reply.entities_upserted,
+                "blocks_upserted": reply.blocks_upserted,
+                "edges_upserted": reply.edges_upserted,
+            }
+            if checkpoints is not None and len(phases) > 1:
+                await checkpoints.save(step_name, input_hash, dict[str, int], counts)
+            return counts
 
-def main() -> None:
-    parser = argparse.ArgumentParser(description="Run knowledge.update worker job")
-    parser.add_argument("--job-envelope", required=True, help="Serialized JobEnvelope JSON payload")
-    args = parser.parse_args()
+        for counts in await gather_bounded(list(enumerate(phase)), _upsert_chunk):
+            total.entities_upserted += counts["entities_upserted"]
+            total.blocks_upserted += counts["blocks_upserted"]
+            total.edges_upserted += counts["edges_upserted"]
 
-    job = JobEnvelope.model_validate_json(args.job_envelope)
+    logger.info(
+        "knowledge.update step eleven upserted final graph delta",
+        extra={
+            "entities_upserted": total.entities_upserted,
+            "blocks_upserted": total.blocks_upserted,
+            "edges_upserted": total.edges_upserted,
+        },
+    )
+    return total
 
-    try:
-        asyncio.run(run(job))
-    except Exception as exc:  # noqa: BLE001
-        print(_format_exception_for_stderr(exc), file=sys.stderr)
-        raise SystemExit(1) from None
 
+def _parse_job_envelope_args(parser: argparse.ArgumentParser) -> JobEnvelope:
+    """Read the JobEnvelope from `--job-envelope-file` (`-` for stdin) or an inline `--job-envelope`.
+
+    Runners stream the envelope over stdin, since large batches exceed the kernel's limit on a
+    single command-line argument; the inline form stays for running a job by hand.
+    """
+
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--job-envelope", help="Serialized JobEnvelope JSON payload")
+    source.add_argument("--job-envelope-file", help="Path of a serialized JobEnvelope JSON payload, or - for stdin")
+    args = parser.parse_args()
+
+    if args.job_envelope is not None:
+        return JobEnvelope.model_validate_json(args.job_envelope)
+    if args.job_envelope_file == "-":
+        return JobEnvelope.model_validate_json(sys.stdin.buffer.read())
+    with open(args.job_envelope_file, "rb") as envelope_file:
+        return JobEnvelope.model_validate_json(envelope_file.read())
 
-if __name__ == "__main__":
-    main()
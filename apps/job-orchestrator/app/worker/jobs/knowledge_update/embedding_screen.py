@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+
+from app.worker.jobs.knowledge_update_types import ExtractedEntity
+
+# Embedding inputs are capped; the leading text of a context document carries its identity.
+_MAX_EMBEDDING_TEXT_CHARS = 4000
+
+
+@dataclass(frozen=True)
+class ScreenedCandidates:
+    """Outcome of the embedding screen for one extracted entity.
+
+    `matched_entity_id` is set when one candidate is clearly the same entity, with its cosine
+    similarity in `match_similarity`. Otherwise `remaining_candidate_ids` are the candidates still
+    needing a detailed comparison; when it is empty every candidate was clearly distinct and the
+    extracted entity is new.
+    """
+
+    matched_entity_id: str | None = None
+    match_similarity: float | None = None
+    remaining_candidate_ids: list[str] = field(default_factory=list)
+
+
+def extracted_entity_text(entity: ExtractedEntity, focused_markdown: str) -> str:
+    lines = [entity.name]
+    if entity.aliases:
+        lines.append(f"Also known as: {', '.join(entity.aliases)}")
+    if entity.short_description:
+        lines.append(entity.short_description)
+    if focused_markdown:
+        lines.append(focused_markdown)
+    return "\n".join(lines)[:_MAX_EMBEDDING_TEXT_CHARS]
+
+
+def candidate_context_text(context: dict[str, object]) -> str:
+    """Summary of an existing entity's context: its name, aliases and shallowest blocks in order."""
+
+    entity = context.get("entity")
+    entity = entity if isinstance(entity, dict) else {}
+    lines = [str(entity.get("name") or "")]
+    aliases = entity.get("aliases")
+    if isinstance(aliases, list) and aliases:
+        lines.append(f"Also known as: {', '.join(str(alias) for alias in aliases)}")
+    blocks = context.get("blocks")
+    if isinstance(blocks, list):
+        lines.extend(
+            str(block.get("text") or "")
+            for block in sorted(
+                (block for block in blocks if isinstance(block, dict)),
+                key=lambda block: int(block.get("block_level") or 0),
+            )
+        )
+    return "\n".join(line for line in lines if line)[:_MAX_EMBEDDING_TEXT_CHARS]
+
+
+def screen_candidates(
+    similarities: dict[str, float],
+    *,
+    match_threshold: float,
+    distinct_threshold: float,
+) -> ScreenedCandidates:
+    """Resolve the clear cases from cosine similarities of one extracted entity to its candidates.
+
+    A candidate is a clear match only if it is the single one at or above `match_threshold` and
+    every other candidate is below `distinct_threshold`. Candidates below `distinct_threshold`
+    are dropped; whatever remains is left to the model.
+    """
+
+    above_match = [candidate_id for candidate_id, score in similarities.items() if score >= match_threshold]
+    remaining = [candidate_id for candidate_id, score in similarities.items() if score >= distinct_threshold]
+    if len(above_match) == 1 and remaining == above_match:
+        return ScreenedCandidates(matched_entity_id=above_match[0], match_similarity=similarities[above_match[0]])
+    return ScreenedCandidates(remaining_candidate_ids=remaining)
@@ -0,0 +1,165 @@
+from __future__ import annotations
+
+import logging
+import re
+import unicodedata
+from difflib import SequenceMatcher
+
+from app.worker.jobs.knowledge_update_types import EntityExtractionResult, ExtractedEntity, ExtractedUniverse
+
+logger = logging.getLogger(__name__)
+
+# Fuzzy name matches are limited to reasonably long names with identical numbers: short names
+# differing by one letter ("Anna"/"Anne") or numbered names ("Room 101"/"Room 102") are usually
+# different entities.
+_FUZZY_MIN_NAME_LENGTH = 6
+_FUZZY_MIN_RATIO = 0.9
+_NON_WORD_PATTERN = re.compile(r"[^\w]+")
+_NUMBER_PATTERN = re.compile(r"\d+")
+
+
+def normalize_entity_name(name: str) -> str:
+    decomposed = unicodedata.normalize("NFKD", name)
+    without_marks = "".join(char for char in decomposed if not unicodedata.combining(char))
+    return " ".join(_NON_WORD_PATTERN.sub(" ", without_marks.casefold()).split())
+
+
+def _trigrams(text: str) -> set[str]:
+    padded = f"  {text} "
+    return {padded[index : index + 3] for index in range(len(padded) - 2)}
+
+
+class _DisjointSet:
+    def __init__(self, size: int) -> None:
+        self._parent = list(range(size))
+
+    def find(self, item: int) -> int:
+        while self._parent[item] != item:
+            self._parent[item] = self._parent[self._parent[item]]
+            item = self._parent[item]
+        return item
+
+    def union(self, first: int, second: int) -> None:
+        root_first, root_second = self.find(first), self.find(second)
+        if root_first != root_second:
+            # The lower index stays the root so the first extracted copy represents the cluster.
+            self._parent[max(root_first, root_second)] = min(root_first, root_second)
+
+
+def _compatible(first: ExtractedEntity, second: ExtractedEntity) -> bool:
+    if first.node_type != second.node_type:
+        return False
+    return not (first.universe_id and second.universe_id and first.universe_id != second.universe_id)
+
+
+def cluster_extracted_entities(entities: list[ExtractedEntity]) -> list[list[int]]:
+    """Group extracted entities that name the same thing, as lists of indexes in input order.
+
+    Two entities of the same type (and universe, when both have one) are grouped when a
+    normalized name or alias of one equals a normalized name or alias of the other, or when their
+    normalized names are near-identical. Near-identical candidates are found through a character
+    trigram index, so only names sharing trigrams are ever compared.
+    """
+
+    clusters = _DisjointSet(len(entities))
+    owners_by_form: dict[str, list[int]] = {}
+    names: list[str] = []
+    for index, entity in enumerate(entities):
+        name = normalize_entity_name(entity.name)
+        names.append(name)
+        forms = {name, *(normalize_entity_name(alias) for alias in entity.aliases)}
+        for form in forms - {""}:
+            for other in owners_by_form.get(form, []):
+                if _compatible(entities[other], entity):
+                    clusters.union(other, index)
+            owners_by_form.setdefault(form, []).append(index)
+
+    trigram_index: dict[str, list[int]] = {}
+    for index, name in enumerate(names):
+        if len(name) < _FUZZY_MIN_NAME_LENGTH:
+            continue
+        candidates = {other for trigram in _trigrams(name) for other in trigram_index.get(trigram, [])}
+        for other in sorted(candidates):
+            if clusters.find(other) == clusters.find(index) or not _compatible(entities[other], entities[index]):
+                continue
+            if _NUMBER_PATTERN.findall(names[other]) != _NUMBER_PATTERN.findall(name):
+                continue
+            if SequenceMatcher(None, names[other], name).ratio() >= _FUZZY_MIN_RATIO:
+                clusters.union(other, index)
+        for trigram in _trigrams(name):
+            trigram_index.setdefault(trigram, []).append(index)
+
+    grouped: dict[int, list[int]] = {}
+    for index in range(len(entities)):
+        grouped.setdefault(clusters.find(index), []).append(index)
+    return list(grouped.values())
+
+
+def _merge_cluster(entities: list[ExtractedEntity]) -> ExtractedEntity:
+    representative = entities[0]
+    representative_name = normalize_entity_name(representative.name)
+    aliases: list[str] = []
+    seen = {representative_name}
+    for entity in entities:
+        for surface_form in (entity.name, *entity.aliases):
+            normalized = normalize_entity_name(surface_form)
+            if normalized and normalized not in seen:
+                seen.add(normalized)
+                aliases.append(surface_form)
+    return representative.model_copy(
+        update={
+            "aliases": aliases,
+            "short_description": max((entity.short_description for entity in entities), key=len),
+            "universe_id": next((entity.universe_id for entity in entities if entity.universe_id), None),
+        }
+    )
+
+
+def deduplicate_extracted_entities(extraction: EntityExtractionResult) -> EntityExtractionResult:
+    """Collapse duplicate extracted entities into one representative per cluster.
+
+    The representative keeps the first copy's name and type. It gains every other spelling as an
+    alias, the most detailed short description and any universe a copy was placed in. Only the
+    representatives go through candidate matching, context building and resolution, so every copy
+    ends up as the same resolved entity id.
+    """
+
+    clusters = cluster_extracted_entities(extraction.extracted_entities)
+    if len(clusters) == len(extraction.extracted_entities):
+        return extraction
+
+    merged = [_merge_cluster([extraction.extracted_entities[index] for index in cluster]) for cluster in clusters]
+    logger.info(
+        "knowledge.update step two merged duplicate extracted entities",
+        extra={
+            "extracted_entities": len(extraction.extracted_entities),
+            "deduplicated_entities": len(merged),
+            "merged_clusters": [
+                [extraction.extracted_entities[index].name for index in cluster] for cluster in clusters if len(cluster) > 1
+            ],
+        },
+    )
+    return extraction.model_copy(update={"extracted_entities": merged})
+
+
+def merge_window_extractions(extractions: list[EntityExtractionResult]) -> EntityExtractionResult:
+    """Reduce per-window step-two results into one, in window order.
+
+    Universes are keyed by normalized name and keep the most detailed description. Entities are
+    concatenated; copies of one entity seen by several windows are collapsed afterwards by
+    `deduplicate_extracted_entities` like any other duplicate extraction.
+    """
+
+    if len(extractions) == 1:
+        return extractions[0]
+    universes: dict[str, ExtractedUniverse] = {}
+    for extraction in extractions:
+        for universe in extraction.extracted_universes:
+            key = normalize_entity_name(universe.name)
+            known = universes.get(key)
+            if known is None or len(universe.description) > len(known.description):
+                universes[key] = universe if known is None else known.model_copy(update={"description": universe.description})
+    return EntityExtractionResult(
+        extracted_entities=[entity for extraction in extractions for entity in extraction.extracted_entities],
+        extracted_universes=list(universes.values()),
+    )
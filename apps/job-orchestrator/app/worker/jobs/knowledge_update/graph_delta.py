@@ -0,0 +1,209 @@
+from __future__ import annotations
+
+import json
+from typing import Iterable
+
+from app.services.grpc import knowledge_pb2
+
+BLOCK_TYPE_ID = "node.block"
+
+
+def property_value(key: str, value: object) -> knowledge_pb2.PropertyValue | None:
+    if isinstance(value, bool):
+        return knowledge_pb2.PropertyValue(key=key, bool_value=value)
+    if isinstance(value, int):
+        return knowledge_pb2.PropertyValue(key=key, int_value=value)
+    if isinstance(value, float):
+        return knowledge_pb2.PropertyValue(key=key, float_value=value)
+    if isinstance(value, str):
+        return knowledge_pb2.PropertyValue(key=key, string_value=value)
+    if isinstance(value, (list, dict)):
+        return knowledge_pb2.PropertyValue(key=key, json_value=json.dumps(value, ensure_ascii=False))
+    return None
+
+
+def property_value_field(prop: knowledge_pb2.PropertyValue) -> str | None:
+    return prop.WhichOneof("value")
+
+
+def edge_properties(confidence: float, provenance_hint: str = "placeholder") -> list[knowledge_pb2.PropertyValue]:
+    return [
+        knowledge_pb2.PropertyValue(key="confidence", float_value=float(confidence)),
+        knowledge_pb2.PropertyValue(key="status", string_value="asserted"),
+        knowledge_pb2.PropertyValue(key="provenance_hint", string_value=provenance_hint),
+    ]
+
+
+def string_property(node: knowledge_pb2.EntityNode | knowledge_pb2.BlockNode, key: str) -> str:
+    return next((prop.string_value for prop in node.properties if prop.key == key), "")
+
+
+class GraphDeltaBuilder:
+    """Appends graph nodes and edges straight into one `UpsertGraphDeltaRequest`.
+
+    Every node and edge is owned by `user_id` with the builder's visibility, and every edge
+    carries the confidence/status/provenance_hint properties the step ten preflight requires.
+    Pass `request` to keep appending to an already assembled delta.
+    """
+
+    def __init__(
+        self,
+        user_id: str,
+        *,
+        visibility: int = knowledge_pb2.PRIVATE,
+        request: knowledge_pb2.UpsertGraphDeltaRequest | None = None,
+    ) -> None:
+        self._user_id = user_id
+        self._visibility = visibility
+        self._request = request if request is not None else knowledge_pb2.UpsertGraphDeltaRequest()
+
+    def add_universe(self, universe_id: str, name: str) -> None:
+        self._request.universes.add(id=universe_id, name=name, user_id=self._user_id, visibility=self._visibility)
+
+    def add_entity(
+        self,
+        entity_id: str,
+        type_id: str,
+        properties: Iterable[knowledge_pb2.PropertyValue],
+        *,
+        universe_id: str | None = None,
+    ) -> None:
+        entity = self._request.entities.add(
+            id=entity_id,
+            type_id=type_id,
+            user_id=self._user_id,
+            visibility=self._visibility,
+            properties=properties,
+        )
+        if universe_id:
+            entity.universe_id = universe_id
+
+    def add_block(
+        self,
+        block_id: str,
+        text: str,
+        *,
+        type_id: str = BLOCK_TYPE_ID,
+        properties: Iterable[knowledge_pb2.PropertyValue] = (),
+    ) -> None:
+        self._request.blocks.add(
+            id=block_id,
+            type_id=type_id,
+            user_id=self._user_id,
+            visibility=self._visibility,
+            properties=[knowledge_pb2.PropertyValue(key="text", string_value=text), *properties],
+        )
+
+    def add_edge(
+        self,
+        from_id: str,
+        to_id: str,
+        edge_type: str,
+        *,
+        confidence: float = 1.0,
+        provenance_hint: str = "placeholder",
+    ) -> None:
+        self._request.edges.add(
+            from_id=from_id,
+            to_id=to_id,
+            edge_type=edge_type,
+            user_id=self._user_id,
+            visibility=self._visibility,
+            properties=edge_properties(confidence, provenance_hint),
+        )
+
+    def build(self) -> knowledge_pb2.UpsertGraphDeltaRequest:
+        return self._request
+
+
+_TREE_EDGE_TYPES = frozenset({"DESCRIBED_BY", "SUMMARIZES"})
+
+
+def _pack(
+    groups: list[knowledge_pb2.UpsertGraphDeltaRequest],
+    max_bytes: int,
+) -> list[knowledge_pb2.UpsertGraphDeltaRequest]:
+    """Greedily merge groups into chunks of at most `max_bytes`; an oversized group stays alone."""
+
+    chunks: list[knowledge_pb2.UpsertGraphDeltaRequest] = []
+    current = knowledge_pb2.UpsertGraphDeltaRequest()
+    current_bytes = 0
+    for group in groups:
+        group_bytes = group.ByteSize()
+        if current_bytes and current_bytes + group_bytes > max_bytes:
+            chunks.append(current)
+            current = knowledge_pb2.UpsertGraphDeltaRequest()
+            current_bytes = 0
+        known_universes = {universe.id for universe in current.universes}
+        current.universes.extend(universe for universe in group.universes if universe.id not in known_universes)
+        current.entities.extend(group.entities)
+        current.blocks.extend(group.blocks)
+        current.edges.extend(group.edges)
+        current_bytes += group_bytes
+    if current_bytes:
+        chunks.append(current)
+    return chunks
+
+
+def chunk_graph_delta(
+    delta: knowledge_pb2.UpsertGraphDeltaRequest,
+    max_bytes: int,
+) -> list[list[knowledge_pb2.UpsertGraphDeltaRequest]]:
+    """Split a validated delta into dependency-ordered phases of chunks of about `max_bytes`.
+
+    The knowledge interface validates every request on its own, so each chunk must be valid
+    given what earlier phases committed:
+
+    1. entities, each chunk carrying the universes its entities belong to;
+    2. block trees, each kept whole with the `DESCRIBED_BY`/`SUMMARIZES` edges linking it;
+    3. every other edge.
+
+    Chunks within a phase are independent and may be submitted concurrently. A delta within
+    the budget is returned as a single chunk.
+    """
+
+    if delta.ByteSize() <= max_bytes:
+        return [[delta]]
+
+    universes_by_id = {universe.id: universe for universe in delta.universes}
+    referenced_universes: set[str] = set()
+    entity_groups: list[knowledge_pb2.UpsertGraphDeltaRequest] = []
+    for entity in delta.entities:
+        group = knowledge_pb2.UpsertGraphDeltaRequest(entities=[entity])
+        if entity.HasField("universe_id") and entity.universe_id in universes_by_id:
+            group.universes.append(universes_by_id[entity.universe_id])
+            referenced_universes.add(entity.universe_id)
+        entity_groups.append(group)
+    unreferenced = [universe for universe in delta.universes if universe.id not in referenced_universes]
+    if unreferenced:
+        entity_groups.insert(0, knowledge_pb2.UpsertGraphDeltaRequest(universes=unreferenced))
+
+    block_ids = {block.id for block in delta.blocks}
+    parent_edge_by_block: dict[str, knowledge_pb2.GraphEdge] = {}
+    other_edges: list[knowledge_pb2.GraphEdge] = []
+    for edge in delta.edges:
+        if edge.edge_type.upper() in _TREE_EDGE_TYPES and edge.to_id in block_ids and edge.to_id not in parent_edge_by_block:
+            parent_edge_by_block[edge.to_id] = edge
+        else:
+            other_edges.append(edge)
+
+    def _tree_root(block_id: str) -> str:
+        seen = {block_id}
+        while block_id in parent_edge_by_block:
+            parent_id = parent_edge_by_block[block_id].from_id
+            if parent_id not in block_ids or parent_id in seen:
+                return parent_id
+            seen.add(parent_id)
+            block_id = parent_id
+        return block_id
+
+    tree_groups: dict[str, knowledge_pb2.UpsertGraphDeltaRequest] = {}
+    for block in delta.blocks:
+        group = tree_groups.setdefault(_tree_root(block.id), knowledge_pb2.UpsertGraphDeltaRequest())
+        group.blocks.append(block)
+        if block.id in parent_edge_by_block:
+            group.edges.append(parent_edge_by_block[block.id])
+
+    edge_groups = [knowledge_pb2.UpsertGraphDeltaRequest(edges=[edge]) for edge in other_edges]
+    phases = [_pack(groups, max_bytes) for groups in (entity_groups, list(tree_groups.values()), edge_groups)]
+    return [phase for phase in phases if phase]
@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+from collections import deque
+from typing import Iterable
+
+# Surface forms shorter than this are too likely to be ordinary words or initials to trust
+# without model confirmation, even when only one entity uses them.
+MIN_UNAMBIGUOUS_FORM_LENGTH = 4
+
+
+def _normalize(text: str) -> str:
+    # Lowercase character by character so match offsets stay aligned with the scanned text.
+    return "".join(lowered if len(lowered := char.lower()) == 1 else char for char in text)
+
+
+def _is_word_char(char: str) -> bool:
+    return char.isalnum() or char == "_"
+
+
+class MentionIndex:
+    """Aho-Corasick automaton over entity surface forms (names and aliases).
+
+    One pass over a text finds every whole-word, case-insensitive occurrence of every surface
+    form, so scanning all blocks costs time linear in the total text plus the number of matches
+    rather than blocks x entities.
+    """
+
+    def __init__(self, surface_forms: Iterable[tuple[str, str]]) -> None:
+        self._goto: list[dict[str, int]] = [{}]
+        self._fail: list[int] = [0]
+        self._outputs: list[list[str]] = [[]]
+        self.owners: dict[str, set[str]] = {}
+
+        for entity_id, form in surface_forms:
+            normalized = _normalize(form.strip())
+            if not normalized:
+                continue
+            if normalized not in self.owners:
+                self._insert(normalized)
+            self.owners.setdefault(normalized, set()).add(entity_id)
+        self._link()
+
+    def _insert(self, form: str) -> None:
+        state = 0
+        for char in form:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._outputs.append([])
+            state = next_state
+        self._outputs[state].append(form)
+
+    def _link(self) -> None:
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                # Depth-one states find themselves under the root and must fail back to it.
+                self._fail[next_state] = target if target != next_state else 0
+                self._outputs[next_state] = self._outputs[next_state] + self._outputs[self._fail[next_state]]
+
+    def find(self, text: str) -> set[str]:
+        """Return the normalized surface forms that occur in `text` as whole words."""
+
+        normalized = _normalize(text)
+        found: set[str] = set()
+        state = 0
+        for end, char in enumerate(normalized):
+            while state and char not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(char, 0)
+            for form in self._outputs[state]:
+                start = end - len(form) + 1
+                if start > 0 and _is_word_char(normalized[start - 1]):
+                    continue
+                if end + 1 < len(normalized) and _is_word_char(normalized[end + 1]):
+                    continue
+                found.add(form)
+        return found
+
+    def is_unambiguous(self, form: str) -> bool:
+        return len(self.owners.get(form, ())) == 1 and len(form) >= MIN_UNAMBIGUOUS_FORM_LENGTH
+
+
+def mention_candidates(
+    index: MentionIndex,
+    blocks: Iterable[tuple[str, str]],
+) -> tuple[list[tuple[str, str]], dict[str, set[str]]]:
+    """Split (block_id, text) pairs into confirmed and ambiguous block/entity mention candidates.
+
+    A pair is confirmed when at least one matched surface form belongs to that entity alone and is
+    long enough to trust; the remaining matched pairs are returned per block for model confirmation.
+    """
+
+    confirmed: list[tuple[str, str]] = []
+    ambiguous: dict[str, set[str]] = {}
+    for block_id, text in blocks:
+        confirmed_entity_ids: set[str] = set()
+        candidate_entity_ids: set[str] = set()
+        for form in index.find(text):
+            owners = index.owners[form]
+            if index.is_unambiguous(form):
+                confirmed_entity_ids.update(owners)
+            else:
+                candidate_entity_ids.update(owners)
+        confirmed.extend((block_id, entity_id) for entity_id in sorted(confirmed_entity_ids))
+        candidate_entity_ids -= confirmed_entity_ids
+        if candidate_entity_ids:
+            ambiguous[block_id] = candidate_entity_ids
+    return confirmed, ambiguous
@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+from app.services.grpc import knowledge_pb2
+
+
+def _require_reply(reply: object, rpc_name: str) -> None:
+    if reply is None:
+        raise RuntimeError(f"knowledge.update received empty response from {rpc_name}")
+
+
+def candidate_matches(reply: knowledge_pb2.FindEntityCandidatesReply) -> list[dict[str, object]]:
+    _require_reply(reply, "FindEntityCandidates")
+    return [
+        {
+            "entity_id": candidate.entity_id,
+            "entity_name": candidate.entity_name,
+            "entity_type_id": candidate.entity_type_id,
+            "score": candidate.score,
+        }
+        for candidate in reply.candidates
+    ]
+
+
+def entity_context(reply: knowledge_pb2.GetEntityContextReply) -> dict[str, object]:
+    """The parts of an existing entity's context that the comparison and graph prompts use."""
+
+    _require_reply(reply, "GetEntityContext")
+    return {
+        "entity": {
+            "id": reply.entity.id,
+            "type_id": reply.entity.type_id,
+            "name": reply.entity.name,
+            "aliases": list(reply.entity.aliases),
+        },
+        "properties": dict(reply.entity_properties),
+        "blocks": [
+            {
+                "id": block.id,
+                "parent_block_id": block.parent_block_id if block.HasField("parent_block_id") else None,
+                "block_level": block.block_level,
+                "text": block.text,
+            }
+            for block in reply.blocks
+        ],
+        "neighbors": [
+            {
+                "direction": knowledge_pb2.NeighborDirection.Name(neighbor.direction),
+                "edge_type": neighbor.edge_type,
+                "other_entity": {
+                    "id": neighbor.other_entity.id,
+                    "type_id": neighbor.other_entity.type_id,
+                    "name": neighbor.other_entity.name,
+                },
+            }
+            for neighbor in reply.neighbors
+        ],
+    }
+
+
+def writable_property_context(reply: knowledge_pb2.GetEntityTypePropertyContextReply) -> dict[str, object]:
+    _require_reply(reply, "GetEntityTypePropertyContext")
+    return {
+        "type_id": reply.type_id,
+        "type_name": reply.type_name,
+        "properties": [
+            {
+                "prop_name": prop.prop_name,
+                "value_type": prop.value_type,
+                "required": prop.required,
+                "description": prop.description,
+            }
+            for prop in reply.properties
+            if prop.writable and prop.prop_name
+        ],
+    }
+
+
+def edge_schema_context(reply: knowledge_pb2.GetEdgeExtractionSchemaContextReply) -> dict[str, object]:
+    _require_reply(reply, "GetEdgeExtractionSchemaContext")
+    return {
+        "edge_types": [
+            {
+                "edge_type_id": edge_type.edge_type_id,
+                "edge_name": edge_type.edge_name,
+                "edge_description": edge_type.edge_description,
+                "source_entity_type_id": edge_type.source_entity_type_id,
+                "target_entity_type_id": edge_type.target_entity_type_id,
+            }
+            for edge_type in reply.edge_types
+        ],
+    }
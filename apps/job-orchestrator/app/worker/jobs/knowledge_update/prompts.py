@@ -1,6 +1,14 @@
 from __future__ import annotations
 
 import json
+import logging
+import math
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+# Rough average for English text and JSON with the tokenizers behind the model-provider aliases.
+_CHARS_PER_TOKEN = 4
 
 
 def build_step_two_entity_extraction_system_prompt(entity_schema_context: dict[str, object]) -> str:
@@ -19,6 +27,64 @@ def build_step_two_entity_extraction_system_prompt(entity_schema_context: dict[s
                 "Universe handling: if an entity is fictional and no matching universe exists in context, add an "
                 "entry to extracted_universes and reference it from extracted_entities[].universe_id when possible."
             ),
-            "Entity extraction schema context (JSON):\n" + json.dumps(entity_schema_context, sort_keys=True),
+            "Entity extraction schema context (JSON):\n" + compact_json(entity_schema_context, sort_keys=True),
         ]
     )
+
+
+def estimate_tokens(text: str) -> int:
+    return math.ceil(len(text) / _CHARS_PER_TOKEN)
+
+
+def prune_empty(value: Any) -> Any:
+    """Drop None, empty strings and empty containers from dicts and lists, recursively.
+
+    Booleans and numbers are kept even when falsy: `required: false` or `confidence: 0` carry
+    meaning, an absent alias list or a null parent does not.
+    """
+
+    if isinstance(value, dict):
+        pruned = {key: prune_empty(item) for key, item in value.items()}
+        return {key: item for key, item in pruned.items() if not _is_empty(item)}
+    if isinstance(value, (list, tuple)):
+        return [item for item in (prune_empty(item) for item in value) if not _is_empty(item)]
+    return value
+
+
+def _is_empty(value: Any) -> bool:
+    return value is None or (isinstance(value, (str, list, tuple, dict)) and not value)
+
+
+def compact_json(value: Any, *, sort_keys: bool = False) -> str:
+    return json.dumps(prune_empty(value), ensure_ascii=False, separators=(",", ":"), sort_keys=sort_keys)
+
+
+def build_prompt(
+    *,
+    step_name: str,
+    shared: dict[str, Any] | None = None,
+    specific: dict[str, Any],
+) -> str:
+    """Encode a step's user prompt as one minified JSON object.
+
+    `shared` holds context that is identical across the step's calls (the batch document, a
+    type's schema context) and is written first, so consecutive calls share a byte-identical
+    prefix after the system prompt that provider-side prompt caching can reuse. `specific`
+    holds the per-call part. Empty fields are dropped from both.
+    """
+
+    shared_part = prune_empty(shared or {})
+    prompt = json.dumps(
+        {**shared_part, **prune_empty(specific)},
+        ensure_ascii=False,
+        separators=(",", ":"),
+    )
+    logger.debug(
+        "knowledge.update prompt built",
+        extra={
+            "step_name": step_name,
+            "prompt_tokens_estimate": estimate_tokens(prompt),
+            "shared_tokens_estimate": estimate_tokens(compact_json(shared_part)) if shared_part else 0,
+        },
+    )
+    return prompt
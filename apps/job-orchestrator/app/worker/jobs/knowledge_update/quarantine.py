@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+import logging
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Awaitable, Callable, Iterable, Iterator, TypeVar
+
+from app.contracts import KnowledgeUpdateQuarantine
+from app.worker.jobs.knowledge_update.concurrency import gather_bounded
+from app.worker.jobs.knowledge_update_types import (
+    EntityExtractionResult,
+    FinalEntityContextGraph,
+    MatchedRelationship,
+    ResolvedEntity,
+)
+
+logger = logging.getLogger(__name__)
+
+_ItemT = TypeVar("_ItemT")
+_ResultT = TypeVar("_ResultT")
+
+_isolation_enabled: ContextVar[bool] = ContextVar("knowledge_update_entity_isolation", default=False)
+
+
+@contextmanager
+def entity_isolation_scope(enabled: bool) -> Iterator[None]:
+    """Let per-entity fan-outs inside the current job quarantine failing entities instead of failing the job."""
+
+    token = _isolation_enabled.set(enabled)
+    try:
+        yield
+    finally:
+        _isolation_enabled.reset(token)
+
+
+async def gather_isolated(
+    items: Iterable[_ItemT],
+    call: Callable[[_ItemT], Awaitable[_ResultT]],
+    *,
+    step_name: str,
+    describe: Callable[[_ItemT], str],
+) -> list[_ResultT | None]:
+    """`gather_bounded` over per-entity calls, yielding None for entities whose call failed.
+
+    Outside an isolation scope the first failure propagates as before. Inside one, a failed
+    entity is logged and quarantined while the others complete; only when every entity fails
+    is the first error re-raised, since nothing would be left to commit.
+    """
+
+    if not _isolation_enabled.get():
+        return await gather_bounded(items, call)
+
+    pending = list(items)
+    failures: list[Exception] = []
+
+    async def _isolated(item: _ItemT) -> _ResultT | None:
+        try:
+            return await call(item)
+        except Exception as exc:  # noqa: BLE001
+            failures.append(exc)
+            logger.warning(
+                "knowledge.update quarantined entity after failure",
+                extra={
+                    "step_name": step_name,
+                    "entity": describe(item),
+                    "exception_class": type(exc).__name__,
+                    "error": str(exc),
+                },
+            )
+            return None
+
+    results = await gather_bounded(pending, _isolated)
+    if pending and len(failures) == len(pending):
+        raise failures[0]
+    return results
+
+
+def _committed_entity_ids(final_graphs: list[FinalEntityContextGraph]) -> set[str]:
+    return {entity_id for graph in final_graphs if isinstance(entity_id := graph.entity.get("entity_id"), str)}
+
+
+def committed_relationships(
+    relationships: list[MatchedRelationship],
+    final_graphs: list[FinalEntityContextGraph],
+) -> list[MatchedRelationship]:
+    """Drop relationships touching an entity quarantined in step eight, which step seven did not see."""
+
+    committed_ids = _committed_entity_ids(final_graphs)
+    return [
+        relationship
+        for relationship in relationships
+        if relationship.from_entity_id in committed_ids and relationship.to_entity_id in committed_ids
+    ]
+
+
+def committed_resolutions(
+    resolved_entities: list[ResolvedEntity],
+    final_graphs: list[FinalEntityContextGraph],
+) -> list[ResolvedEntity]:
+    committed_ids = _committed_entity_ids(final_graphs)
+    return [resolved for resolved in resolved_entities if resolved.resolved_entity_id in committed_ids]
+
+
+def build_quarantine(
+    source_job_id: str,
+    extraction: EntityExtractionResult,
+    resolved_entities: list[ResolvedEntity],
+    final_graphs: list[FinalEntityContextGraph],
+) -> KnowledgeUpdateQuarantine | None:
+    """Collect the extracted entities without a final graph, with the universes they name."""
+
+    committed_indexes = {resolved.entity_index for resolved in committed_resolutions(resolved_entities, final_graphs)}
+    quarantined = [
+        entity for index, entity in enumerate(extraction.extracted_entities) if index not in committed_indexes
+    ]
+    if not quarantined:
+        return None
+    universe_names = {entity.universe_id for entity in quarantined if entity.universe_id}
+    return KnowledgeUpdateQuarantine(
+        source_job_id=source_job_id,
+        extracted_entities=[entity.model_dump() for entity in quarantined],
+        extracted_universes=[
+            universe.model_dump() for universe in extraction.extracted_universes if universe.name in universe_names
+        ],
+    )
@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import logging
+
+import asyncpg
+
+from app.entity_resolution_memo_repository import EntityResolutionMemoRepository
+from app.worker.jobs.knowledge_update.entity_dedup import normalize_entity_name
+from app.worker.jobs.knowledge_update_types import CandidateMatchResult, ExtractedEntity, ResolvedEntity
+
+logger = logging.getLogger(__name__)
+
+_MEMO_STORE_ERRORS = (OSError, asyncpg.PostgresError, asyncpg.InterfaceError)
+
+# Only resolutions at least this certain let a later job skip candidate search and comparison.
+MIN_MEMO_CONFIDENCE = 0.85
+# Step five returns a decision, not a score; a model-confirmed match is remembered at this confidence.
+DETAILED_COMPARISON_CONFIDENCE = 0.9
+# The job created the entity under exactly this name and type.
+NEW_ENTITY_CONFIDENCE = 1.0
+# An embedding-screen match is a cosine guess no model confirmed; it is remembered at its
+# similarity but never at or above MIN_MEMO_CONFIDENCE, so a later job still compares it.
+EMBEDDING_MATCH_MAX_CONFIDENCE = 0.8
+
+
+def memo_key(entity: ExtractedEntity) -> tuple[str, str]:
+    return entity.node_type, normalize_entity_name(entity.name)
+
+
+class EntityResolutionMemo:
+    """Per-user view over remembered entity resolutions.
+
+    Like checkpoints, the memo is an optimization: store failures are logged and treated as a
+    miss, and a remembered entity that the knowledge graph no longer returns is forgotten so the
+    entity goes through normal candidate matching.
+    """
+
+    def __init__(self, repository: EntityResolutionMemoRepository, user_id: str, ttl_seconds: float) -> None:
+        self._repository = repository
+        self._user_id = user_id
+        self._ttl_seconds = ttl_seconds
+
+    async def lookup(self, entities: list[ExtractedEntity]) -> dict[int, tuple[str, float]]:
+        """Return remembered (entity_id, confidence) by extracted-entity index for confident hits."""
+
+        keys = [memo_key(entity) for entity in entities]
+        try:
+            remembered = await self._repository.load(self._user_id, sorted(set(keys)), self._ttl_seconds)
+        except _MEMO_STORE_ERRORS as exc:
+            logger.warning("knowledge.update resolution memo load failed", extra={"error": str(exc)})
+            return {}
+        hits = {
+            index: remembered[key]
+            for index, key in enumerate(keys)
+            if key in remembered and remembered[key][1] >= MIN_MEMO_CONFIDENCE
+        }
+        logger.info(
+            "knowledge.update resolution memo lookup",
+            extra={"entities": len(entities), "hits": len(hits)},
+        )
+        return hits
+
+    async def forget(self, entity_ids: list[str]) -> None:
+        try:
+            await self._repository.forget_entities(self._user_id, entity_ids)
+        except _MEMO_STORE_ERRORS as exc:
+            logger.warning("knowledge.update resolution memo invalidation failed", extra={"error": str(exc)})
+
+    async def remember(
+        self,
+        candidate_matching: list[CandidateMatchResult],
+        resolved_entities: list[ResolvedEntity],
+    ) -> None:
+        """Store how this job resolved each entity; call only after the graph delta was upserted."""
+
+        match_by_index = {item.entity_index: item for item in candidate_matching}
+        entries: dict[tuple[str, str], tuple[str, float]] = {}
+        for resolved in resolved_entities:
+            match = match_by_index.get(resolved.entity_index)
+            if resolved.resolution_status == "new_entity":
+                confidence = NEW_ENTITY_CONFIDENCE
+            elif resolved.match_similarity is not None:
+                confidence = min(resolved.match_similarity, EMBEDDING_MATCH_MAX_CONFIDENCE)
+            elif match is not None and match.status == "matched":
+                confidence = next(
+                    (
+                        float(candidate["score"])
+                        for candidate in match.candidate_matches
+                        if candidate.get("entity_id") == resolved.resolved_entity_id
+                        and isinstance(candidate.get("score"), (float, int))
+                    ),
+                    0.0,
+                )
+            else:
+                confidence = DETAILED_COMPARISON_CONFIDENCE
+            entries[memo_key(resolved.extracted_entity)] = (resolved.resolved_entity_id, confidence)
+        try:
+            await self._repository.save(self._user_id, entries)
+        except _MEMO_STORE_ERRORS as exc:
+            logger.warning("knowledge.update resolution memo save failed", extra={"error": str(exc)})
@@ -0,0 +1,219 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import logging
+import time
+from collections import Counter
+from typing import Any, Awaitable, Callable
+
+import grpc
+
+from app.services.grpc import knowledge_pb2
+
+logger = logging.getLogger(__name__)
+
+_SERVICE_PREFIX = "/exobrain.knowledge.v1.KnowledgeInterface/"
+_GET_ENTITY_CONTEXT = f"{_SERVICE_PREFIX}GetEntityContext"
+_SCHEMA_CACHE_MAX_ENTRIES = 1024
+
+# Schema-context replies depend only on the schema and the request, so they may outlive one job.
+SCHEMA_METHODS = frozenset(
+    {
+        f"{_SERVICE_PREFIX}GetEntityTypePropertyContext",
+        f"{_SERVICE_PREFIX}GetEdgeExtractionSchemaContext",
+        f"{_SERVICE_PREFIX}GetEntityExtractionSchemaContext",
+    }
+)
+
+# Read-only lookups whose answers cannot change because of anything the job itself does before
+# its final UpsertGraphDelta. Every other method passes straight through to the channel.
+CACHED_METHODS = SCHEMA_METHODS | {_GET_ENTITY_CONTEXT}
+
+
+def _consume_exception(task: asyncio.Future[Any]) -> None:
+    if not task.cancelled():
+        task.exception()
+
+
+def shallow_entity_context(
+    reply: knowledge_pb2.GetEntityContextReply,
+    max_block_level: int,
+) -> knowledge_pb2.GetEntityContextReply:
+    """Derive the reply a shallower `GetEntityContext` would return from a deeper one.
+
+    The service selects blocks by their depth below the root block; entity properties and
+    neighbors do not depend on `max_block_level`, so dropping deeper blocks is exact.
+    """
+
+    if all(block.block_level <= max_block_level for block in reply.blocks):
+        return reply
+    shallow = knowledge_pb2.GetEntityContextReply()
+    shallow.CopyFrom(reply)
+    del shallow.blocks[:]
+    shallow.blocks.extend(block for block in reply.blocks if block.block_level <= max_block_level)
+    return shallow
+
+
+def schema_fingerprint(reply: knowledge_pb2.GetSchemaReply) -> str:
+    return hashlib.sha256(reply.SerializeToString(deterministic=True)).hexdigest()
+
+
+class SchemaContextCache:
+    """Worker-wide schema-context replies shared by consecutive jobs of a pooled worker process.
+
+    Entries expire after a TTL and are all dropped as soon as a job reports a different schema
+    fingerprint, so a schema change is picked up by the next job rather than after the TTL.
+    """
+
+    def __init__(self, max_entries: int = _SCHEMA_CACHE_MAX_ENTRIES) -> None:
+        self._max_entries = max_entries
+        self._schema_version: str | None = None
+        self._entries: dict[tuple[str, bytes], tuple[float, Any]] = {}
+
+    def use_schema_version(self, schema_version: str) -> None:
+        if schema_version != self._schema_version:
+            if self._entries:
+                logger.info(
+                    "knowledge.update schema changed, dropping cached schema contexts",
+                    extra={"entries": len(self._entries)},
+                )
+            self._entries.clear()
+            self._schema_version = schema_version
+
+    def get(self, key: tuple[str, bytes], *, ttl_seconds: float) -> Any | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        stored_at, reply = entry
+        if time.monotonic() - stored_at > ttl_seconds:
+            del self._entries[key]
+            return None
+        return reply
+
+    def put(self, key: tuple[str, bytes], reply: Any) -> None:
+        self._entries.pop(key, None)
+        while len(self._entries) >= self._max_entries:
+            del self._entries[next(iter(self._entries))]
+        self._entries[key] = (time.monotonic(), reply)
+
+
+class KnowledgeInterfaceCache:
+    """Job-scoped read-through cache in front of a KnowledgeInterface channel.
+
+    Exposes the `unary_unary` factory the steps already use. Identical concurrent lookups share
+    one in-flight call, and a cached or in-flight `GetEntityContext` answers any request for the
+    same entity with a lower or equal `max_block_level`. Failed calls are evicted so retries
+    reach the service again. Cached replies are shared between callers and must not be mutated.
+
+    With `schema_cache`, schema-context lookups are also read from and written to that
+    worker-wide cache; the caller must have pinned it to the current schema version first.
+    """
+
+    def __init__(
+        self,
+        channel: grpc.aio.Channel,
+        *,
+        schema_cache: SchemaContextCache | None = None,
+        schema_cache_ttl_seconds: float = 0.0,
+    ) -> None:
+        self._channel = channel
+        self._schema_cache = schema_cache
+        self._schema_cache_ttl_seconds = schema_cache_ttl_seconds
+        self._entries: dict[tuple[str, bytes], asyncio.Future[Any]] = {}
+        self._entity_contexts: dict[tuple[str, str], tuple[int, asyncio.Future[Any]]] = {}
+        self.stats: Counter[str] = Counter()
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._channel, name)
+
+    def unary_unary(
+        self,
+        method: str,
+        request_serializer: Callable[[Any], bytes],
+        response_deserializer: Callable[[bytes], Any],
+    ) -> Callable[[Any], Awaitable[Any]]:
+        rpc = self._channel.unary_unary(
+            method,
+            request_serializer=request_serializer,
+            response_deserializer=response_deserializer,
+        )
+        if method not in CACHED_METHODS:
+            return rpc
+        if method == _GET_ENTITY_CONTEXT:
+            return lambda request: self._get_entity_context(rpc, request)
+        return lambda request: self._lookup(method, rpc, request)
+
+    def _start(self, rpc: Callable[[Any], Awaitable[Any]], request: Any, evict: Callable[[], None]) -> asyncio.Future[Any]:
+        task = asyncio.ensure_future(rpc(request))
+
+        def _on_done(done: asyncio.Future[Any]) -> None:
+            _consume_exception(done)
+            if done.cancelled() or done.exception() is not None:
+                evict()
+
+        task.add_done_callback(_on_done)
+        return task
+
+    async def _lookup(self, method: str, rpc: Callable[[Any], Awaitable[Any]], request: Any) -> Any:
+        key = (method, request.SerializeToString(deterministic=True))
+        task = self._entries.get(key)
+        if task is None and self._schema_cache is not None and method in SCHEMA_METHODS:
+            reply = self._schema_cache.get(key, ttl_seconds=self._schema_cache_ttl_seconds)
+            if reply is not None:
+                self.stats["shared_hits"] += 1
+                task = asyncio.get_running_loop().create_future()
+                task.set_result(reply)
+                self._entries[key] = task
+                return reply
+        if task is None:
+            self.stats["misses"] += 1
+
+            def _evict() -> None:
+                if self._entries.get(key) is task:
+                    del self._entries[key]
+
+            task = self._start(rpc, request, _evict)
+            self._entries[key] = task
+            if self._schema_cache is not None and method in SCHEMA_METHODS:
+                task.add_done_callback(self._store_shared(key))
+        else:
+            self.stats["hits" if task.done() else "coalesced"] += 1
+        # Shield the shared call so one cancelled waiter does not cancel it for the others.
+        return await asyncio.shield(task)
+
+    def _store_shared(self, key: tuple[str, bytes]) -> Callable[[asyncio.Future[Any]], None]:
+        def _store(done: asyncio.Future[Any]) -> None:
+            if self._schema_cache is not None and not done.cancelled() and done.exception() is None:
+                if done.result() is not None:
+                    self._schema_cache.put(key, done.result())
+
+        return _store
+
+    async def _get_entity_context(
+        self,
+        rpc: Callable[[Any], Awaitable[Any]],
+        request: knowledge_pb2.GetEntityContextRequest,
+    ) -> knowledge_pb2.GetEntityContextReply:
+        key = (request.entity_id, request.user_id)
+        entry = self._entity_contexts.get(key)
+        if entry is not None and entry[0] >= request.max_block_level:
+            task = entry[1]
+            self.stats["hits" if task.done() else "coalesced"] += 1
+        else:
+            self.stats["misses"] += 1
+
+            def _evict() -> None:
+                current = self._entity_contexts.get(key)
+                if current is not None and current[1] is task:
+                    del self._entity_contexts[key]
+
+            task = self._start(rpc, request, _evict)
+            self._entity_contexts[key] = (request.max_block_level, task)
+        reply = await asyncio.shield(task)
+        if reply is None:
+            return reply
+        return shallow_entity_context(reply, request.max_block_level)
+
+    def log_stats(self) -> None:
+        logger.info("knowledge.update knowledge-interface cache", extra=dict(self.stats))
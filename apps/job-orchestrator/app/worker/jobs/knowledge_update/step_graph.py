@@ -0,0 +1,181 @@
+from __future__ import annotations
+
+import asyncio
+import inspect
+import logging
+import time
+from datetime import UTC, datetime
+from typing import Callable, Mapping
+
+from pydantic import BaseModel, ConfigDict
+
+from app.worker.jobs.knowledge_update.checkpoints import StepCheckpoints, hash_step_inputs
+from app.worker.jobs.knowledge_update.telemetry import current_telemetry
+
+logger = logging.getLogger(__name__)
+
+
+class StepSpec(BaseModel):
+    """One node of the knowledge.update step graph.
+
+    `run` is called with one keyword argument per declared input and may return a value or an
+    awaitable; the result is published under `output` for downstream steps. Steps that declare
+    an `output_type` are checkpointed and skipped on retry when their inputs are unchanged.
+    """
+
+    model_config = ConfigDict(frozen=True, arbitrary_types_allowed=True)
+
+    name: str
+    inputs: tuple[str, ...] = ()
+    output: str
+    run: Callable[..., object]
+    output_type: object | None = None
+
+
+class StepTiming(BaseModel):
+    name: str
+    started_at: datetime
+    finished_at: datetime
+    duration_ms: float
+    waited_on: str | None = None
+    resumed: bool = False
+
+
+class StepGraphResult(BaseModel):
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    values: dict[str, object]
+    timings: list[StepTiming]
+    critical_path: list[str]
+
+
+def _validate_step_graph(steps: list[StepSpec], initial_keys: set[str]) -> None:
+    produced: set[str] = set(initial_keys)
+    for step in steps:
+        if step.output in produced:
+            raise ValueError(f"knowledge.update step graph output '{step.output}' is produced more than once")
+        produced.add(step.output)
+
+    names = [step.name for step in steps]
+    if len(names) != len(set(names)):
+        raise ValueError("knowledge.update step graph step names must be unique")
+
+    for step in steps:
+        missing = [item for item in step.inputs if item not in produced]
+        if missing:
+            raise ValueError(
+                f"knowledge.update step graph step '{step.name}' depends on unknown inputs: {', '.join(missing)}"
+            )
+
+
+def _critical_path(timings: dict[str, StepTiming]) -> list[str]:
+    if not timings:
+        return []
+    path: list[str] = []
+    current: StepTiming | None = max(timings.values(), key=lambda timing: timing.finished_at)
+    while current is not None:
+        path.append(current.name)
+        current = timings.get(current.waited_on) if current.waited_on else None
+    return list(reversed(path))
+
+
+async def run_step_graph(
+    steps: list[StepSpec],
+    initial: Mapping[str, object],
+    *,
+    checkpoints: StepCheckpoints | None = None,
+) -> StepGraphResult:
+    """Run every step as soon as its inputs are available, starting independent steps concurrently.
+
+    The first failing step cancels the steps still running and its exception is re-raised unchanged.
+    Each finished step records the producer of its last-arriving input, which yields the critical path.
+    """
+
+    _validate_step_graph(steps, set(initial))
+    telemetry = current_telemetry()
+
+    values: dict[str, object] = dict(initial)
+    producer_by_output = {step.output: step.name for step in steps}
+    ready_at: dict[str, float] = {}
+    timings: dict[str, StepTiming] = {}
+    pending = list(steps)
+    running: dict[asyncio.Task[tuple[object, bool]], tuple[StepSpec, datetime, float]] = {}
+
+    async def _invoke(step: StepSpec) -> tuple[object, bool]:
+        kwargs = {name: values[name] for name in step.inputs}
+        input_hash = ""
+        if checkpoints is not None and step.output_type is not None:
+            input_hash = hash_step_inputs(step.name, kwargs)
+            found, restored = await checkpoints.load(step.name, input_hash, step.output_type)
+            if found:
+                return restored, True
+
+        result = step.run(**kwargs)
+        if inspect.isawaitable(result):
+            result = await result
+
+        if checkpoints is not None and step.output_type is not None:
+            await checkpoints.save(step.name, input_hash, step.output_type, result)
+        return result, False
+
+    try:
+        while pending or running:
+            for step in [item for item in pending if all(name in values for name in item.inputs)]:
+                pending.remove(step)
+                task = asyncio.ensure_future(_invoke(step))
+                running[task] = (step, datetime.now(UTC), time.monotonic())
+
+            if not running:
+                blocked = ", ".join(step.name for step in pending)
+                raise RuntimeError(f"knowledge.update step graph has unsatisfiable steps: {blocked}")
+
+            done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                step, started_at, started_monotonic = running.pop(task)
+                values[step.output], resumed = task.result()
+                finished_monotonic = time.monotonic()
+                ready_at[step.output] = finished_monotonic
+                produced_inputs = [name for name in step.inputs if name in producer_by_output]
+                last_input = max(produced_inputs, key=lambda name: ready_at[name], default=None)
+                timing = StepTiming(
+                    name=step.name,
+                    started_at=started_at,
+                    finished_at=datetime.now(UTC),
+                    duration_ms=round((finished_monotonic - started_monotonic) * 1000, 3),
+                    waited_on=producer_by_output[last_input] if last_input else None,
+                    resumed=resumed,
+                )
+                timings[step.name] = timing
+                if telemetry is not None:
+                    telemetry.record_step(
+                        step_name=timing.name,
+                        started_at=timing.started_at,
+                        finished_at=timing.finished_at,
+                        duration_ms=timing.duration_ms,
+                        resumed=timing.resumed,
+                    )
+                logger.info(
+                    "knowledge.update step finished",
+                    extra={
+                        "step": timing.name,
+                        "started_at": timing.started_at.isoformat(),
+                        "finished_at": timing.finished_at.isoformat(),
+                        "duration_ms": timing.duration_ms,
+                        "resumed": timing.resumed,
+                    },
+                )
+    except BaseException:
+        for task in running:
+            task.cancel()
+        await asyncio.gather(*running, return_exceptions=True)
+        raise
+
+    critical_path = _critical_path(timings)
+    if telemetry is not None:
+        telemetry.record_critical_path(critical_path)
+    logger.info(
+        "knowledge.update step graph completed",
+        extra={"critical_path": critical_path, "steps": len(timings)},
+    )
+    ordered_timings = sorted(timings.values(), key=lambda timing: timing.started_at)
+    return StepGraphResult(values=values, timings=ordered_timings, critical_path=critical_path)
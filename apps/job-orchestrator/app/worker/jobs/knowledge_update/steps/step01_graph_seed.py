@@ -3,8 +3,9 @@ from __future__ import annotations
 import grpc
 
 from app.contracts import KnowledgeUpdatePayload
+from app.services.grpc import knowledge_pb2
 from app.worker.jobs.knowledge_update import core
 
 
-async def run(channel: grpc.aio.Channel, payload: KnowledgeUpdatePayload) -> dict[str, object]:
+async def run(channel: grpc.aio.Channel, payload: KnowledgeUpdatePayload) -> knowledge_pb2.UpsertGraphDeltaRequest:
     return await core._build_upsert_graph_delta_step_one(channel, payload)
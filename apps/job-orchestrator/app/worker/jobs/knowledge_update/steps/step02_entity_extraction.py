@@ -5,6 +5,7 @@ import grpc
 from app.contracts import KnowledgeUpdatePayload
 from app.settings import Settings
 from app.worker.jobs.knowledge_update import core
+from app.worker.jobs.knowledge_update.entity_dedup import deduplicate_extracted_entities
 from app.worker.jobs.knowledge_update.types import EntityExtractionResult
 
 
@@ -22,4 +23,5 @@ async def run(
     markdown_document: str,
     settings: Settings,
 ) -> EntityExtractionResult:
-    return await core._run_step_two_entity_extraction(channel, payload, markdown_document, settings)
+    extraction = await core._run_step_two_entity_extraction(channel, payload, markdown_document, settings)
+    return deduplicate_extracted_entities(extraction)
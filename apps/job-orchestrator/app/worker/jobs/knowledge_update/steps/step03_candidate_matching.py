@@ -4,6 +4,7 @@ import grpc
 
 from app.contracts import KnowledgeUpdatePayload
 from app.worker.jobs.knowledge_update import core
+from app.worker.jobs.knowledge_update.resolution_memo import EntityResolutionMemo
 from app.worker.jobs.knowledge_update.types import CandidateMatchResult, EntityExtractionResult
 
 
@@ -15,5 +16,6 @@ async def run(
     channel: grpc.aio.Channel,
     payload: KnowledgeUpdatePayload,
     extraction: EntityExtractionResult,
+    resolution_memo: EntityResolutionMemo | None = None,
 ) -> list[CandidateMatchResult]:
-    return await core._run_step_three_entity_candidate_matching(channel, payload, extraction)
+    return await core._run_step_three_entity_candidate_matching(channel, payload, extraction, resolution_memo)
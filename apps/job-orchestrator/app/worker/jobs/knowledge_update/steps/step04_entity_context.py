@@ -9,5 +9,5 @@ def build_json_schema() -> dict[str, object]:
     return core._build_step_four_entity_context_schema()
 
 
-async def run(extraction: EntityExtractionResult, markdown_document: str, settings: Settings) -> list[str]:
+async def run(extraction: EntityExtractionResult, markdown_document: str, settings: Settings) -> list[str | None]:
     return await core._run_step_four_create_entity_contexts(extraction, markdown_document, settings)
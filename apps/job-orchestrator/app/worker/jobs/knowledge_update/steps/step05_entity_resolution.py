@@ -20,7 +20,7 @@ async def run(
     channel: grpc.aio.Channel,
     payload: KnowledgeUpdatePayload,
     candidate_matching: list[CandidateMatchResult],
-    entity_context_documents: list[str],
+    entity_context_documents: list[str | None],
     settings: Settings,
 ) -> list[ResolvedEntity]:
     return await core._run_step_five_detailed_comparison(
@@ -16,7 +16,7 @@ async def run(
     channel: grpc.aio.Channel,
     payload: KnowledgeUpdatePayload,
     resolved_entities: list[ResolvedEntity],
-    entity_context_documents: list[str],
+    entity_context_documents: list[str | None],
     entity_pairs: list[RelationshipPair],
     settings: Settings,
 ) -> list[MatchedRelationship]:
@@ -16,7 +16,7 @@ async def run(
     channel: grpc.aio.Channel,
     payload: KnowledgeUpdatePayload,
     resolved_entities: list[ResolvedEntity],
-    entity_context_documents: list[str],
+    entity_context_documents: list[str | None],
     settings: Settings,
 ) -> list[FinalEntityContextGraph]:
     return await core._run_step_eight_build_final_entity_context_graphs(
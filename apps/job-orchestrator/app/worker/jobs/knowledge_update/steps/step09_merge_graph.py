@@ -1,21 +1,24 @@
 from __future__ import annotations
 
 from app.contracts import KnowledgeUpdatePayload
+from app.services.grpc import knowledge_pb2
 from app.worker.jobs.knowledge_update import core
 from app.worker.jobs.knowledge_update.types import EntityExtractionResult, FinalEntityContextGraph, MatchedRelationship
 
 
 def run(
     payload: KnowledgeUpdatePayload,
-    step_zero_graph_delta: dict[str, object],
+    step_zero_graph_delta: knowledge_pb2.UpsertGraphDeltaRequest | None,
     step_two_extraction: EntityExtractionResult,
     step_seven_relationships: list[MatchedRelationship],
     step_eight_final_entity_context_graphs: list[FinalEntityContextGraph],
-) -> dict[str, object]:
+    job_id: str,
+) -> knowledge_pb2.UpsertGraphDeltaRequest:
     return core._build_step_nine_merge_graph_delta(
         payload,
         step_zero_graph_delta,
         step_two_extraction,
         step_seven_relationships,
         step_eight_final_entity_context_graphs,
+        job_id,
     )
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+from app.services.grpc import knowledge_pb2
 from app.settings import Settings
 from app.worker.jobs.knowledge_update import core
 
@@ -8,5 +9,9 @@ def build_json_schema() -> dict[str, object]:
     return core._build_step_ten_mentions_schema()
 
 
-async def run(merged_graph_delta: dict[str, object], settings: Settings, requesting_user_id: str) -> dict[str, object]:
+async def run(
+    merged_graph_delta: knowledge_pb2.UpsertGraphDeltaRequest,
+    settings: Settings,
+    requesting_user_id: str,
+) -> knowledge_pb2.UpsertGraphDeltaRequest:
     return await core._run_step_ten_finalize_graph_delta(merged_graph_delta, settings, requesting_user_id)
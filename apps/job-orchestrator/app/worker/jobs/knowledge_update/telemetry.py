@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Iterator
+
+from app.contracts import JobMetrics, JobOperationMetrics, JobStepMetrics
+
+_job_telemetry: ContextVar[JobTelemetry | None] = ContextVar("knowledge_update_job_telemetry", default=None)
+
+
+def _operation_kind(operation: str) -> str:
+    return "llm" if operation.endswith((".ainvoke", ".aembed")) else "grpc"
+
+
+def _usage_from_reply(reply: object) -> tuple[int, int]:
+    """Model-provider token usage of a structured-completion reply."""
+
+    usage = reply.get("usage") if isinstance(reply, dict) else None
+    if not isinstance(usage, dict):
+        return 0, 0
+    return int(usage.get("input_tokens") or 0), int(usage.get("output_tokens") or 0)
+
+
+class JobTelemetry:
+    """Collects step timings and per-operation counters for one job, including failed attempts."""
+
+    def __init__(self) -> None:
+        self._operations: dict[tuple[str, str], JobOperationMetrics] = {}
+        self._steps: list[JobStepMetrics] = []
+        self._critical_path: list[str] = []
+
+    def record_step(
+        self,
+        *,
+        step_name: str,
+        started_at: datetime,
+        finished_at: datetime,
+        duration_ms: float,
+        resumed: bool,
+    ) -> None:
+        self._steps.append(
+            JobStepMetrics(
+                step=step_name,
+                started_at=started_at,
+                finished_at=finished_at,
+                duration_ms=duration_ms,
+                resumed=resumed,
+            )
+        )
+
+    def record_critical_path(self, critical_path: list[str]) -> None:
+        self._critical_path = list(critical_path)
+
+    def record_operation(
+        self,
+        *,
+        step_name: str,
+        operation: str,
+        attempt_durations_ms: list[float],
+        result: object = None,
+    ) -> None:
+        metrics = self._operations.get((step_name, operation))
+        if metrics is None:
+            metrics = JobOperationMetrics(step=step_name, operation=operation, kind=_operation_kind(operation))
+            self._operations[(step_name, operation)] = metrics
+        metrics.calls += 1
+        metrics.attempts += len(attempt_durations_ms)
+        metrics.total_ms = round(metrics.total_ms + sum(attempt_durations_ms), 3)
+        metrics.max_ms = round(max([metrics.max_ms, *attempt_durations_ms]), 3)
+        input_tokens, output_tokens = _usage_from_reply(result)
+        metrics.input_tokens += input_tokens
+        metrics.output_tokens += output_tokens
+
+    def build(self, *, wall_time_ms: float) -> JobMetrics:
+        operations = list(self._operations.values())
+        return JobMetrics(
+            wall_time_ms=round(wall_time_ms, 3),
+            critical_path=self._critical_path,
+            steps=sorted(self._steps, key=lambda item: item.started_at),
+            operations=operations,
+            total_input_tokens=sum(item.input_tokens for item in operations),
+            total_output_tokens=sum(item.output_tokens for item in operations),
+        )
+
+
+@contextmanager
+def job_telemetry_scope() -> Iterator[JobTelemetry]:
+    telemetry = JobTelemetry()
+    token = _job_telemetry.set(telemetry)
+    try:
+        yield telemetry
+    finally:
+        _job_telemetry.reset(token)
+
+
+def current_telemetry() -> JobTelemetry | None:
+    return _job_telemetry.get()
@@ -37,6 +37,8 @@ class ResolvedEntity(BaseModel):
     extracted_entity: ExtractedEntity
     resolved_entity_id: str
     resolution_status: Literal["new_entity", "matched"]
+    # Cosine similarity of a match taken from the embedding screen without a model comparison.
+    match_similarity: float | None = None
 
 
 class RelationshipPair(BaseModel):
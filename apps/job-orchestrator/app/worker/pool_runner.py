@@ -0,0 +1,165 @@
+from __future__ import annotations
+
+import asyncio
+import atexit
+import importlib
+import logging
+import multiprocessing
+import os
+import resource
+import sys
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from pydantic import BaseModel
+
+from app.contracts import JobEnvelope
+from app.logging import configure_logging
+from app.services.model_provider_chat_model import aclose_shared_http_client
+from app.worker.job_registry import JOB_MODULE_BY_TYPE
+
+logger = logging.getLogger(__name__)
+
+_worker_loop: asyncio.AbstractEventLoop | None = None
+
+
+class PooledJobResult(BaseModel):
+    pid: int
+    rss_bytes: int
+    error: str | None = None
+
+
+def _current_rss_bytes() -> int:
+    try:
+        with open("/proc/self/statm", encoding="utf-8") as statm:
+            resident_pages = int(statm.read().split()[1])
+        return resident_pages * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        # Peak rather than current RSS, but still a sound recycle signal where /proc is missing.
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def _initialize_worker_process(module_names: tuple[str, ...], log_level: str) -> None:
+    global _worker_loop
+
+    configure_logging(log_level, stream=sys.stdout, force=True)
+    for module_name in module_names:
+        importlib.import_module(module_name)
+    _worker_loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(_worker_loop)
+    atexit.register(_shutdown_worker_process)
+
+
+def _shutdown_worker_process() -> None:
+    if _worker_loop is None or _worker_loop.is_closed():
+        return
+    _worker_loop.run_until_complete(aclose_shared_http_client())
+    _worker_loop.close()
+
+
+def _warm_up() -> int:
+    return os.getpid()
+
+
+def _execute_job(module_name: str, job_json: str) -> PooledJobResult:
+    if _worker_loop is None:
+        raise RuntimeError("worker pool process was not initialized")
+
+    module = importlib.import_module(module_name)
+    run = getattr(module, "run_pooled", module.run)
+    job = JobEnvelope.model_validate_json(job_json)
+
+    error: str | None = None
+    try:
+        _worker_loop.run_until_complete(run(job))
+    except Exception as exc:  # noqa: BLE001
+        error = "".join(traceback.format_exception(type(exc), exc, exc.__traceback__)).strip()
+    return PooledJobResult(pid=os.getpid(), rss_bytes=_current_rss_bytes(), error=error)
+
+
+class PooledProcessWorkerRunner:
+    """Run jobs inside long-lived, pre-warmed worker processes.
+
+    Worker processes import every job module once and keep one event loop alive, so gRPC
+    channels, HTTP pools and module-level caches persist between jobs. Each process is
+    replaced after `max_jobs_per_process` jobs, and the whole pool is replaced once any
+    process reports a resident set above `max_rss_bytes`.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_workers: int,
+        max_jobs_per_process: int,
+        max_rss_bytes: int,
+        log_level: str = "INFO",
+    ) -> None:
+        self._max_workers = max_workers
+        self._max_jobs_per_process = max_jobs_per_process
+        self._max_rss_bytes = max_rss_bytes
+        self._log_level = log_level
+        self._executor: ProcessPoolExecutor | None = None
+
+    def _ensure_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self._max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_initialize_worker_process,
+                initargs=(tuple(sorted(set(JOB_MODULE_BY_TYPE.values()))), self._log_level),
+                max_tasks_per_child=self._max_jobs_per_process,
+            )
+        return self._executor
+
+    def _recycle(self, executor: ProcessPoolExecutor, *, reason: str) -> None:
+        if self._executor is not executor:
+            return
+        self._executor = None
+        # In-flight jobs on the old pool still finish; its processes exit afterwards.
+        executor.shutdown(wait=False)
+        logger.info("worker pool recycled", extra={"reason": reason})
+
+    async def start(self) -> None:
+        executor = self._ensure_executor()
+        loop = asyncio.get_running_loop()
+        pids = await asyncio.gather(*(loop.run_in_executor(executor, _warm_up) for _ in range(self._max_workers)))
+        logger.info("worker pool started", extra={"worker_pids": sorted(set(pids))})
+
+    async def run_job(self, job: JobEnvelope) -> None:
+        module_name = JOB_MODULE_BY_TYPE.get(job.job_type)
+        if module_name is None:
+            raise ValueError(f"no worker module configured for job type '{job.job_type}'")
+
+        executor = self._ensure_executor()
+        logger.debug("dispatching job to worker pool", extra={"job_id": job.job_id, "worker_module": module_name})
+        try:
+            result = await asyncio.get_running_loop().run_in_executor(
+                executor,
+                _execute_job,
+                module_name,
+                job.model_dump_json(),
+            )
+        except BrokenProcessPool as exc:
+            self._recycle(executor, reason="broken_pool")
+            raise RuntimeError(f"worker pool process exited unexpectedly for {job.job_type}") from exc
+
+        if result.rss_bytes > self._max_rss_bytes:
+            logger.info(
+                "worker pool process exceeded memory cap",
+                extra={"job_id": job.job_id, "worker_pid": result.pid, "rss_bytes": result.rss_bytes},
+            )
+            self._recycle(executor, reason="memory_cap")
+
+        if result.error is not None:
+            raise RuntimeError(result.error)
+
+        logger.debug(
+            "worker pool job succeeded",
+            extra={"job_id": job.job_id, "worker_module": module_name, "worker_pid": result.pid},
+        )
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
@@ -1,89 +1,195 @@
 from __future__ import annotations
 
 import asyncio
+import gzip
 import logging
+import shutil
 import sys
+from collections import deque
 from datetime import UTC, datetime
 from pathlib import Path
+from typing import AsyncIterator, BinaryIO
 
 from app.contracts import JobEnvelope
 from app.worker.job_registry import JOB_MODULE_BY_TYPE
 
 logger = logging.getLogger(__name__)
 
+_STREAM_CHUNK_BYTES = 64 * 1024
+_MAX_LINE_BYTES = 64 * 1024
+_LOG_QUEUE_LINES = 256
+
+
+async def _iter_stream_lines(stream: asyncio.StreamReader, max_line_bytes: int = _MAX_LINE_BYTES) -> AsyncIterator[str]:
+    """Yield decoded lines as they arrive; a line longer than `max_line_bytes` is split into pieces."""
+
+    pending = bytearray()
+    while chunk := await stream.read(_STREAM_CHUNK_BYTES):
+        pending.extend(chunk)
+        start = 0
+        while (newline := pending.find(b"\n", start)) != -1:
+            yield pending[start:newline].decode("utf-8", errors="replace").rstrip("\r")
+            start = newline + 1
+        del pending[:start]
+        while len(pending) > max_line_bytes:
+            yield pending[:max_line_bytes].decode("utf-8", errors="replace")
+            del pending[:max_line_bytes]
+    if pending:
+        yield pending.decode("utf-8", errors="replace").rstrip("\r")
+
+
+class _RotatingJobLogFile:
+    """Per-job output file that rolls over into gzip-compressed segments once it exceeds `max_bytes`.
+
+    Segments are named `<file>.1.gz` (newest) up to `<file>.<backup_count>.gz`; older ones are
+    dropped. Methods block on disk I/O and are called from a worker thread.
+    """
+
+    def __init__(self, path: Path, *, max_bytes: int, backup_count: int) -> None:
+        self.path = path
+        self._max_bytes = max_bytes
+        self._backup_count = backup_count
+        self._file: BinaryIO | None = None
+        self._size = 0
+
+    def write(self, data: bytes) -> None:
+        if self._file is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._file = self.path.open("ab")
+            self._size = self._file.tell()
+        if self._size and self._size + len(data) > self._max_bytes:
+            self._rotate()
+        self._file.write(data)
+        self._size += len(data)
+
+    def _rotate(self) -> None:
+        assert self._file is not None
+        self._file.close()
+        if self._backup_count > 0:
+            for index in range(self._backup_count - 1, 0, -1):
+                segment = self._segment_path(index)
+                if segment.exists():
+                    segment.replace(self._segment_path(index + 1))
+            with self.path.open("rb") as source, gzip.open(self._segment_path(1), "wb") as target:
+                shutil.copyfileobj(source, target)
+        self._file = self.path.open("wb")
+        self._size = 0
+
+    def _segment_path(self, index: int) -> Path:
+        return self.path.with_name(f"{self.path.name}.{index}.gz")
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class _JobOutputLog:
+    """Queue subprocess output lines and write them to the job log file off the event loop.
+
+    The queue is bounded, so a worker that outpaces the disk is slowed down through its pipe
+    instead of growing orchestrator memory. A `--- stdout ---`/`--- stderr ---` marker is
+    written whenever the source of consecutive lines changes.
+    """
+
+    def __init__(self, log_file: _RotatingJobLogFile) -> None:
+        self._log_file = log_file
+        self._queue: asyncio.Queue[str | None] = asyncio.Queue(maxsize=_LOG_QUEUE_LINES)
+        self._last_source: str | None = None
+        self._writer = asyncio.create_task(self._drain())
+
+    async def _drain(self) -> None:
+        try:
+            while True:
+                batch = [await self._queue.get()]
+                while not self._queue.empty() and batch[-1] is not None:
+                    batch.append(self._queue.get_nowait())
+                done = batch[-1] is None
+                text = "".join(line for line in batch if line is not None)
+                if text:
+                    await asyncio.to_thread(self._log_file.write, text.encode("utf-8"))
+                if done:
+                    return
+        finally:
+            await asyncio.to_thread(self._log_file.close)
+
+    async def write_line(self, text: str) -> None:
+        await self._queue.put(f"{text}\n")
+
+    async def write_output_line(self, source: str, line: str) -> None:
+        if source != self._last_source:
+            self._last_source = source
+            await self.write_line(f"--- {source} ---")
+        await self.write_line(line)
+
+    async def close(self) -> None:
+        await self._queue.put(None)
+        await self._writer
 
-class LocalProcessWorkerRunner:
-    """Run each job in its own python process by module script."""
-
-    @staticmethod
-    def _log_subprocess_output(
-        output: bytes,
-        *,
-        source: str,
-        job: JobEnvelope,
-        worker_module: str,
-        log_level: int,
-    ) -> None:
-        text = output.decode("utf-8", errors="replace").strip()
-        if not text:
-            return
 
-        for line in text.splitlines():
-            logger.log(
-                log_level,
-                "worker subprocess %s: %s",
-                source,
-                line,
-                extra={
-                    "job_id": job.job_id,
-                    "job_type": job.job_type,
-                    "worker_module": worker_module,
-                },
-            )
+class LocalProcessWorkerRunner:
+    """Run each job in its own python process by module script.
 
+    The job envelope is streamed to the worker over stdin. Worker output is streamed line by
+    line: stdout is forwarded to the orchestrator log as it arrives, both streams go to a
+    size-rotated per-job file under `logs/jobs/`, and only the last `stderr_tail_lines` stderr
+    lines are kept in memory for the log and the job error.
+    """
 
-    @staticmethod
-    def _write_job_output_log(
+    def __init__(
+        self,
         *,
-        job: JobEnvelope,
-        worker_module: str,
-        stdout: bytes,
-        stderr: bytes,
-        returncode: int,
+        log_max_bytes: int = 10 * 1024 * 1024,
+        log_backup_count: int = 3,
+        stderr_tail_lines: int = 200,
     ) -> None:
-        logs_dir = Path.cwd() / "logs" / "jobs"
-        logs_dir.mkdir(parents=True, exist_ok=True)
+        self._log_max_bytes = log_max_bytes
+        self._log_backup_count = log_backup_count
+        self._stderr_tail_lines = stderr_tail_lines
 
+    @staticmethod
+    def _job_log_path(job: JobEnvelope) -> Path:
         timestamp = datetime.now(UTC).strftime("%Y%m%dT%H%M%S.%fZ")
         safe_job_id = "".join(char if char.isalnum() or char in {"-", "_"} else "_" for char in job.job_id)
-        log_path = logs_dir / f"{timestamp}-{job.job_type}-{safe_job_id}.log"
-
-        stdout_text = stdout.decode("utf-8", errors="replace")
-        stderr_text = stderr.decode("utf-8", errors="replace")
-        log_path.write_text(
-            "\n".join(
-                [
-                    f"job_id={job.job_id}",
-                    f"job_type={job.job_type}",
-                    f"worker_module={worker_module}",
-                    f"returncode={returncode}",
-                    "--- stdout ---",
-                    stdout_text,
-                    "--- stderr ---",
-                    stderr_text,
-                ]
-            ),
-            encoding="utf-8",
-        )
-        logger.info(
-            "worker subprocess output written to file",
-            extra={
-                "job_id": job.job_id,
-                "job_type": job.job_type,
-                "worker_module": worker_module,
-                "log_path": str(log_path),
-            },
-        )
+        return Path.cwd() / "logs" / "jobs" / f"{timestamp}-{job.job_type}-{safe_job_id}.log"
+
+    @staticmethod
+    async def _feed_job_envelope(stream: asyncio.StreamWriter, job: JobEnvelope, extra: dict[str, str]) -> None:
+        """Stream the envelope to the worker's stdin; command-line arguments cap large batches."""
+
+        try:
+            stream.write(job.model_dump_json().encode("utf-8"))
+            await stream.drain()
+            stream.close()
+            await stream.wait_closed()
+        except (BrokenPipeError, ConnectionResetError):
+            # The worker exited before reading its envelope; its stderr and exit code tell why.
+            logger.debug("worker subprocess closed stdin before reading the job envelope", extra=extra)
+
+    async def _pump_stdout(
+        self,
+        stream: asyncio.StreamReader,
+        output_log: _JobOutputLog,
+        extra: dict[str, str],
+    ) -> None:
+        async for line in _iter_stream_lines(stream):
+            await output_log.write_output_line("stdout", line)
+            if line.strip():
+                logger.info("worker subprocess %s: %s", "stdout", line, extra=extra)
+
+    async def _pump_stderr(
+        self,
+        stream: asyncio.StreamReader,
+        output_log: _JobOutputLog,
+        tail: deque[str],
+    ) -> int:
+        line_count = 0
+        async for line in _iter_stream_lines(stream):
+            await output_log.write_output_line("stderr", line)
+            if line.strip():
+                tail.append(line)
+                line_count += 1
+        return line_count
 
     async def run_job(self, job: JobEnvelope) -> None:
         module_name = JOB_MODULE_BY_TYPE.get(job.job_type)
@@ -95,38 +201,53 @@ class LocalProcessWorkerRunner:
             sys.executable,
             "-m",
             module_name,
-            "--job-envelope",
-            job.model_dump_json(),
+            "--job-envelope-file",
+            "-",
+            stdin=asyncio.subprocess.PIPE,
             stdout=asyncio.subprocess.PIPE,
             stderr=asyncio.subprocess.PIPE,
         )
-        stdout, stderr = await process.communicate()
-
-        self._write_job_output_log(
-            job=job,
-            worker_module=module_name,
-            stdout=stdout,
-            stderr=stderr,
-            returncode=process.returncode,
-        )
 
-        self._log_subprocess_output(
-            stdout,
-            source="stdout",
-            job=job,
-            worker_module=module_name,
-            log_level=logging.INFO,
-        )
-        self._log_subprocess_output(
-            stderr,
-            source="stderr",
-            job=job,
-            worker_module=module_name,
-            log_level=logging.WARNING if process.returncode == 0 else logging.ERROR,
+        extra = {"job_id": job.job_id, "job_type": job.job_type, "worker_module": module_name}
+        log_file = _RotatingJobLogFile(
+            self._job_log_path(job),
+            max_bytes=self._log_max_bytes,
+            backup_count=self._log_backup_count,
         )
+        output_log = _JobOutputLog(log_file)
+        stderr_tail: deque[str] = deque(maxlen=self._stderr_tail_lines)
+        try:
+            for header in (f"job_id={job.job_id}", f"job_type={job.job_type}", f"worker_module={module_name}"):
+                await output_log.write_line(header)
+            _, _, stderr_lines = await asyncio.gather(
+                self._feed_job_envelope(process.stdin, job, extra),
+                self._pump_stdout(process.stdout, output_log, extra),
+                self._pump_stderr(process.stderr, output_log, stderr_tail),
+            )
+            returncode = await process.wait()
+            await output_log.write_line(f"returncode={returncode}")
+        except BaseException:
+            if process.returncode is None:
+                process.kill()
+            raise
+        finally:
+            await output_log.close()
+        logger.info("worker subprocess output written to file", extra={**extra, "log_path": str(log_file.path)})
+
+        stderr_level = logging.WARNING if returncode == 0 else logging.ERROR
+        if stderr_lines > len(stderr_tail):
+            logger.log(
+                stderr_level,
+                "worker subprocess stderr: %s earlier lines omitted, see %s",
+                stderr_lines - len(stderr_tail),
+                log_file.path,
+                extra=extra,
+            )
+        for line in stderr_tail:
+            logger.log(stderr_level, "worker subprocess %s: %s", "stderr", line, extra=extra)
 
-        if process.returncode != 0:
-            err = stderr.decode("utf-8").strip()
+        if returncode != 0:
+            err = "\n".join(stderr_tail).strip()
             raise RuntimeError(err or f"worker module failed for {job.job_type}")
 
         logger.debug("worker subprocess succeeded", extra={"job_id": job.job_id, "worker_module": module_name})
@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+
+from benchmarks.knowledge_update.runner import format_report, run_isolated
+from benchmarks.knowledge_update.workload import BenchmarkScenario, LatencyModel
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Benchmark the knowledge.update pipeline against in-process service stand-ins",
+    )
+    parser.add_argument("--entities", type=int, nargs="+", default=[5, 25, 100], help="Batch sizes to run")
+    parser.add_argument("--pairs-per-entity", type=int, default=2, help="Relationship pairs proposed per entity")
+    parser.add_argument("--blocks-per-entity", type=int, default=4, help="Blocks in each entity context graph")
+    parser.add_argument("--matched-ratio", type=float, default=0.2, help="Share of entities with one strong candidate")
+    parser.add_argument(
+        "--ambiguous-ratio",
+        type=float,
+        default=0.2,
+        help="Share of entities needing a step-five detailed comparison",
+    )
+    parser.add_argument(
+        "--grpc-latency",
+        default="lognormal:5:0.5",
+        help="KnowledgeInterface latency: constant:<ms>, uniform:<low>:<high> or lognormal:<median>:<sigma>",
+    )
+    parser.add_argument("--model-latency", default="lognormal:250:0.4", help="Model-provider latency, same format")
+    parser.add_argument("--max-concurrency", type=int, default=None, help="Override KNOWLEDGE_UPDATE_MAX_CONCURRENCY")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--json", action="store_true", help="Print one JSON report per line")
+    parser.add_argument("--log-level", default="WARNING")
+    args = parser.parse_args()
+
+    for entities in args.entities:
+        scenario = BenchmarkScenario(
+            entities=entities,
+            pairs_per_entity=args.pairs_per_entity,
+            blocks_per_entity=args.blocks_per_entity,
+            matched_ratio=args.matched_ratio,
+            ambiguous_ratio=args.ambiguous_ratio,
+            grpc_latency=LatencyModel.parse(args.grpc_latency),
+            model_latency=LatencyModel.parse(args.model_latency),
+            max_concurrency=args.max_concurrency,
+            seed=args.seed,
+        )
+        report = run_isolated(scenario, log_level=args.log_level)
+        if args.json:
+            print(json.dumps(report.model_dump(mode="json")))
+        else:
+            print(format_report(report))
+        sys.stdout.flush()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,361 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import random
+from collections import Counter
+from typing import Callable
+
+import grpc
+
+from app.services.grpc import knowledge_pb2
+from benchmarks.knowledge_update.workload import (
+    BENCHMARK_USER_ID,
+    EDGE_TYPE,
+    NODE_TYPES,
+    LatencyModel,
+    SyntheticWorkload,
+)
+
+_KNOWLEDGE_SERVICE = "exobrain.knowledge.v1.KnowledgeInterface"
+
+
+class FakeKnowledgeInterface:
+    """In-process KnowledgeInterface gRPC server answering from a synthetic workload."""
+
+    def __init__(self, workload: SyntheticWorkload, latency: LatencyModel) -> None:
+        self._workload = workload
+        self._latency = latency
+        self._rng = random.Random(workload.scenario.seed + 1)
+        self._server: grpc.aio.Server | None = None
+        self._name_by_existing_id = {
+            entity_id: name
+            for name in workload.entity_names
+            for entity_id in workload.existing_entity_ids(name)
+        }
+        self.calls: Counter[str] = Counter()
+        self.target = ""
+
+    async def start(self) -> str:
+        handlers = {
+            method: self._handler(method, request_type, respond)
+            for method, (request_type, respond) in {
+                "GetSchema": (knowledge_pb2.GetSchemaRequest, self._get_schema),
+                "GetEntityExtractionSchemaContext": (
+                    knowledge_pb2.GetEntityExtractionSchemaContextRequest,
+                    self._get_entity_extraction_schema_context,
+                ),
+                "FindEntityCandidates": (knowledge_pb2.FindEntityCandidatesRequest, self._find_entity_candidates),
+                "GetEntityContext": (knowledge_pb2.GetEntityContextRequest, self._get_entity_context),
+                "GetEdgeExtractionSchemaContext": (
+                    knowledge_pb2.GetEdgeExtractionSchemaContextRequest,
+                    self._get_edge_extraction_schema_context,
+                ),
+                "GetEntityTypePropertyContext": (
+                    knowledge_pb2.GetEntityTypePropertyContextRequest,
+                    self._get_entity_type_property_context,
+                ),
+                "UpsertGraphDelta": (knowledge_pb2.UpsertGraphDeltaRequest, self._upsert_graph_delta),
+            }.items()
+        }
+        self._server = grpc.aio.server()
+        self._server.add_generic_rpc_handlers((grpc.method_handlers_generic_handler(_KNOWLEDGE_SERVICE, handlers),))
+        port = self._server.add_insecure_port("127.0.0.1:0")
+        await self._server.start()
+        self.target = f"127.0.0.1:{port}"
+        return self.target
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            await self._server.stop(None)
+            self._server = None
+
+    def _handler(
+        self,
+        method: str,
+        request_type: type,
+        respond: Callable[[object], object],
+    ) -> grpc.RpcMethodHandler:
+        async def _serve(request: object, context: grpc.aio.ServicerContext) -> object:
+            self.calls[method] += 1
+            await self._latency.sleep(self._rng)
+            return respond(request)
+
+        return grpc.unary_unary_rpc_method_handler(
+            _serve,
+            request_deserializer=request_type.FromString,
+            response_serializer=lambda reply: reply.SerializeToString(),
+        )
+
+    def _get_schema(self, request: knowledge_pb2.GetSchemaRequest) -> knowledge_pb2.GetSchemaReply:
+        return knowledge_pb2.GetSchemaReply(
+            node_types=[
+                knowledge_pb2.SchemaNodeType(
+                    type=knowledge_pb2.SchemaType(id=type_id, kind="node", name=type_id.removeprefix("node."), active=True)
+                )
+                for type_id in NODE_TYPES
+            ],
+            edge_types=[
+                knowledge_pb2.SchemaEdgeType(type=knowledge_pb2.SchemaType(id=EDGE_TYPE, kind="edge", active=True))
+            ],
+        )
+
+    def _get_entity_extraction_schema_context(
+        self,
+        request: knowledge_pb2.GetEntityExtractionSchemaContextRequest,
+    ) -> knowledge_pb2.GetEntityExtractionSchemaContextReply:
+        return knowledge_pb2.GetEntityExtractionSchemaContextReply(
+            entity_types=[
+                knowledge_pb2.ExtractionEntityType(type_id=type_id, name=type_id.removeprefix("node."))
+                for type_id in NODE_TYPES
+            ]
+        )
+
+    def _find_entity_candidates(
+        self,
+        request: knowledge_pb2.FindEntityCandidatesRequest,
+    ) -> knowledge_pb2.FindEntityCandidatesReply:
+        name = request.names[0] if request.names else ""
+        entity_ids = self._workload.existing_entity_ids(name)
+        # One strong candidate matches outright; two moderate candidates force a detailed comparison.
+        scores = [0.92] if len(entity_ids) == 1 else [0.45, 0.3]
+        return knowledge_pb2.FindEntityCandidatesReply(
+            candidates=[
+                knowledge_pb2.EntityCandidate(
+                    entity_id=entity_id,
+                    entity_name=name,
+                    score=score,
+                    entity_type_id=self._workload.node_type_by_name.get(name, ""),
+                )
+                for entity_id, score in zip(entity_ids, scores)
+            ]
+        )
+
+    def _get_entity_context(self, request: knowledge_pb2.GetEntityContextRequest) -> knowledge_pb2.GetEntityContextReply:
+        name = self._name_by_existing_id.get(request.entity_id, request.entity_id)
+        root_id = f"{request.entity_id}-block-1"
+        blocks = [knowledge_pb2.EntityContextBlock(id=root_id, type_id="node.block", block_level=0, text=f"{name}.")]
+        if request.max_block_level >= 1:
+            blocks.extend(
+                knowledge_pb2.EntityContextBlock(
+                    id=f"{request.entity_id}-block-{index}",
+                    type_id="node.block",
+                    block_level=1,
+                    parent_block_id=root_id,
+                    text=f"{name} stored paragraph {index}.",
+                )
+                for index in range(2, self._workload.scenario.blocks_per_entity + 1)
+            )
+        return knowledge_pb2.GetEntityContextReply(
+            entity=knowledge_pb2.EntityContextCore(
+                id=request.entity_id,
+                type_id=self._workload.node_type_by_name.get(name, NODE_TYPES[0]),
+                user_id=BENCHMARK_USER_ID,
+                name=name,
+            ),
+            blocks=blocks,
+        )
+
+    def _get_edge_extraction_schema_context(
+        self,
+        request: knowledge_pb2.GetEdgeExtractionSchemaContextRequest,
+    ) -> knowledge_pb2.GetEdgeExtractionSchemaContextReply:
+        return knowledge_pb2.GetEdgeExtractionSchemaContextReply(
+            first_entity_type=request.first_entity_type,
+            second_entity_type=request.second_entity_type,
+            edge_types=[
+                knowledge_pb2.ExtractionEdgeType(
+                    edge_type_id=EDGE_TYPE,
+                    edge_name="related to",
+                    source_entity_type_id=request.first_entity_type,
+                    target_entity_type_id=request.second_entity_type,
+                )
+            ],
+        )
+
+    def _get_entity_type_property_context(
+        self,
+        request: knowledge_pb2.GetEntityTypePropertyContextRequest,
+    ) -> knowledge_pb2.GetEntityTypePropertyContextReply:
+        return knowledge_pb2.GetEntityTypePropertyContextReply(
+            type_id=request.type_id,
+            type_name=request.type_id.removeprefix("node."),
+            properties=[
+                knowledge_pb2.PropertyContext(
+                    prop_name="name",
+                    value_type="string",
+                    required=True,
+                    readable=True,
+                    writable=True,
+                ),
+                knowledge_pb2.PropertyContext(prop_name="aliases", value_type="array", readable=True, writable=True),
+            ],
+        )
+
+    def _upsert_graph_delta(self, request: knowledge_pb2.UpsertGraphDeltaRequest) -> knowledge_pb2.UpsertGraphDeltaReply:
+        return knowledge_pb2.UpsertGraphDeltaReply(
+            entities_upserted=len(request.entities),
+            blocks_upserted=len(request.blocks),
+            edges_upserted=len(request.edges),
+        )
+
+
+class FakeModelProvider:
+    """In-process HTTP/1.1 stand-in for the model-provider `/v1/internal/chat/messages` endpoint.
+
+    Every request must carry a `structured_output` schema; the reply is a single text block holding
+    the JSON object derived from the prompt and the synthetic workload.
+    Connections are kept alive, so `connections` shows how well the client reuses its pool.
+    """
+
+    def __init__(self, workload: SyntheticWorkload, latency: LatencyModel) -> None:
+        self._workload = workload
+        self._latency = latency
+        self._rng = random.Random(workload.scenario.seed + 2)
+        self._server: asyncio.Server | None = None
+        self._writers: set[asyncio.StreamWriter] = set()
+        self._responders: dict[str, Callable[[object], dict[str, object]]] = {
+            "extracted_entities": self._entity_extraction,
+            "focused_markdown": self._entity_context,
+            "decision": self._detailed_comparison,
+            "entity_pairs": self._relationship_extraction,
+            "edge_type": self._relationship_match,
+            "blocks": self._final_entity_graph,
+        }
+        self.calls: Counter[str] = Counter()
+        self.connections = 0
+        self.base_url = ""
+
+    async def start(self) -> str:
+        self._server = await asyncio.start_server(self._serve_connection, "127.0.0.1", 0)
+        port = self._server.sockets[0].getsockname()[1]
+        self.base_url = f"http://127.0.0.1:{port}/v1"
+        return self.base_url
+
+    async def stop(self) -> None:
+        if self._server is None:
+            return
+        self._server.close()
+        for writer in list(self._writers):
+            writer.close()
+        await self._server.wait_closed()
+        self._server = None
+
+    async def _serve_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.connections += 1
+        self._writers.add(writer)
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                headers: dict[str, str] = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get("content-length", "0")))
+
+                path = request_line.decode("latin-1").split()[1]
+                if path.endswith("/internal/chat/messages"):
+                    status, payload = await self._respond(body)
+                else:
+                    status, payload = "404 Not Found", {"detail": f"unknown path {path}"}
+                encoded = json.dumps(payload).encode("utf-8")
+                writer.write(
+                    f"HTTP/1.1 {status}\r\nContent-Type: application/json\r\n"
+                    f"Content-Length: {len(encoded)}\r\nConnection: keep-alive\r\n\r\n".encode("latin-1") + encoded
+                )
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            self._writers.discard(writer)
+            writer.close()
+
+    async def _respond(self, body: bytes) -> tuple[str, dict[str, object]]:
+        request = json.loads(body)
+        structured_output = request.get("structured_output") or {}
+        properties = (structured_output.get("schema") or {}).get("properties") or {}
+        responder_key = next((key for key in self._responders if key in properties), None)
+        if responder_key is None:
+            return "400 Bad Request", {"detail": "benchmark model-provider expects a structured_output schema"}
+
+        responder = self._responders[responder_key]
+        self.calls[responder.__name__.lstrip("_")] += 1
+        await self._latency.sleep(self._rng)
+        text = json.dumps(responder(_last_user_text(request)))
+        return "200 OK", {
+            "id": f"benchmark-{sum(self.calls.values())}",
+            "model": request.get("model"),
+            "message": {"role": "assistant", "content": [{"type": "text", "text": text}]},
+            "finish_reason": "stop",
+            # Rough token estimate (four characters per token) so telemetry totals are non-zero.
+            "usage": {"input_tokens": len(body) // 4, "output_tokens": len(text) // 4},
+        }
+
+    def _entity_extraction(self, prompt: object) -> dict[str, object]:
+        return {"extracted_entities": self._workload.extracted_entities(), "extracted_universes": []}
+
+    def _entity_context(self, prompt: object) -> dict[str, object]:
+        name = _prompt_json(prompt).get("entity", {}).get("name", "")
+        return {"focused_markdown": f"# {name}\n\n{name} as discussed in the batch."}
+
+    def _detailed_comparison(self, prompt: object) -> dict[str, object]:
+        parsed = _prompt_json(prompt)
+        name = parsed.get("extracted_entity", {}).get("name", "")
+        candidate_ids = [
+            context.get("entity", {}).get("id", "")
+            for context in parsed.get("candidate_contexts", [])
+            if isinstance(context, dict)
+        ]
+        return {"decision": self._workload.comparison_decision(name, [item for item in candidate_ids if item])}
+
+    def _relationship_extraction(self, prompt: object) -> dict[str, object]:
+        entity_ids = [entity.get("entity_id", "") for entity in _prompt_json(prompt).get("entities", [])]
+        return {"entity_pairs": self._workload.entity_pairs(entity_ids)}
+
+    def _relationship_match(self, prompt: object) -> dict[str, object]:
+        parsed = _prompt_json(prompt)
+        return {
+            "from_entity_id": parsed.get("entity_1", {}).get("entity_id", ""),
+            "to_entity_id": parsed.get("entity_2", {}).get("entity_id", ""),
+            "edge_type": EDGE_TYPE,
+            "confidence": 0.8,
+        }
+
+    def _final_entity_graph(self, prompt: object) -> dict[str, object]:
+        parsed = _prompt_json(prompt)
+        extracted = parsed.get("extracted_entity", {})
+        name = extracted.get("name", "")
+        return {
+            "entity": {
+                "entity_id": parsed.get("entity_id", ""),
+                "node_type": extracted.get("node_type", ""),
+                "name": name,
+                "aliases": extracted.get("aliases", []),
+            },
+            "blocks": self._workload.blocks(name),
+        }
+
+
+def _last_user_text(request: dict[str, object]) -> str:
+    for message in reversed(request.get("messages") or []):
+        if isinstance(message, dict) and message.get("role") == "user":
+            return "".join(
+                block.get("text", "")
+                for block in message.get("content") or []
+                if isinstance(block, dict) and block.get("type") == "text"
+            )
+    return ""
+
+
+def _prompt_json(prompt: object) -> dict[str, object]:
+    try:
+        parsed = json.loads(prompt) if isinstance(prompt, str) else {}
+    except json.JSONDecodeError:
+        return {}
+    return parsed if isinstance(parsed, dict) else {}
+
@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+import asyncio
+import multiprocessing
+import os
+import resource
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from typing import Iterator
+
+from pydantic import BaseModel
+
+from app.contracts import JobEnvelope, JobMetrics
+from app.logging import configure_logging
+from app.services.model_provider_chat_model import aclose_shared_http_client
+from app.settings import get_settings
+from app.worker.jobs import knowledge_update
+from app.worker.jobs.knowledge_update.telemetry import JobTelemetry
+from benchmarks.knowledge_update.fakes import FakeKnowledgeInterface, FakeModelProvider
+from benchmarks.knowledge_update.workload import BenchmarkScenario, SyntheticWorkload
+
+
+class BenchmarkReport(BaseModel):
+    scenario: BenchmarkScenario
+    metrics: JobMetrics
+    rpc_calls: dict[str, int]
+    model_calls: dict[str, int]
+    model_connections: int
+    peak_rss_bytes: int
+
+
+@contextmanager
+def _benchmark_environment(overrides: dict[str, str]) -> Iterator[None]:
+    previous = {key: os.environ.get(key) for key in overrides}
+    os.environ.update(overrides)
+    get_settings.cache_clear()
+    try:
+        yield
+    finally:
+        for key, value in previous.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+        get_settings.cache_clear()
+
+
+@contextmanager
+def _capture_job_telemetry(captured: list[JobTelemetry]) -> Iterator[None]:
+    original_scope = knowledge_update.job_telemetry_scope
+
+    @contextmanager
+    def _capturing_scope() -> Iterator[JobTelemetry]:
+        with original_scope() as telemetry:
+            captured.append(telemetry)
+            yield telemetry
+
+    knowledge_update.job_telemetry_scope = _capturing_scope
+    try:
+        yield
+    finally:
+        knowledge_update.job_telemetry_scope = original_scope
+
+
+async def run_scenario(scenario: BenchmarkScenario) -> BenchmarkReport:
+    """Run one knowledge.update job end to end against in-process stand-ins.
+
+    The job goes through the worker's `run()` entry point unchanged; only the service endpoints
+    point at the stand-ins, and checkpoints, metrics, the resolution memo and the embedding screen are switched off.
+    """
+
+    workload = SyntheticWorkload(scenario)
+    knowledge_interface = FakeKnowledgeInterface(workload, scenario.grpc_latency)
+    model_provider = FakeModelProvider(workload, scenario.model_latency)
+    overrides = {
+        "KNOWLEDGE_INTERFACE_GRPC_TARGET": await knowledge_interface.start(),
+        "MODEL_PROVIDER_BASE_URL": await model_provider.start(),
+        "KNOWLEDGE_UPDATE_CHECKPOINTS_ENABLED": "false",
+        "KNOWLEDGE_UPDATE_METRICS_ENABLED": "false",
+        "KNOWLEDGE_UPDATE_RESOLUTION_MEMO_TTL_SECONDS": "0",
+        "KNOWLEDGE_UPDATE_ENTITY_QUARANTINE_ENABLED": "false",
+        "KNOWLEDGE_UPDATE_EMBEDDING_MODEL": "",
+    }
+    if scenario.max_concurrency is not None:
+        overrides["KNOWLEDGE_UPDATE_MAX_CONCURRENCY"] = str(scenario.max_concurrency)
+
+    job = JobEnvelope(
+        job_type="knowledge.update",
+        correlation_id="benchmark",
+        payload=workload.payload().model_dump(),
+    )
+    captured: list[JobTelemetry] = []
+    try:
+        with _benchmark_environment(overrides), _capture_job_telemetry(captured):
+            started = time.monotonic()
+            try:
+                await knowledge_update.run(job)
+            finally:
+                wall_time_ms = (time.monotonic() - started) * 1000
+                await aclose_shared_http_client()
+    finally:
+        await model_provider.stop()
+        await knowledge_interface.stop()
+
+    return BenchmarkReport(
+        scenario=scenario,
+        metrics=captured[0].build(wall_time_ms=wall_time_ms),
+        rpc_calls=dict(sorted(knowledge_interface.calls.items())),
+        model_calls=dict(sorted(model_provider.calls.items())),
+        model_connections=model_provider.connections,
+        # Linux reports ru_maxrss in KiB; the value is the peak of the whole process.
+        peak_rss_bytes=resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024,
+    )
+
+
+def _run_scenario_in_process(scenario_json: str, log_level: str) -> str:
+    configure_logging(log_level, stream=sys.stderr, force=True)
+    scenario = BenchmarkScenario.model_validate_json(scenario_json)
+    return asyncio.run(run_scenario(scenario)).model_dump_json()
+
+
+def run_isolated(scenario: BenchmarkScenario, *, log_level: str = "WARNING") -> BenchmarkReport:
+    """Run a scenario in a fresh spawned process so peak RSS is not inflated by earlier scenarios."""
+
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as executor:
+        report_json = executor.submit(_run_scenario_in_process, scenario.model_dump_json(), log_level).result()
+    return BenchmarkReport.model_validate_json(report_json)
+
+
+def format_report(report: BenchmarkReport) -> str:
+    metrics = report.metrics
+    lines = [
+        (
+            f"entities={report.scenario.entities} wall_time={metrics.wall_time_ms / 1000:.2f}s "
+            f"peak_rss={report.peak_rss_bytes / (1024 * 1024):.1f}MiB "
+            f"model_connections={report.model_connections}"
+        ),
+        f"  critical path: {' -> '.join(metrics.critical_path)}",
+        "  steps:",
+    ]
+    lines.extend(f"    {step.step:<18} {step.duration_ms:>10.1f} ms" for step in metrics.steps)
+    lines.append("  operations (calls/attempts, total ms):")
+    lines.extend(
+        f"    {item.step:<18} {item.operation:<42} {item.calls:>5}/{item.attempts:<5} {item.total_ms:>10.1f}"
+        for item in metrics.operations
+    )
+    lines.append(f"  stand-in rpc calls: {report.rpc_calls}")
+    lines.append(f"  stand-in model calls: {report.model_calls}")
+    return "\n".join(lines)
@@ -0,0 +1,152 @@
+from __future__ import annotations
+
+import asyncio
+import math
+import random
+from typing import Literal
+from uuid import NAMESPACE_URL, uuid5
+
+from pydantic import BaseModel, Field
+
+from app.contracts import KnowledgeUpdateMessage, KnowledgeUpdatePayload
+
+BENCHMARK_USER_ID = "benchmark-user"
+NODE_TYPES = ("node.person", "node.project", "node.place")
+EDGE_TYPE = "RELATED_TO"
+
+ResolutionProfile = Literal["matched", "ambiguous", "new"]
+
+
+class LatencyModel(BaseModel):
+    """Per-call latency distribution of a stand-in service, in milliseconds.
+
+    Parsed from `constant:<ms>`, `uniform:<low_ms>:<high_ms>` or `lognormal:<median_ms>:<sigma>`;
+    a bare number is a constant.
+    """
+
+    kind: Literal["constant", "uniform", "lognormal"] = "constant"
+    first: float = Field(default=0.0, ge=0)
+    second: float = Field(default=0.0, ge=0)
+
+    @classmethod
+    def parse(cls, spec: str) -> LatencyModel:
+        kind, _, rest = spec.strip().partition(":")
+        if not rest:
+            return cls(kind="constant", first=float(kind))
+        values = [float(item) for item in rest.split(":")]
+        if kind == "constant" and len(values) == 1:
+            return cls(kind="constant", first=values[0])
+        if kind in {"uniform", "lognormal"} and len(values) == 2:
+            return cls(kind=kind, first=values[0], second=values[1])
+        raise ValueError(f"invalid latency spec '{spec}'")
+
+    def sample_seconds(self, rng: random.Random) -> float:
+        if self.kind == "uniform":
+            milliseconds = rng.uniform(self.first, self.second)
+        elif self.kind == "lognormal":
+            milliseconds = self.first * math.exp(rng.gauss(0.0, self.second)) if self.first else 0.0
+        else:
+            milliseconds = self.first
+        return milliseconds / 1000
+
+    async def sleep(self, rng: random.Random) -> None:
+        delay = self.sample_seconds(rng)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+class BenchmarkScenario(BaseModel):
+    entities: int = Field(ge=1)
+    pairs_per_entity: int = Field(default=2, ge=0)
+    blocks_per_entity: int = Field(default=4, ge=1)
+    matched_ratio: float = Field(default=0.2, ge=0, le=1)
+    ambiguous_ratio: float = Field(default=0.2, ge=0, le=1)
+    grpc_latency: LatencyModel = LatencyModel()
+    model_latency: LatencyModel = LatencyModel()
+    max_concurrency: int | None = Field(default=None, ge=1)
+    seed: int = 7
+
+
+class SyntheticWorkload:
+    """Deterministic synthetic batch shared by both stand-ins, so replies stay mutually consistent."""
+
+    def __init__(self, scenario: BenchmarkScenario) -> None:
+        self.scenario = scenario
+        rng = random.Random(scenario.seed)
+        self.entity_names = [f"Entity {index:03d}" for index in range(scenario.entities)]
+        self.node_type_by_name = {
+            name: NODE_TYPES[index % len(NODE_TYPES)] for index, name in enumerate(self.entity_names)
+        }
+        self.profile_by_name: dict[str, ResolutionProfile] = {}
+        for name in self.entity_names:
+            roll = rng.random()
+            if roll < scenario.matched_ratio:
+                self.profile_by_name[name] = "matched"
+            elif roll < scenario.matched_ratio + scenario.ambiguous_ratio:
+                self.profile_by_name[name] = "ambiguous"
+            else:
+                self.profile_by_name[name] = "new"
+
+    def existing_entity_ids(self, name: str) -> list[str]:
+        profile = self.profile_by_name.get(name)
+        if profile == "matched":
+            return [str(uuid5(NAMESPACE_URL, f"benchmark:{name}"))]
+        if profile == "ambiguous":
+            return [str(uuid5(NAMESPACE_URL, f"benchmark:{name}:{suffix}")) for suffix in ("a", "b")]
+        return []
+
+    def comparison_decision(self, name: str, candidate_ids: list[str]) -> str:
+        # Every other ambiguous entity resolves to its first candidate.
+        if candidate_ids and self.entity_names.index(name) % 2 == 0:
+            return f"MATCH({candidate_ids[0]})"
+        return "NEW_ENTITY"
+
+    def extracted_entities(self) -> list[dict[str, object]]:
+        return [
+            {
+                "name": name,
+                "node_type": self.node_type_by_name[name],
+                "aliases": [f"E{index}"],
+                "short_description": f"Synthetic benchmark entity number {index}.",
+            }
+            for index, name in enumerate(self.entity_names)
+        ]
+
+    def entity_pairs(self, entity_ids: list[str]) -> list[dict[str, str]]:
+        pairs: list[dict[str, str]] = []
+        for index, entity_id in enumerate(entity_ids):
+            for offset in range(1, self.scenario.pairs_per_entity + 1):
+                other = entity_ids[(index + offset) % len(entity_ids)]
+                if other != entity_id:
+                    pairs.append({"entity_id_1": entity_id, "entity_id_2": other})
+        return pairs
+
+    def blocks(self, name: str) -> list[dict[str, str]]:
+        blocks = [{"block_id": "NEW_BLOCK_1", "text": f"{name} overview paragraph."}]
+        for index in range(2, self.scenario.blocks_per_entity + 1):
+            blocks.append(
+                {
+                    "block_id": f"NEW_BLOCK_{index}",
+                    "parent_block_id": "NEW_BLOCK_1",
+                    "text": f"{name} detail paragraph {index}.",
+                }
+            )
+        return blocks
+
+    def payload(self) -> KnowledgeUpdatePayload:
+        messages: list[KnowledgeUpdateMessage] = []
+        for sequence, start in enumerate(range(0, len(self.entity_names), 4), start=1):
+            mentioned = ", ".join(self.entity_names[start : start + 4])
+            messages.append(
+                KnowledgeUpdateMessage(
+                    role="user" if sequence % 2 else "assistant",
+                    content=f"Notes about {mentioned} and how they relate to each other.",
+                    sequence=sequence,
+                    created_at=f"2026-01-01T00:{sequence % 60:02d}:00Z",
+                )
+            )
+        return KnowledgeUpdatePayload(
+            journal_reference="benchmark-journal",
+            messages=messages,
+            requested_by_user_id=BENCHMARK_USER_ID,
+        )
@@ -2,5 +2,5 @@
 set -euo pipefail
 
 uv run --extra dev ruff check .
-uv run --extra dev python -m compileall app tests
+uv run --extra dev python -m compileall app benchmarks tests
 uv run --extra dev pytest
@@ -0,0 +1,38 @@
+import random
+
+import pytest
+
+from benchmarks.knowledge_update.runner import format_report, run_scenario
+from benchmarks.knowledge_update.workload import BenchmarkScenario, LatencyModel
+
+
+def test_latency_model_parses_supported_specs() -> None:
+    assert LatencyModel.parse("12") == LatencyModel(kind="constant", first=12)
+    assert LatencyModel.parse("uniform:5:15") == LatencyModel(kind="uniform", first=5, second=15)
+    assert LatencyModel.parse("lognormal:200:0.4") == LatencyModel(kind="lognormal", first=200, second=0.4)
+
+    rng = random.Random(1)
+    assert LatencyModel.parse("constant:250").sample_seconds(rng) == 0.25
+    assert 0.005 <= LatencyModel.parse("uniform:5:15").sample_seconds(rng) <= 0.015
+
+    with pytest.raises(ValueError):
+        LatencyModel.parse("uniform:5")
+
+
+async def test_benchmark_runs_pipeline_end_to_end_against_stand_ins() -> None:
+    report = await run_scenario(
+        BenchmarkScenario(entities=6, pairs_per_entity=1, blocks_per_entity=3, matched_ratio=0.3, ambiguous_ratio=0.3)
+    )
+
+    assert report.rpc_calls["FindEntityCandidates"] == 6
+    # Pairs sharing a type pair reuse one cached edge schema lookup.
+    assert 0 < report.rpc_calls["GetEdgeExtractionSchemaContext"] < report.model_calls["relationship_match"]
+    assert report.rpc_calls["UpsertGraphDelta"] == 1
+    assert report.model_calls["entity_context"] == 6
+    assert report.model_calls["final_entity_graph"] == 6
+    assert report.model_calls["relationship_match"] == 6
+    assert report.metrics.critical_path[0] == "step two"
+    assert report.metrics.critical_path[-1] == "step nine"
+    assert report.metrics.total_input_tokens > 0
+    assert report.peak_rss_bytes > 0
+    assert "entities=6" in format_report(report)
@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import json
+
+import pytest
+
+from app.contracts import KnowledgeUpdatePayload
+from app.settings import Settings
+from app.worker.jobs.knowledge_update import _build_batch_document, _run_step_six_relationship_extraction
+from app.worker.jobs.knowledge_update.cooccurrence import (
+    CooccurrenceMatrix,
+    split_batch_turns,
+    token_budget_windows,
+    turn_windows,
+)
+from app.worker.jobs.knowledge_update_types import ExtractedEntity, RelationshipPair, ResolvedEntity
+
+
+def _payload(contents: list[str]) -> KnowledgeUpdatePayload:
+    return KnowledgeUpdatePayload(
+        journal_reference="journal-1",
+        requested_by_user_id="user-1",
+        messages=[
+            {"role": "user", "content": content, "sequence": index, "created_at": "2026-03-02T12:00:00Z"}
+            for index, content in enumerate(contents, start=1)
+        ],
+    )
+
+
+def _resolved(index: int, name: str, aliases: list[str] | None = None) -> ResolvedEntity:
+    return ResolvedEntity(
+        entity_index=index,
+        extracted_entity=ExtractedEntity(
+            name=name,
+            node_type="node.person",
+            aliases=aliases or [],
+            short_description="A person",
+            universe_id=None,
+        ),
+        resolved_entity_id=f"entity-{name.lower()}",
+        resolution_status="new_entity",
+    )
+
+
+def test_split_batch_turns_and_windows() -> None:
+    header, turns = split_batch_turns(_build_batch_document(_payload(["one", "two", "three"])))
+
+    assert header.startswith("=== BATCH DOCUMENT ===")
+    assert [turn.splitlines()[0] for turn in turns] == ["--- TURN 1 ---", "--- TURN 2 ---", "--- TURN 3 ---"]
+    assert split_batch_turns("batch") == ("batch", [])
+    assert turn_windows(3, 12, 1) == [range(0, 3)]
+    assert turn_windows(25, 12, 1) == [range(0, 12), range(11, 23), range(22, 25)]
+
+
+def test_token_budget_windows_overlap_and_isolate_oversized_turns() -> None:
+    assert token_budget_windows([], 100, 1) == []
+    assert token_budget_windows([30, 30, 30], 100, 1) == [range(0, 3)]
+    assert token_budget_windows([40, 40, 40, 40, 40], 100, 1) == [range(0, 2), range(1, 3), range(2, 4), range(3, 5)]
+    assert token_budget_windows([20, 500, 20], 100, 1) == [range(0, 1), range(1, 2), range(2, 3)]
+
+
+def test_matrix_keeps_nearby_and_unlocated_pairs() -> None:
+    turns = ["Alice met Bob", "Bob asked about it", "nothing", "Carol arrived"]
+    matrix = CooccurrenceMatrix(turns, {"a": ["Alice"], "b": ["Bob"], "c": ["Carol"], "d": ["Dave"]})
+
+    assert matrix.unlocated == {"d"}
+    assert matrix.candidate_pairs(range(4), radius=1) == [("a", "b"), ("a", "d"), ("b", "d"), ("c", "d")]
+    assert matrix.candidate_pairs(range(4), radius=2) == [("a", "b"), ("a", "d"), ("b", "c"), ("b", "d"), ("c", "d")]
+
+
+@pytest.mark.asyncio
+async def test_step_six_prunes_pairs_and_extracts_windows_concurrently(monkeypatch: pytest.MonkeyPatch) -> None:
+    from app.services import model_provider_structured_completion
+
+    prompts: list[dict[str, object]] = []
+
+    class FakeCompletionClient:
+        async def ainvoke(self, payload: dict[str, object]) -> dict[str, object]:
+            prompt = json.loads(payload["messages"][0]["content"])
+            prompts.append(prompt)
+            entity_ids = [entity["entity_id"] for entity in prompt["entities"]]
+            # Propose every pair; step six must drop the ones that were never candidates.
+            return {
+                "structured_response": {
+                    "entity_pairs": [
+                        {"entity_id_1": first, "entity_id_2": second}
+                        for position, first in enumerate(entity_ids)
+                        for second in entity_ids[position + 1 :]
+                    ]
+                }
+            }
+
+    monkeypatch.setattr(model_provider_structured_completion, "StructuredCompletionClient", lambda **_kwargs: FakeCompletionClient())
+
+    contents = ["Alice and Bob met."] + ["small talk"] * 20 + ["Carol called Dave."]
+    resolved = [_resolved(0, "Alice"), _resolved(1, "Bob"), _resolved(2, "Carol"), _resolved(3, "Dave", ["D"])]
+
+    pairs = await _run_step_six_relationship_extraction(
+        resolved,
+        _build_batch_document(_payload(contents)),
+        Settings(model_provider_base_url="http://provider"),
+    )
+
+    assert sorted((pair.entity_id_1, pair.entity_id_2) for pair in pairs) == [
+        ("entity-alice", "entity-bob"),
+        ("entity-carol", "entity-dave"),
+    ]
+    assert all(isinstance(pair, RelationshipPair) for pair in pairs)
+    assert len(prompts) == 2
+    assert [len(prompt["candidate_pairs"]) for prompt in prompts] == [1, 1]
+    assert "Carol" not in prompts[0]["markdown_batch_document"]
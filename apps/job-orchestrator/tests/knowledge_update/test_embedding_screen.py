@@ -0,0 +1,180 @@
+from __future__ import annotations
+
+import httpx
+import pytest
+
+from app.contracts import KnowledgeUpdatePayload
+from app.services import model_provider_embeddings
+from app.services.grpc import knowledge_pb2
+from app.services.model_provider_embeddings import cosine_similarity_matrix, embed_texts
+from app.settings import Settings
+from app.worker.jobs.knowledge_update import _run_step_five_detailed_comparison
+from app.worker.jobs.knowledge_update.embedding_screen import (
+    ScreenedCandidates,
+    candidate_context_text,
+    screen_candidates,
+)
+from app.worker.jobs.knowledge_update_types import CandidateMatchResult, ExtractedEntity
+
+_THRESHOLDS = {"match_threshold": 0.9, "distinct_threshold": 0.5}
+
+
+def test_screen_candidates_matches_single_clear_candidate() -> None:
+    screened = screen_candidates({"entity-1": 0.95, "entity-2": 0.2}, **_THRESHOLDS)
+
+    assert screened == ScreenedCandidates(matched_entity_id="entity-1", match_similarity=0.95)
+
+
+def test_screen_candidates_resolves_new_entity_when_all_candidates_are_distinct() -> None:
+    screened = screen_candidates({"entity-1": 0.4, "entity-2": 0.1}, **_THRESHOLDS)
+
+    assert screened == ScreenedCandidates()
+
+
+def test_screen_candidates_keeps_only_ambiguous_residue() -> None:
+    # A clear match next to a plausible second candidate is still the model's call.
+    assert screen_candidates({"entity-1": 0.95, "entity-2": 0.7, "entity-3": 0.1}, **_THRESHOLDS) == ScreenedCandidates(
+        remaining_candidate_ids=["entity-1", "entity-2"]
+    )
+    assert screen_candidates({"entity-1": 0.95, "entity-2": 0.93}, **_THRESHOLDS) == ScreenedCandidates(
+        remaining_candidate_ids=["entity-1", "entity-2"]
+    )
+
+
+def test_cosine_similarity_matrix_normalizes_vectors() -> None:
+    similarities = cosine_similarity_matrix([[2.0, 0.0], [1.0, 1.0]], [[5.0, 0.0], [0.0, 3.0], [0.0, 0.0]])
+
+    assert similarities[0] == pytest.approx([1.0, 0.0, 0.0])
+    assert similarities[1] == pytest.approx([2**-0.5, 2**-0.5, 0.0])
+
+
+def test_candidate_context_text_puts_shallow_blocks_first() -> None:
+    text = candidate_context_text(
+        {
+            "entity": {"name": "Alice", "aliases": ["Ali"]},
+            "blocks": [{"text": "Detail", "block_level": 1}, {"text": "Summary", "block_level": 0}],
+        }
+    )
+
+    assert text == "Alice\nAlso known as: Ali\nSummary\nDetail"
+
+
+@pytest.mark.asyncio
+async def test_embed_texts_posts_openai_embeddings_request_and_orders_by_index() -> None:
+    captured: dict[str, object] = {}
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        captured["path"] = request.url.path
+        captured["body"] = request.content
+        return httpx.Response(
+            200,
+            json={"data": [{"index": 1, "embedding": [0, 1]}, {"index": 0, "embedding": [1, 0]}]},
+        )
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler), base_url="http://test")
+
+    vectors = await embed_texts(["a", "b"], model="all-purpose", base_url="http://test/v1", async_http_client=client)
+
+    assert captured["path"] == "/v1/embeddings"
+    assert b'"input":["a","b"]' in captured["body"]
+    assert vectors == [[1.0, 0.0], [0.0, 1.0]]
+
+
+class _FakeEntityContextChannel:
+    def unary_unary(self, method: str, request_serializer, response_deserializer):
+        async def _call(request: knowledge_pb2.GetEntityContextRequest):
+            return knowledge_pb2.GetEntityContextReply(
+                entity=knowledge_pb2.EntityContextCore(id=request.entity_id, name=request.entity_id)
+            )
+
+        return _call
+
+
+def _comparison(entity_index: int, name: str, candidate_ids: list[str]) -> CandidateMatchResult:
+    return CandidateMatchResult(
+        entity_index=entity_index,
+        extracted_entity=ExtractedEntity(name=name, node_type="node.person", aliases=[], short_description="A person"),
+        candidate_matches=[],
+        status="needs_detailed_comparison",
+        candidate_entity_ids=candidate_ids,
+    )
+
+
+@pytest.mark.asyncio
+async def test_step_five_sends_only_ambiguous_residue_to_the_model(monkeypatch: pytest.MonkeyPatch) -> None:
+    from app.services import model_provider_structured_completion
+
+    vectors_by_text = {
+        "Alice": [1.0, 0.0, 0.0],
+        "Bob": [0.0, 1.0, 0.0],
+        "Carol": [0.0, 0.0, 1.0],
+        "alice-1": [0.99, 0.1, 0.0],
+        "bob-1": [0.0, 0.1, 1.0],
+        "carol-1": [0.0, 0.0, 1.0],
+        "carol-2": [0.0, 0.6, 0.8],
+    }
+
+    async def _embed_texts(texts, **_kwargs):
+        return [vectors_by_text[text.splitlines()[0]] for text in texts]
+
+    prompts: list[str] = []
+
+    class FakeCompletionClient:
+        async def ainvoke(self, payload: dict[str, object]) -> dict[str, object]:
+            prompts.append(payload["messages"][0]["content"])
+            return {"structured_response": {"decision": "MATCH(carol-2)"}}
+
+    monkeypatch.setattr(model_provider_embeddings, "embed_texts", _embed_texts)
+    monkeypatch.setattr(model_provider_structured_completion, "StructuredCompletionClient", lambda **_kwargs: FakeCompletionClient())
+
+    resolved = await _run_step_five_detailed_comparison(
+        channel=_FakeEntityContextChannel(),
+        payload=KnowledgeUpdatePayload(
+            journal_reference="journal-1",
+            requested_by_user_id="user-1",
+            messages=[{"role": "user", "content": "hello", "created_at": "2026-03-02T12:00:00Z"}],
+        ),
+        candidate_matching=[
+            _comparison(0, "Alice", ["alice-1"]),
+            _comparison(1, "Bob", ["bob-1"]),
+            _comparison(2, "Carol", ["carol-1", "carol-2"]),
+        ],
+        entity_context_documents=["", "", ""],
+        settings=Settings(model_provider_base_url="http://provider", knowledge_update_embedding_model="all-purpose"),
+    )
+
+    assert (resolved[0].resolved_entity_id, resolved[0].resolution_status) == ("alice-1", "matched")
+    assert resolved[0].match_similarity == pytest.approx(0.99 / (0.99**2 + 0.1**2) ** 0.5)
+    assert resolved[1].resolution_status == "new_entity"
+    assert (resolved[2].resolved_entity_id, resolved[2].resolution_status) == ("carol-2", "matched")
+    assert resolved[2].match_similarity is None
+    assert len(prompts) == 1 and '"carol-1"' in prompts[0] and '"carol-2"' in prompts[0]
+
+
+@pytest.mark.asyncio
+async def test_step_five_falls_back_to_the_model_when_embeddings_fail(monkeypatch: pytest.MonkeyPatch) -> None:
+    from app.services import model_provider_structured_completion
+
+    async def _embed_texts(_texts, **_kwargs):
+        raise ValueError("model-provider embeddings response does not match the request input")
+
+    class FakeCompletionClient:
+        async def ainvoke(self, _payload: dict[str, object]) -> dict[str, object]:
+            return {"structured_response": {"decision": "MATCH(alice-1)"}}
+
+    monkeypatch.setattr(model_provider_embeddings, "embed_texts", _embed_texts)
+    monkeypatch.setattr(model_provider_structured_completion, "StructuredCompletionClient", lambda **_kwargs: FakeCompletionClient())
+
+    resolved = await _run_step_five_detailed_comparison(
+        channel=_FakeEntityContextChannel(),
+        payload=KnowledgeUpdatePayload(
+            journal_reference="journal-1",
+            requested_by_user_id="user-1",
+            messages=[{"role": "user", "content": "hello", "created_at": "2026-03-02T12:00:00Z"}],
+        ),
+        candidate_matching=[_comparison(0, "Alice", ["alice-1"])],
+        entity_context_documents=[""],
+        settings=Settings(model_provider_base_url="http://provider", knowledge_update_embedding_model="all-purpose"),
+    )
+
+    assert resolved[0].resolved_entity_id == "alice-1"
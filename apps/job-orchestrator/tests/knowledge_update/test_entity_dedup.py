@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+from app.worker.jobs.knowledge_update.entity_dedup import (
+    cluster_extracted_entities,
+    deduplicate_extracted_entities,
+    merge_window_extractions,
+    normalize_entity_name,
+)
+from app.worker.jobs.knowledge_update_types import EntityExtractionResult, ExtractedEntity, ExtractedUniverse
+
+
+def _entity(name: str, node_type: str = "node.person", aliases: list[str] | None = None, **kwargs) -> ExtractedEntity:
+    return ExtractedEntity(
+        name=name,
+        node_type=node_type,
+        aliases=aliases or [],
+        short_description=kwargs.get("short_description", f"{name} description"),
+        universe_id=kwargs.get("universe_id"),
+    )
+
+
+def test_normalize_entity_name_ignores_case_accents_and_punctuation() -> None:
+    assert normalize_entity_name("  Zoë  O'Brien-Smith ") == "zoe o brien smith"
+
+
+def test_clusters_by_normalized_name_alias_overlap_and_near_identical_names() -> None:
+    entities = [
+        _entity("Alice Johnson"),
+        _entity("Bob"),
+        _entity("alice johnson"),
+        _entity("Ally", aliases=["Alice Johnson"]),
+        _entity("Jonathan Miller"),
+        _entity("Jonathon Miller"),
+        _entity("Anna"),
+        _entity("Anne"),
+        _entity("Bob", node_type="node.project"),
+        _entity("Carol", universe_id="universe-1"),
+        _entity("Carol", universe_id="universe-2"),
+        _entity("Meeting Room 101"),
+        _entity("Meeting Room 102"),
+    ]
+
+    assert cluster_extracted_entities(entities) == [[0, 2, 3], [1], [4, 5], [6], [7], [8], [9], [10], [11], [12]]
+
+
+def test_deduplicate_keeps_first_copy_and_merges_spellings() -> None:
+    extraction = EntityExtractionResult(
+        extracted_entities=[
+            _entity("Alice Johnson", short_description="A person"),
+            _entity("Bob"),
+            _entity("alice johnson", aliases=["AJ"], short_description="A software engineer in Berlin", universe_id="u-1"),
+        ],
+        extracted_universes=[],
+    )
+
+    deduplicated = deduplicate_extracted_entities(extraction)
+
+    assert [entity.name for entity in deduplicated.extracted_entities] == ["Alice Johnson", "Bob"]
+    alice = deduplicated.extracted_entities[0]
+    assert alice.aliases == ["AJ"]
+    assert alice.short_description == "A software engineer in Berlin"
+    assert alice.universe_id == "u-1"
+
+    unique = EntityExtractionResult(extracted_entities=[_entity("Alice"), _entity("Bob")], extracted_universes=[])
+    assert deduplicate_extracted_entities(unique) is unique
+
+
+def test_merge_window_extractions_concatenates_entities_and_merges_universes() -> None:
+    merged = merge_window_extractions(
+        [
+            EntityExtractionResult(
+                extracted_entities=[_entity("Alice"), _entity("Frodo", universe_id="Middle-earth")],
+                extracted_universes=[ExtractedUniverse(name="Middle-earth", description="Fiction")],
+            ),
+            EntityExtractionResult(
+                extracted_entities=[_entity("Alice"), _entity("Bob")],
+                extracted_universes=[ExtractedUniverse(name="middle earth", description="Tolkien's fictional world")],
+            ),
+        ]
+    )
+
+    assert [entity.name for entity in merged.extracted_entities] == ["Alice", "Frodo", "Alice", "Bob"]
+    assert merged.extracted_universes == [
+        ExtractedUniverse(name="Middle-earth", description="Tolkien's fictional world")
+    ]
+    assert [entity.name for entity in deduplicate_extracted_entities(merged).extracted_entities] == [
+        "Alice",
+        "Frodo",
+        "Bob",
+    ]
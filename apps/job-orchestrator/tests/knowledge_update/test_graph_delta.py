@@ -0,0 +1,181 @@
+from __future__ import annotations
+
+import pytest
+
+from app.contracts import KnowledgeUpdatePayload
+from app.services.grpc import knowledge_pb2
+from app.settings import Settings
+from app.worker.jobs.knowledge_update import _build_step_nine_merge_graph_delta
+from app.worker.jobs.knowledge_update.checkpoints import StepCheckpoints
+from app.worker.jobs.knowledge_update.core import KnowledgeUpdateStepError, _upsert_graph_delta
+from app.worker.jobs.knowledge_update.graph_delta import (
+    GraphDeltaBuilder,
+    chunk_graph_delta,
+    property_value,
+    property_value_field,
+)
+from app.worker.jobs.knowledge_update_types import EntityExtractionResult, FinalEntityContextGraph, MatchedRelationship
+
+
+def test_property_value_maps_python_types_to_oneof_fields() -> None:
+    assert property_value_field(property_value("flag", True)) == "bool_value"
+    assert property_value_field(property_value("count", 3)) == "int_value"
+    assert property_value_field(property_value("score", 0.5)) == "float_value"
+    assert property_value_field(property_value("name", "Alice")) == "string_value"
+    assert property_value("tags", ["a", "b"]).json_value == '["a", "b"]'
+    assert property_value("missing", None) is None
+
+
+def test_builder_appends_owned_nodes_and_edges_to_existing_request() -> None:
+    existing = knowledge_pb2.UpsertGraphDeltaRequest(
+        entities=[knowledge_pb2.EntityNode(id="entity-0", type_id="node.person")]
+    )
+    builder = GraphDeltaBuilder("user-1", request=existing)
+    builder.add_entity("entity-1", "node.person", [property_value("name", "Alice")], universe_id="universe-1")
+    builder.add_block("block-1", "alice text")
+    builder.add_edge("entity-1", "block-1", "DESCRIBED_BY", confidence=0.8, provenance_hint="test")
+
+    delta = builder.build()
+
+    assert delta is existing
+    assert [entity.id for entity in delta.entities] == ["entity-0", "entity-1"]
+    assert delta.entities[1].user_id == "user-1"
+    assert delta.entities[1].visibility == knowledge_pb2.PRIVATE
+    assert delta.entities[1].universe_id == "universe-1"
+    assert delta.blocks[0].type_id == "node.block"
+    assert delta.blocks[0].properties[0].string_value == "alice text"
+    edge = delta.edges[0]
+    assert {prop.key for prop in edge.properties} == {"confidence", "status", "provenance_hint"}
+    assert edge.properties[0].float_value == 0.8
+
+
+def _large_delta() -> knowledge_pb2.UpsertGraphDeltaRequest:
+    builder = GraphDeltaBuilder("user-1")
+    builder.add_universe("universe-1", "Middle-earth")
+    for index in range(4):
+        universe_id = "universe-1" if index == 0 else None
+        builder.add_entity(f"entity-{index}", "node.person", [property_value("name", "x" * 200)], universe_id=universe_id)
+        builder.add_block(f"block-{index}", "y" * 200)
+        builder.add_block(f"block-{index}-child", "z" * 200)
+        builder.add_edge(f"entity-{index}", f"block-{index}", "DESCRIBED_BY", confidence=0.9, provenance_hint="test")
+        builder.add_edge(f"block-{index}", f"block-{index}-child", "SUMMARIZES", confidence=0.9, provenance_hint="test")
+    builder.add_edge("entity-0", "entity-1", "RELATED_TO", confidence=0.7, provenance_hint="test")
+    return builder.build()
+
+
+def test_chunk_graph_delta_keeps_small_delta_in_one_request() -> None:
+    delta = _large_delta()
+
+    assert chunk_graph_delta(delta, delta.ByteSize()) == [[delta]]
+
+
+def test_chunk_graph_delta_orders_entities_then_whole_block_trees_then_edges() -> None:
+    phases = chunk_graph_delta(_large_delta(), 1024)
+
+    entities, trees, edges = phases
+    assert len(entities) > 1 and len(trees) > 1
+    assert all(not chunk.blocks and not chunk.edges for chunk in entities)
+    universe_chunk = next(chunk for chunk in entities if any(entity.id == "entity-0" for entity in chunk.entities))
+    assert [universe.id for universe in universe_chunk.universes] == ["universe-1"]
+    for chunk in trees:
+        block_ids = {block.id for block in chunk.blocks}
+        assert not chunk.entities
+        assert {edge.to_id for edge in chunk.edges} == block_ids
+        assert all(f"{block_id}-child" in block_ids for block_id in block_ids if not block_id.endswith("-child"))
+    assert [(edge.from_id, edge.to_id) for chunk in edges for edge in chunk.edges] == [("entity-0", "entity-1")]
+
+
+class _InMemoryCheckpointRepository:
+    def __init__(self) -> None:
+        self.rows: dict[tuple[str, str], tuple[str, object]] = {}
+
+    async def load(self, job_id: str, step_name: str, input_hash: str) -> object | None:
+        row = self.rows.get((job_id, step_name))
+        if row is None or row[0] != input_hash:
+            return None
+        return row[1]
+
+    async def save(self, job_id: str, step_name: str, input_hash: str, output: object) -> None:
+        self.rows[(job_id, step_name)] = (input_hash, output)
+
+
+class _FakeUpsertChannel:
+    def __init__(self) -> None:
+        self.requests: list[knowledge_pb2.UpsertGraphDeltaRequest] = []
+        self.fail_on_blocks = False
+
+    def unary_unary(self, method: str, request_serializer, response_deserializer):
+        async def _call(request: knowledge_pb2.UpsertGraphDeltaRequest):
+            if self.fail_on_blocks and request.blocks:
+                raise RuntimeError("knowledge interface rejected block tree")
+            self.requests.append(request)
+            return knowledge_pb2.UpsertGraphDeltaReply(
+                entities_upserted=len(request.entities),
+                blocks_upserted=len(request.blocks),
+                edges_upserted=len(request.edges),
+            )
+
+        return _call
+
+
+def _step_nine_delta() -> knowledge_pb2.UpsertGraphDeltaRequest:
+    """Build a multi-chunk delta through step nine, as each job attempt does."""
+
+    return _build_step_nine_merge_graph_delta(
+        payload=KnowledgeUpdatePayload(
+            journal_reference="journal-1",
+            requested_by_user_id="user-1",
+            messages=[{"role": "user", "content": "hello", "created_at": "2026-03-02T12:00:00Z"}],
+        ),
+        step_zero_graph_delta=None,
+        step_two_extraction=EntityExtractionResult.model_validate(
+            {"extracted_entities": [], "extracted_universes": [{"name": "Middle-earth", "description": "fictional"}]}
+        ),
+        step_seven_relationships=[
+            MatchedRelationship(from_entity_id="entity-0", to_entity_id="entity-1", edge_type="RELATED_TO", confidence=0.7)
+        ],
+        step_eight_final_entity_context_graphs=[
+            FinalEntityContextGraph.model_validate(
+                {
+                    "entity": {
+                        "entity_id": f"entity-{index}",
+                        "node_type": "node.person",
+                        "name": "x" * 200,
+                        "universe_name": "Middle-earth",
+                    },
+                    "blocks": [
+                        {"block_id": "root", "parent_block_id": "", "text": "y" * 200},
+                        {"block_id": "child", "parent_block_id": "root", "text": "z" * 200},
+                    ],
+                }
+            )
+            for index in range(4)
+        ],
+        job_id="job-1",
+    )
+
+
+@pytest.mark.asyncio
+async def test_upsert_graph_delta_resubmits_only_uncommitted_chunks_on_retry() -> None:
+    delta = _step_nine_delta()
+    channel = _FakeUpsertChannel()
+    checkpoints = StepCheckpoints(_InMemoryCheckpointRepository(), "job-1")
+    settings = Settings(knowledge_update_upsert_chunk_bytes=1024)
+
+    channel.fail_on_blocks = True
+    with pytest.raises(KnowledgeUpdateStepError):
+        await _upsert_graph_delta(channel, delta, settings, checkpoints)
+    committed_entities = sum(len(request.entities) for request in channel.requests)
+    assert committed_entities == len(delta.entities)
+
+    channel.fail_on_blocks = False
+    channel.requests.clear()
+    delta = _step_nine_delta()
+    reply = await _upsert_graph_delta(channel, delta, settings, checkpoints)
+
+    assert all(not request.entities for request in channel.requests)
+    assert (reply.entities_upserted, reply.blocks_upserted, reply.edges_upserted) == (
+        len(delta.entities),
+        len(delta.blocks),
+        len(delta.edges),
+    )
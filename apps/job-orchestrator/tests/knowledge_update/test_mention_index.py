@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+import pytest
+
+from app.services.grpc import knowledge_pb2
+from app.settings import Settings
+from app.worker.jobs.knowledge_update import _run_step_ten_finalize_graph_delta
+from app.worker.jobs.knowledge_update.mention_index import MentionIndex, mention_candidates
+
+
+def test_index_finds_overlapping_forms_as_whole_words_case_insensitively() -> None:
+    index = MentionIndex([("e1", "New York"), ("e2", "York"), ("e3", "Ann"), ("e4", "he")])
+
+    assert index.find("I moved from new york to YORK last year") == {"new york", "york"}
+    assert index.find("Annabel and Hannah went there") == set()
+    assert index.find("ask Ann.") == {"ann"}
+
+
+def test_mention_candidates_confirms_unique_forms_and_defers_shared_or_short_ones() -> None:
+    index = MentionIndex(
+        [
+            ("alice-1", "Alice Smith"),
+            ("alice-1", "Alice"),
+            ("alice-2", "Alice"),
+            ("bob", "Bob"),
+        ]
+    )
+
+    confirmed, ambiguous = mention_candidates(
+        index,
+        [("b1", "Alice Smith met Bob"), ("b2", "Alice again"), ("b3", "nobody here")],
+    )
+
+    assert confirmed == [("b1", "alice-1")]
+    assert ambiguous == {"b1": {"alice-2", "bob"}, "b2": {"alice-1", "alice-2"}}
+
+
+@pytest.mark.asyncio
+async def test_step_ten_links_unambiguous_mentions_without_model_calls(monkeypatch: pytest.MonkeyPatch) -> None:
+    from app.services import model_provider_structured_completion
+
+    def _completion_client(**_kwargs):
+        raise AssertionError("step ten should not build a completion client when every mention is unambiguous")
+
+    monkeypatch.setattr(model_provider_structured_completion, "StructuredCompletionClient", _completion_client)
+
+    merged = knowledge_pb2.UpsertGraphDeltaRequest(
+        entities=[
+            knowledge_pb2.EntityNode(
+                id="entity-1",
+                properties=[
+                    knowledge_pb2.PropertyValue(key="name", string_value="Alice Smith"),
+                    knowledge_pb2.PropertyValue(key="aliases", json_value='["Ally"]'),
+                ],
+            ),
+        ],
+        blocks=[
+            knowledge_pb2.BlockNode(
+                id="block-1",
+                properties=[knowledge_pb2.PropertyValue(key="text", string_value="Ally called today")],
+            ),
+            knowledge_pb2.BlockNode(
+                id="block-2",
+                properties=[knowledge_pb2.PropertyValue(key="text", string_value="Nothing relevant")],
+            ),
+        ],
+    )
+
+    finalized = await _run_step_ten_finalize_graph_delta(merged, Settings(model_provider_base_url="http://provider"), "user-1")
+
+    assert [(edge.from_id, edge.to_id, edge.edge_type) for edge in finalized.edges] == [
+        ("block-1", "entity-1", "MENTIONS")
+    ]
@@ -1,17 +1,21 @@
 from __future__ import annotations
 
+import asyncio
 from types import SimpleNamespace
 
 import pytest
 
+from app.contracts import JobEnvelope
 from app.services.grpc import knowledge_pb2
 from app.worker.jobs.knowledge_update import (
     KnowledgeUpdateStepError,
     _call_with_retry,
     _format_exception_for_stderr,
+    _run_with_channel,
     _validate_upsert_graph_delta_payload,
     run,
 )
+from app.worker.jobs.knowledge_update.concurrency import gather_bounded, job_concurrency_scope
 
 
 def test_format_exception_for_stderr_includes_traceback_and_message() -> None:
@@ -132,12 +136,14 @@ async def test_call_with_retry_fails_fast_for_non_transient_error() -> None:
 
 
 @pytest.mark.asyncio
-async def test_run_fails_fast_with_step_specific_parse_dict_validation(monkeypatch: pytest.MonkeyPatch) -> None:
+async def test_run_fails_fast_on_step_ten_preflight_validation(monkeypatch: pytest.MonkeyPatch) -> None:
     import app.worker.jobs.knowledge_update as knowledge_update
     from app.worker.jobs.knowledge_update.types import EntityExtractionResult
 
-    job = SimpleNamespace(payload={"journal_reference": "journal-1", "requested_by_user_id": "user-1", "messages": [{"role": "user", "content": "hello", "created_at": "2026-03-02T12:00:00Z"}]})
-    invalid_graph = {"entities": [{"id": "entity-1", "type_id": "node.person", "user_id": "user-1", "visibility": "PRIVATE", "properties": [{"key": "name", "string_value": "Alice", "invalid_field": "bad"}]}], "blocks": [], "edges": [], "universes": []}
+    job = SimpleNamespace(job_id="job-1", payload_ref=None, payload={"journal_reference": "journal-1", "requested_by_user_id": "user-1", "messages": [{"role": "user", "content": "hello", "created_at": "2026-03-02T12:00:00Z"}]})
+    invalid_graph = knowledge_pb2.UpsertGraphDeltaRequest(
+        edges=[knowledge_pb2.GraphEdge(from_id="entity-1", to_id="entity-2", edge_type="REL", user_id="user-1")]
+    )
 
     async def fake_step02(*_args, **_kwargs):
         return EntityExtractionResult.model_validate({"extracted_entities": [], "extracted_universes": []})
@@ -171,8 +177,93 @@ async def test_run_fails_fast_with_step_specific_parse_dict_validation(monkeypat
     monkeypatch.setattr(knowledge_update.step07_relationship_match, "run", fake_step07)
     monkeypatch.setattr(knowledge_update.step08_entity_graph, "run", fake_step08)
     monkeypatch.setattr(knowledge_update.step09_merge_graph, "run", fake_step09)
-    monkeypatch.setattr(knowledge_update, "get_settings", lambda: SimpleNamespace(knowledge_interface_grpc_target="localhost:50051", knowledge_interface_connect_timeout_seconds=0.1))
+    monkeypatch.setattr(knowledge_update, "get_settings", lambda: SimpleNamespace(knowledge_interface_grpc_target="localhost:50051", knowledge_interface_connect_timeout_seconds=0.1, knowledge_update_max_concurrency=4, knowledge_update_checkpoints_enabled=False, knowledge_update_metrics_enabled=False, knowledge_update_schema_cache_ttl_seconds=0, knowledge_update_resolution_memo_ttl_seconds=0, knowledge_update_entity_quarantine_enabled=False))
     monkeypatch.setattr(knowledge_update.grpc.aio, "insecure_channel", lambda _target: _FakeGrpcChannelContext())
 
-    with pytest.raises(RuntimeError):
+    with pytest.raises(RuntimeError, match="step ten preflight validation failed"):
         await run(job)
+
+
+@pytest.mark.asyncio
+async def test_gather_bounded_preserves_order_and_caps_in_flight_calls() -> None:
+    in_flight = 0
+    peak = 0
+
+    async def call(item: int) -> int:
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01 * (5 - item))
+        in_flight -= 1
+        return item * 10
+
+    with job_concurrency_scope(2):
+        results = await gather_bounded(range(5), call)
+
+    assert results == [0, 10, 20, 30, 40]
+    assert peak == 2
+
+
+@pytest.mark.asyncio
+async def test_gather_bounded_reraises_first_failure_and_cancels_remaining_calls() -> None:
+    cancelled: list[int] = []
+
+    async def call(item: int) -> int:
+        if item == 0:
+            raise RuntimeError("knowledge.update step three failed")
+        try:
+            await asyncio.sleep(1)
+        except asyncio.CancelledError:
+            cancelled.append(item)
+            raise
+        return item
+
+    with job_concurrency_scope(4):
+        with pytest.raises(RuntimeError, match="step three failed"):
+            await gather_bounded(range(3), call)
+
+    assert cancelled == [1, 2]
+
+
+@pytest.mark.asyncio
+async def test_call_with_retry_records_attempts_latency_and_token_usage() -> None:
+    from app.worker.jobs.knowledge_update.telemetry import job_telemetry_scope
+
+    attempts = 0
+
+    async def flaky_agent_call() -> dict[str, object]:
+        nonlocal attempts
+        attempts += 1
+        if attempts == 1:
+            raise TimeoutError("slow")
+        return {"structured_response": {}, "usage": {"input_tokens": 40, "output_tokens": 7}}
+
+    async def grpc_call() -> object:
+        return object()
+
+    with job_telemetry_scope() as telemetry:
+        await _call_with_retry(
+            step_name="step two",
+            operation="entity_extraction_agent.ainvoke",
+            call=flaky_agent_call,
+            base_delay_seconds=0.0,
+            max_delay_seconds=0.0,
+        )
+        await _call_with_retry(step_name="step three", operation="FindEntityCandidates", call=grpc_call)
+        metrics = telemetry.build(wall_time_ms=10.0)
+
+    by_operation = {item.operation: item for item in metrics.operations}
+    assert by_operation["entity_extraction_agent.ainvoke"].kind == "llm"
+    assert by_operation["entity_extraction_agent.ainvoke"].attempts == 2
+    assert by_operation["entity_extraction_agent.ainvoke"].input_tokens == 40
+    assert by_operation["FindEntityCandidates"].kind == "grpc"
+    assert by_operation["FindEntityCandidates"].calls == 1
+    assert metrics.total_output_tokens == 7
+
+
+@pytest.mark.asyncio
+async def test_run_with_channel_requires_database_for_claim_checked_payload() -> None:
+    job = JobEnvelope(job_type="knowledge.update", correlation_id="user-1", payload={}, payload_ref="sha256-of-payload")
+
+    with pytest.raises(RuntimeError, match="claim-checked"):
+        await _run_with_channel(job, channel=None, settings=None, orchestrator_database=None)  # type: ignore[arg-type]
@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+import json
+
+from app.worker.jobs.knowledge_update.prompts import build_prompt, estimate_tokens, prune_empty
+
+
+def test_prune_empty_drops_empty_fields_but_keeps_falsy_scalars() -> None:
+    value = {
+        "name": "Alice",
+        "aliases": [],
+        "universe_id": None,
+        "short_description": "",
+        "properties": {"nickname": None},
+        "required": False,
+        "confidence": 0,
+        "blocks": [{"text": "root", "parent_block_id": None}, {}],
+    }
+
+    assert prune_empty(value) == {
+        "name": "Alice",
+        "required": False,
+        "confidence": 0,
+        "blocks": [{"text": "root"}],
+    }
+
+
+def test_build_prompt_puts_shared_context_first_and_minifies() -> None:
+    shared = {"markdown_batch_document": "--- TURN 1 ---\nAlice met Bob."}
+    first = build_prompt(step_name="step four", shared=shared, specific={"entity": {"name": "Alice", "aliases": []}})
+    second = build_prompt(step_name="step four", shared=shared, specific={"entity": {"name": "Bob", "aliases": []}})
+
+    assert list(json.loads(first)) == ["markdown_batch_document", "entity"]
+    assert first == '{"markdown_batch_document":"--- TURN 1 ---\\nAlice met Bob.","entity":{"name":"Alice"}}'
+    shared_prefix = first[: first.index('"entity"')]
+    assert second.startswith(shared_prefix)
+
+
+def test_estimate_tokens_rounds_up() -> None:
+    assert estimate_tokens("") == 0
+    assert estimate_tokens("abcde") == 2
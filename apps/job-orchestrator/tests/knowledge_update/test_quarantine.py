@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+import pytest
+
+from app.settings import Settings
+from app.worker.jobs.knowledge_update import _run_step_four_create_entity_contexts
+from app.worker.jobs.knowledge_update.quarantine import (
+    build_quarantine,
+    committed_relationships,
+    entity_isolation_scope,
+    gather_isolated,
+)
+from app.worker.jobs.knowledge_update_types import (
+    EntityExtractionResult,
+    FinalEntityContextGraph,
+    MatchedRelationship,
+    ResolvedEntity,
+)
+
+
+async def _fail_on_bob(name: str) -> str:
+    if name == "Bob":
+        raise RuntimeError("knowledge.update step four reasoner returned invalid focused_markdown")
+    return name.lower()
+
+
+@pytest.mark.asyncio
+async def test_gather_isolated_propagates_failures_outside_isolation_scope() -> None:
+    with pytest.raises(RuntimeError):
+        await gather_isolated(["Alice", "Bob"], _fail_on_bob, step_name="step four", describe=str)
+
+
+@pytest.mark.asyncio
+async def test_gather_isolated_quarantines_failing_items_in_isolation_scope() -> None:
+    with entity_isolation_scope(True):
+        results = await gather_isolated(["Alice", "Bob", "Carol"], _fail_on_bob, step_name="step four", describe=str)
+
+        assert results == ["alice", None, "carol"]
+        with pytest.raises(RuntimeError):
+            await gather_isolated(["Bob"], _fail_on_bob, step_name="step four", describe=str)
+
+
+def _extraction() -> EntityExtractionResult:
+    return EntityExtractionResult.model_validate(
+        {
+            "extracted_entities": [
+                {"name": name, "node_type": "node.person", "aliases": [], "short_description": "", "universe_id": universe}
+                for name, universe in (("Alice", None), ("Bob", "Middle-earth"), ("Carol", None))
+            ],
+            "extracted_universes": [
+                {"name": "Middle-earth", "description": "Fiction"},
+                {"name": "Narnia", "description": "Fiction"},
+            ],
+        }
+    )
+
+
+def _resolved(index: int, entity_id: str) -> ResolvedEntity:
+    return ResolvedEntity(
+        entity_index=index,
+        extracted_entity=_extraction().extracted_entities[index],
+        resolved_entity_id=entity_id,
+        resolution_status="new_entity",
+    )
+
+
+def _final_graph(entity_id: str) -> FinalEntityContextGraph:
+    return FinalEntityContextGraph.model_validate(
+        {"entity": {"entity_id": entity_id, "node_type": "node.person"}, "blocks": []}
+    )
+
+
+def test_build_quarantine_collects_entities_without_final_graph_and_their_universes() -> None:
+    # Carol failed in step five (no resolution), Bob in step eight (no final graph).
+    quarantine = build_quarantine(
+        "job-1",
+        _extraction(),
+        [_resolved(0, "alice-id"), _resolved(1, "bob-id")],
+        [_final_graph("alice-id")],
+    )
+
+    assert quarantine is not None
+    assert quarantine.source_job_id == "job-1"
+    assert [entity["name"] for entity in quarantine.extracted_entities] == ["Bob", "Carol"]
+    assert [universe["name"] for universe in quarantine.extracted_universes] == ["Middle-earth"]
+    assert (
+        build_quarantine(
+            "job-1",
+            _extraction(),
+            [_resolved(0, "alice-id"), _resolved(1, "bob-id"), _resolved(2, "carol-id")],
+            [_final_graph("alice-id"), _final_graph("bob-id"), _final_graph("carol-id")],
+        )
+        is None
+    )
+
+
+def test_committed_relationships_drops_edges_to_quarantined_entities() -> None:
+    relationships = [
+        MatchedRelationship(from_entity_id="alice-id", to_entity_id="carol-id", edge_type="KNOWS", confidence=0.9),
+        MatchedRelationship(from_entity_id="alice-id", to_entity_id="bob-id", edge_type="KNOWS", confidence=0.9),
+    ]
+
+    kept = committed_relationships(relationships, [_final_graph("alice-id"), _final_graph("carol-id")])
+
+    assert [relationship.to_entity_id for relationship in kept] == ["carol-id"]
+
+
+@pytest.mark.asyncio
+async def test_step_four_quarantines_entity_whose_context_call_fails(monkeypatch: pytest.MonkeyPatch) -> None:
+    from app.services import model_provider_structured_completion
+
+    class FakeCompletionClient:
+        async def ainvoke(self, payload: dict[str, object]) -> dict[str, object]:
+            if '"Bob"' in payload["messages"][0]["content"]:
+                return {"structured_response": {}}
+            return {"structured_response": {"focused_markdown": "# Context"}}
+
+    monkeypatch.setattr(model_provider_structured_completion, "StructuredCompletionClient", lambda **_kwargs: FakeCompletionClient())
+
+    with entity_isolation_scope(True):
+        contexts = await _run_step_four_create_entity_contexts(_extraction(), "# Batch", Settings())
+
+    assert contexts == ["# Context", None, "# Context"]
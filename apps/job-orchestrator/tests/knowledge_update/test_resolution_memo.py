@@ -0,0 +1,168 @@
+from __future__ import annotations
+
+import asyncpg
+import pytest
+
+from app.contracts import KnowledgeUpdatePayload
+from app.services.grpc import knowledge_pb2
+from app.worker.jobs.knowledge_update import _run_step_three_entity_candidate_matching
+from app.worker.jobs.knowledge_update.resolution_memo import EntityResolutionMemo
+from app.worker.jobs.knowledge_update_types import (
+    CandidateMatchResult,
+    EntityExtractionResult,
+    ExtractedEntity,
+    ResolvedEntity,
+)
+
+
+class FakeMemoRepository:
+    def __init__(self, remembered: dict[tuple[str, str], tuple[str, float]] | None = None) -> None:
+        self.remembered = remembered or {}
+        self.saved: dict[tuple[str, str], tuple[str, float]] = {}
+        self.forgotten: list[str] = []
+        self.fail = False
+
+    async def load(self, user_id: str, keys: list[tuple[str, str]], ttl_seconds: float):
+        if self.fail:
+            raise asyncpg.PostgresError("down")
+        return {key: self.remembered[key] for key in keys if key in self.remembered}
+
+    async def save(self, user_id: str, entries: dict[tuple[str, str], tuple[str, float]]) -> None:
+        self.saved.update(entries)
+
+    async def forget_entities(self, user_id: str, entity_ids: list[str]) -> None:
+        self.forgotten.extend(entity_ids)
+
+
+class FakeKnowledgeChannel:
+    def __init__(self, existing: dict[str, str], unavailable: set[str] | None = None) -> None:
+        self.existing = existing
+        self.unavailable = unavailable or set()
+        self.methods: list[str] = []
+
+    def unary_unary(self, method: str, request_serializer, response_deserializer):
+        async def _call(request):
+            self.methods.append(method.rsplit("/", 1)[-1])
+            if method.endswith("GetEntityContext"):
+                if request.entity_id in self.unavailable:
+                    raise RuntimeError("knowledge interface unavailable")
+                if request.entity_id not in self.existing:
+                    return knowledge_pb2.GetEntityContextReply()
+                assert request.max_block_level == 2
+                return knowledge_pb2.GetEntityContextReply(
+                    entity=knowledge_pb2.EntityContextCore(
+                        id=request.entity_id,
+                        type_id=self.existing[request.entity_id],
+                        name="Anna",
+                    )
+                )
+            return knowledge_pb2.FindEntityCandidatesReply()
+
+        return _call
+
+
+def _entity(name: str) -> ExtractedEntity:
+    return ExtractedEntity(name=name, node_type="node.person", aliases=[], short_description="A person")
+
+
+_PAYLOAD = KnowledgeUpdatePayload(
+    journal_reference="journal-1",
+    requested_by_user_id="user-1",
+    messages=[{"role": "user", "content": "hello", "created_at": "2026-03-02T12:00:00Z"}],
+)
+
+
+@pytest.mark.asyncio
+async def test_step_three_uses_confident_memo_hits_and_forgets_missing_entities() -> None:
+    repository = FakeMemoRepository(
+        {
+            ("node.person", "anna"): ("entity-anna", 1.0),
+            ("node.person", "bob"): ("entity-gone", 0.95),
+            ("node.person", "carol"): ("entity-carol", 0.5),
+            ("node.person", "dave"): ("entity-dave", 0.95),
+        }
+    )
+    channel = FakeKnowledgeChannel(
+        {"entity-anna": "node.person", "entity-carol": "node.person", "entity-dave": "node.person"},
+        unavailable={"entity-dave"},
+    )
+    extraction = EntityExtractionResult(
+        extracted_entities=[_entity("ANNA"), _entity("Bob"), _entity("Carol"), _entity("Dave")],
+        extracted_universes=[],
+    )
+
+    matches = await _run_step_three_entity_candidate_matching(
+        channel,
+        _PAYLOAD,
+        extraction,
+        EntityResolutionMemo(repository, "user-1", ttl_seconds=3600),  # type: ignore[arg-type]
+    )
+
+    assert matches[0].status == "matched"
+    assert matches[0].matched_entity_id == "entity-anna"
+    assert matches[0].candidate_matches[0]["score"] == 1.0
+    assert [match.status for match in matches[1:]] == ["new_entity", "new_entity", "new_entity"]
+    assert sorted(channel.methods) == [
+        "FindEntityCandidates",
+        "FindEntityCandidates",
+        "FindEntityCandidates",
+        "GetEntityContext",
+        "GetEntityContext",
+        "GetEntityContext",
+    ]
+    # Dave's entity could not be verified during an outage, so its memo row is kept.
+    assert repository.forgotten == ["entity-gone"]
+
+
+@pytest.mark.asyncio
+async def test_memo_treats_store_failures_as_misses_and_remembers_resolutions() -> None:
+    repository = FakeMemoRepository()
+    repository.fail = True
+    memo = EntityResolutionMemo(repository, "user-1", ttl_seconds=3600)  # type: ignore[arg-type]
+
+    assert await memo.lookup([_entity("Anna")]) == {}
+
+    candidate_matching = [
+        CandidateMatchResult(
+            entity_index=0,
+            extracted_entity=_entity("Anna"),
+            candidate_matches=[{"entity_id": "entity-anna", "score": 0.92}],
+            status="matched",
+            matched_entity_id="entity-anna",
+        ),
+        CandidateMatchResult(
+            entity_index=1,
+            extracted_entity=_entity("Bob"),
+            status="needs_detailed_comparison",
+            candidate_entity_ids=["entity-bob"],
+        ),
+        CandidateMatchResult(entity_index=2, extracted_entity=_entity("Carol"), status="new_entity"),
+        CandidateMatchResult(
+            entity_index=3,
+            extracted_entity=_entity("Dave"),
+            status="needs_detailed_comparison",
+            candidate_entity_ids=["entity-dave"],
+        ),
+    ]
+    resolved = [
+        ResolvedEntity(entity_index=0, extracted_entity=_entity("Anna"), resolved_entity_id="entity-anna", resolution_status="matched"),
+        ResolvedEntity(entity_index=1, extracted_entity=_entity("Bob"), resolved_entity_id="entity-bob", resolution_status="matched"),
+        ResolvedEntity(entity_index=2, extracted_entity=_entity("Carol"), resolved_entity_id="entity-new", resolution_status="new_entity"),
+        ResolvedEntity(
+            entity_index=3,
+            extracted_entity=_entity("Dave"),
+            resolved_entity_id="entity-dave",
+            resolution_status="matched",
+            match_similarity=0.97,
+        ),
+    ]
+
+    await memo.remember(candidate_matching, resolved)
+
+    assert repository.saved == {
+        ("node.person", "anna"): ("entity-anna", 0.92),
+        ("node.person", "bob"): ("entity-bob", 0.9),
+        ("node.person", "carol"): ("entity-new", 1.0),
+        # An embedding-screen match is stored below the confidence that lets later jobs skip comparison.
+        ("node.person", "dave"): ("entity-dave", 0.8),
+    }
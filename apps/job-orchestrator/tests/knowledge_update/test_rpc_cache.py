@@ -0,0 +1,173 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from app.services.grpc import knowledge_pb2
+from app.settings import Settings
+from app.worker.jobs.knowledge_update import _knowledge_interface_cache
+from app.worker.jobs.knowledge_update import rpc_cache
+from app.worker.jobs.knowledge_update.rpc_cache import KnowledgeInterfaceCache, SchemaContextCache, schema_fingerprint
+
+_PREFIX = "/exobrain.knowledge.v1.KnowledgeInterface/"
+
+
+class _CountingChannel:
+    def __init__(self) -> None:
+        self.requests: list[tuple[str, object]] = []
+        self.release = asyncio.Event()
+        self.release.set()
+        self.failures = 0
+
+    def unary_unary(self, method: str, request_serializer, response_deserializer):
+        async def _call(request):
+            self.requests.append((method, request))
+            await self.release.wait()
+            if self.failures:
+                self.failures -= 1
+                raise RuntimeError("unavailable")
+            if method.endswith("GetEntityContext"):
+                return knowledge_pb2.GetEntityContextReply(
+                    entity=knowledge_pb2.EntityContextCore(id=request.entity_id),
+                    blocks=[
+                        knowledge_pb2.EntityContextBlock(id=f"block-{level}", block_level=level)
+                        for level in range(request.max_block_level + 1)
+                    ],
+                )
+            if method.endswith("GetSchema"):
+                return knowledge_pb2.GetSchemaReply()
+            return knowledge_pb2.GetEntityTypePropertyContextReply(type_id=request.type_id)
+
+        return _call
+
+
+def _entity_context_rpc(cache: KnowledgeInterfaceCache):
+    return cache.unary_unary(
+        f"{_PREFIX}GetEntityContext",
+        request_serializer=knowledge_pb2.GetEntityContextRequest.SerializeToString,
+        response_deserializer=knowledge_pb2.GetEntityContextReply.FromString,
+    )
+
+
+@pytest.mark.asyncio
+async def test_cache_coalesces_in_flight_lookups_and_serves_repeats() -> None:
+    channel = _CountingChannel()
+    channel.release.clear()
+    cache = KnowledgeInterfaceCache(channel)
+    rpc = cache.unary_unary(
+        f"{_PREFIX}GetEntityTypePropertyContext",
+        request_serializer=knowledge_pb2.GetEntityTypePropertyContextRequest.SerializeToString,
+        response_deserializer=knowledge_pb2.GetEntityTypePropertyContextReply.FromString,
+    )
+    request = knowledge_pb2.GetEntityTypePropertyContextRequest(type_id="node.person", user_id="user-1")
+
+    pending = [asyncio.ensure_future(rpc(request)) for _ in range(3)]
+    await asyncio.sleep(0)
+    channel.release.set()
+    replies = await asyncio.gather(*pending)
+    replies.append(await rpc(request))
+
+    assert len(channel.requests) == 1
+    assert {reply.type_id for reply in replies} == {"node.person"}
+    assert cache.stats == {"misses": 1, "coalesced": 2, "hits": 1}
+
+
+@pytest.mark.asyncio
+async def test_deeper_entity_context_satisfies_shallower_request() -> None:
+    channel = _CountingChannel()
+    cache = KnowledgeInterfaceCache(channel)
+    rpc = _entity_context_rpc(cache)
+
+    deep = await rpc(knowledge_pb2.GetEntityContextRequest(entity_id="e1", user_id="user-1", max_block_level=2))
+    shallow = await rpc(knowledge_pb2.GetEntityContextRequest(entity_id="e1", user_id="user-1", max_block_level=1))
+
+    assert len(channel.requests) == 1
+    assert [block.id for block in deep.blocks] == ["block-0", "block-1", "block-2"]
+    assert [block.id for block in shallow.blocks] == ["block-0", "block-1"]
+
+    await rpc(knowledge_pb2.GetEntityContextRequest(entity_id="e1", user_id="user-1", max_block_level=3))
+    assert len(channel.requests) == 2
+
+
+@pytest.mark.asyncio
+async def test_failed_lookup_is_evicted_so_retries_reach_the_service() -> None:
+    channel = _CountingChannel()
+    channel.failures = 1
+    cache = KnowledgeInterfaceCache(channel)
+    rpc = _entity_context_rpc(cache)
+    request = knowledge_pb2.GetEntityContextRequest(entity_id="e1", user_id="user-1", max_block_level=1)
+
+    with pytest.raises(RuntimeError, match="unavailable"):
+        await rpc(request)
+    reply = await rpc(request)
+
+    assert reply.entity.id == "e1"
+    assert len(channel.requests) == 2
+
+
+def _type_property_rpc(cache: KnowledgeInterfaceCache):
+    return cache.unary_unary(
+        f"{_PREFIX}GetEntityTypePropertyContext",
+        request_serializer=knowledge_pb2.GetEntityTypePropertyContextRequest.SerializeToString,
+        response_deserializer=knowledge_pb2.GetEntityTypePropertyContextReply.FromString,
+    )
+
+
+@pytest.mark.asyncio
+async def test_schema_contexts_are_shared_across_jobs_until_the_schema_changes() -> None:
+    channel = _CountingChannel()
+    shared = SchemaContextCache()
+    request = knowledge_pb2.GetEntityTypePropertyContextRequest(type_id="node.person", user_id="user-1")
+
+    async def _run_job(schema_version: str) -> KnowledgeInterfaceCache:
+        shared.use_schema_version(schema_version)
+        cache = KnowledgeInterfaceCache(channel, schema_cache=shared, schema_cache_ttl_seconds=60)
+        assert (await _type_property_rpc(cache)(request)).type_id == "node.person"
+        return cache
+
+    await _run_job("v1")
+    second_job = await _run_job("v1")
+    assert len(channel.requests) == 1
+    assert second_job.stats == {"shared_hits": 1}
+
+    await _run_job("v2")
+    assert len(channel.requests) == 2
+
+
+@pytest.mark.asyncio
+async def test_only_pooled_workers_fingerprint_the_schema_for_the_shared_cache() -> None:
+    channel = _CountingChannel()
+    settings = Settings(knowledge_update_schema_cache_ttl_seconds=300)
+
+    await _knowledge_interface_cache(channel, settings, share_schema_cache=False)
+    assert channel.requests == []
+
+    await _knowledge_interface_cache(channel, settings, share_schema_cache=True)
+    assert [method.rsplit("/", 1)[-1] for method, _ in channel.requests] == ["GetSchema"]
+
+
+def test_schema_context_cache_expires_entries_after_ttl(monkeypatch: pytest.MonkeyPatch) -> None:
+    shared = SchemaContextCache()
+    key = (f"{_PREFIX}GetEntityTypePropertyContext", b"request")
+    clock = iter([1000.0, 1030.0, 1100.0])
+    monkeypatch.setattr(rpc_cache.time, "monotonic", lambda: next(clock))
+
+    shared.put(key, knowledge_pb2.GetEntityTypePropertyContextReply(type_id="node.person"))
+
+    assert shared.get(key, ttl_seconds=60).type_id == "node.person"
+    assert shared.get(key, ttl_seconds=60) is None
+
+
+def test_schema_fingerprint_is_stable_and_detects_changes() -> None:
+    first = knowledge_pb2.GetSchemaReply(
+        node_types=[knowledge_pb2.SchemaNodeType(type=knowledge_pb2.SchemaType(id="node.person"))]
+    )
+    same = knowledge_pb2.GetSchemaReply()
+    same.CopyFrom(first)
+    changed = knowledge_pb2.GetSchemaReply()
+    changed.CopyFrom(first)
+    changed.node_types[0].type.description = "A person"
+
+    assert schema_fingerprint(first) == schema_fingerprint(same)
+    assert schema_fingerprint(first) != schema_fingerprint(changed)
@@ -32,11 +32,11 @@ async def test_step01_builds_upsert_graph_delta_request() -> None:
     channel = FakeInitGraphChannel()
     request_body = await _build_upsert_graph_delta_step_one(channel, payload)
     assert channel.calls == 1
-    assert len(request_body["entities"]) == 1
-    assert len(request_body["blocks"]) == 1
-    assert len(request_body["edges"]) == 3
-    for edge in request_body["edges"]:
-        props = {prop["key"]: prop for prop in edge["properties"]}
-        assert props["confidence"]["float_value"] == 1.0
-        assert props["status"]["string_value"] == "asserted"
-        assert props["provenance_hint"]["string_value"] == "placeholder"
+    assert len(request_body.entities) == 1
+    assert len(request_body.blocks) == 1
+    assert [edge.edge_type for edge in request_body.edges] == ["SENT_TO", "SENT_BY", "DESCRIBED_BY"]
+    for edge in request_body.edges:
+        props = {prop.key: prop for prop in edge.properties}
+        assert props["confidence"].float_value == 1.0
+        assert props["status"].string_value == "asserted"
+        assert props["provenance_hint"].string_value == "placeholder"
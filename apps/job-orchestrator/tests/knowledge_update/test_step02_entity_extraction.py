@@ -46,24 +46,77 @@ def test_step02_logs_batch_document(caplog: pytest.LogCaptureFixture) -> None:
 
 
 @pytest.mark.asyncio
-async def test_run_step02_entity_extraction_uses_worker_agent(monkeypatch: pytest.MonkeyPatch) -> None:
+async def test_run_step02_entity_extraction_uses_worker_model(monkeypatch: pytest.MonkeyPatch) -> None:
     from app.settings import Settings
-    import langchain.agents
+    from app.services import model_provider_structured_completion
 
     captured: dict[str, object] = {}
 
-    class FakeCompiledAgent:
+    class FakeCompletionClient:
         async def ainvoke(self, payload: dict[str, object]) -> dict[str, object]:
             return {"structured_response": {"extracted_entities": [{"name": "Alice", "node_type": "node.person", "aliases": [], "short_description": "A person"}], "extracted_universes": []}}
 
-    def _create_agent(**kwargs):
+    def _completion_client(**kwargs):
         captured.update(kwargs)
-        return FakeCompiledAgent()
+        return FakeCompletionClient()
 
-    monkeypatch.setattr(langchain.agents, "create_agent", _create_agent)
+    monkeypatch.setattr(model_provider_structured_completion, "StructuredCompletionClient", _completion_client)
     payload = KnowledgeUpdatePayload(journal_reference="journal-1", requested_by_user_id="user-1", messages=[{"role": "user", "content": "hello", "created_at": "2026-03-02T12:00:00Z"}])
     result = await _run_step_two_entity_extraction(FakeEntityExtractionChannel(), payload, "--- TURN 1 ---", Settings(model_provider_base_url="http://provider", knowledge_update_extraction_model="worker"))
     assert result.extracted_entities[0].name == "Alice"
+    assert captured["model"] == "worker"
     response_format = captured["response_format"]
     assert response_format["type"] == "json_schema"
     assert response_format["json_schema"]["strict"] is True
+
+
+@pytest.mark.asyncio
+async def test_run_step02_entity_extraction_extracts_large_documents_in_turn_windows(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    from app.services import model_provider_structured_completion
+    from app.settings import Settings
+
+    documents: list[str] = []
+
+    class FakeCompletionClient:
+        async def ainvoke(self, payload: dict[str, object]) -> dict[str, object]:
+            document = payload["messages"][0]["content"]
+            documents.append(document)
+            names = [name for name in ("Alice", "Bob", "Carol") if name in document]
+            return {
+                "structured_response": {
+                    "extracted_entities": [
+                        {"name": name, "node_type": "node.person", "aliases": [], "short_description": "A person"}
+                        for name in names
+                    ],
+                    "extracted_universes": [],
+                }
+            }
+
+    monkeypatch.setattr(
+        model_provider_structured_completion,
+        "StructuredCompletionClient",
+        lambda **_kwargs: FakeCompletionClient(),
+    )
+    payload = KnowledgeUpdatePayload(
+        journal_reference="journal-1",
+        requested_by_user_id="user-1",
+        messages=[
+            {"role": "user", "content": f"{name} says {'word ' * 400}", "created_at": "2026-03-02T12:00:00Z"}
+            for name in ("Alice", "Bob", "Carol")
+        ],
+    )
+
+    result = await _run_step_two_entity_extraction(
+        FakeEntityExtractionChannel(),
+        payload,
+        _build_batch_document(payload),
+        Settings(model_provider_base_url="http://provider", knowledge_update_extraction_window_tokens=1200),
+    )
+
+    assert len(documents) == 2
+    assert all(document.startswith("=== BATCH DOCUMENT ===") for document in documents)
+    assert "--- TURN 2 ---" in documents[0] and "--- TURN 2 ---" in documents[1]
+    # Bob, seen by both windows, is collapsed by the step-two deduplication.
+    assert [entity.name for entity in result.extracted_entities] == ["Alice", "Bob", "Carol"]
@@ -4,6 +4,7 @@ import pytest
 from uuid import UUID
 
 from app.contracts import KnowledgeUpdatePayload
+from app.services.grpc import knowledge_pb2
 from app.worker.jobs.knowledge_update import (
     _build_step_nine_merge_graph_delta,
     _build_step_ten_mentions_schema,
@@ -29,60 +30,62 @@ def test_step09_merge_graph_delta_ignores_step0_chat_message_seed() -> None:
 
     merged = _build_step_nine_merge_graph_delta(
         payload=payload,
-        step_zero_graph_delta={
-            "entities": [{"id": "chat-entity", "type_id": "node.chat_message"}],
-            "blocks": [{"id": "chat-block", "type_id": "node.block"}],
-            "edges": [{"from_id": "chat-entity", "to_id": "chat-block", "edge_type": "DESCRIBED_BY"}],
-            "universes": [{"id": "u1", "name": "ignored-universe"}],
-        },
+        step_zero_graph_delta=knowledge_pb2.UpsertGraphDeltaRequest(
+            entities=[knowledge_pb2.EntityNode(id="chat-entity", type_id="node.chat_message")],
+            blocks=[knowledge_pb2.BlockNode(id="chat-block", type_id="node.block")],
+            edges=[knowledge_pb2.GraphEdge(from_id="chat-entity", to_id="chat-block", edge_type="DESCRIBED_BY")],
+            universes=[knowledge_pb2.UniverseNode(id="u1", name="ignored-universe")],
+        ),
         step_two_extraction=EntityExtractionResult.model_validate({"extracted_entities": [], "extracted_universes": []}),
+        job_id="job-1",
         step_seven_relationships=[],
         step_eight_final_entity_context_graphs=[],
     )
 
-    assert merged == {"universes": [], "entities": [], "blocks": [], "edges": []}
+    assert merged == knowledge_pb2.UpsertGraphDeltaRequest()
 
 def test_step09_merge_graph_delta_maps_blocks_edges_and_universes() -> None:
     payload = KnowledgeUpdatePayload(journal_reference="journal-1", requested_by_user_id="user-1", messages=[{"role": "user", "content": "hello", "created_at": "2026-03-02T12:00:00Z"}])
     merged = _build_step_nine_merge_graph_delta(
         payload=payload,
-        step_zero_graph_delta={"entities": [], "blocks": [], "edges": [], "universes": []},
+        step_zero_graph_delta=None,
         step_two_extraction=EntityExtractionResult.model_validate({"extracted_entities": [], "extracted_universes": [{"name": "Wonderland", "description": "fictional"}]}),
+        job_id="job-1",
         step_seven_relationships=[MatchedRelationship(from_entity_id="e1", to_entity_id="e2", edge_type="edge.related_to", confidence=0.8)],
         step_eight_final_entity_context_graphs=[FinalEntityContextGraph.model_validate({"entity": {"entity_id": "e1", "node_type": "node.person", "name": "Alice", "aliases": ["A"], "universe_name": "Wonderland"}, "blocks": [{"block_id": "arch-layers-001", "parent_block_id": "", "text": "root"}, {"block_id": "child-raw-id", "parent_block_id": "arch-layers-001", "text": "child"}]})],
     )
-    assert len(merged["universes"]) == 1
-    assert len(merged["entities"]) == 1
-
-    blocks = [block for block in merged["blocks"] if isinstance(block, dict)]
+    assert len(merged.universes) == 1
+    assert len(merged.entities) == 1
+    assert merged.entities[0].universe_id == merged.universes[0].id
+    entity_props = {prop.key: prop for prop in merged.entities[0].properties}
+    assert entity_props["name"].string_value == "Alice"
+    assert entity_props["aliases"].json_value == '["A"]'
+
+    blocks = list(merged.blocks)
     assert len(blocks) == 2
     for block in blocks:
-        UUID(str(block["id"]))
+        UUID(block.id)
 
-    described_by_edges = [
-        edge for edge in merged["edges"]
-        if isinstance(edge, dict) and edge.get("edge_type") == "DESCRIBED_BY"
-    ]
+    described_by_edges = [edge for edge in merged.edges if edge.edge_type == "DESCRIBED_BY"]
     assert len(described_by_edges) == 1
-    UUID(str(described_by_edges[0]["to_id"]))
+    UUID(described_by_edges[0].to_id)
 
-    summarizes_edges = [
-        edge for edge in merged["edges"]
-        if isinstance(edge, dict) and edge.get("edge_type") == "SUMMARIZES"
-    ]
+    summarizes_edges = [edge for edge in merged.edges if edge.edge_type == "SUMMARIZES"]
     assert len(summarizes_edges) == 1
-    UUID(str(summarizes_edges[0]["from_id"]))
-    UUID(str(summarizes_edges[0]["to_id"]))
-    edges = merged["edges"]
+    UUID(summarizes_edges[0].from_id)
+    UUID(summarizes_edges[0].to_id)
+    edges = merged.edges
     assert len(edges) == 3
     for edge in edges:
-        props = {prop["key"]: prop for prop in edge["properties"]}
+        assert edge.user_id == "user-1"
+        assert edge.visibility == knowledge_pb2.PRIVATE
+        props = {prop.key: prop for prop in edge.properties}
         assert "confidence" in props
-        assert props["status"]["string_value"] == "asserted"
-        assert props["provenance_hint"]["string_value"] == "placeholder"
+        assert props["status"].string_value == "asserted"
+        assert props["provenance_hint"].string_value == "placeholder"
 
-    relationship_edge = next(edge for edge in edges if edge["edge_type"] == "edge.related_to")
-    assert relationship_edge["properties"][0]["float_value"] == pytest.approx(0.8)
+    relationship_edge = next(edge for edge in edges if edge.edge_type == "edge.related_to")
+    assert relationship_edge.properties[0].float_value == pytest.approx(0.8)
 
 
 def test_step09_merge_graph_delta_rejects_multiple_roots() -> None:
@@ -91,8 +94,9 @@ def test_step09_merge_graph_delta_rejects_multiple_roots() -> None:
     with pytest.raises(RuntimeError, match=r"entity_id=e1.*exactly one root block"):
         _build_step_nine_merge_graph_delta(
             payload=payload,
-            step_zero_graph_delta={"entities": [], "blocks": [], "edges": [], "universes": []},
+            step_zero_graph_delta=None,
             step_two_extraction=EntityExtractionResult.model_validate({"extracted_entities": [], "extracted_universes": []}),
+            job_id="job-1",
             step_seven_relationships=[],
             step_eight_final_entity_context_graphs=[
                 FinalEntityContextGraph.model_validate(
@@ -114,8 +118,9 @@ def test_step09_merge_graph_delta_rejects_dangling_parent_reference() -> None:
     with pytest.raises(RuntimeError, match=r"entity_id=e1.*dangling parent_block_id=missing-parent"):
         _build_step_nine_merge_graph_delta(
             payload=payload,
-            step_zero_graph_delta={"entities": [], "blocks": [], "edges": [], "universes": []},
+            step_zero_graph_delta=None,
             step_two_extraction=EntityExtractionResult.model_validate({"extracted_entities": [], "extracted_universes": []}),
+            job_id="job-1",
             step_seven_relationships=[],
             step_eight_final_entity_context_graphs=[
                 FinalEntityContextGraph.model_validate(
@@ -135,8 +140,9 @@ def test_step09_merge_graph_delta_valid_single_root_tree_emits_expected_edges()
     payload = KnowledgeUpdatePayload(journal_reference="journal-1", requested_by_user_id="user-1", messages=[{"role": "user", "content": "hello", "created_at": "2026-03-02T12:00:00Z"}])
     merged = _build_step_nine_merge_graph_delta(
         payload=payload,
-        step_zero_graph_delta={"entities": [], "blocks": [], "edges": [], "universes": []},
+        step_zero_graph_delta=None,
         step_two_extraction=EntityExtractionResult.model_validate({"extracted_entities": [], "extracted_universes": []}),
+        job_id="job-1",
         step_seven_relationships=[],
         step_eight_final_entity_context_graphs=[
             FinalEntityContextGraph.model_validate(
@@ -152,11 +158,11 @@ def test_step09_merge_graph_delta_valid_single_root_tree_emits_expected_edges()
         ],
     )
 
-    described_by_edges = [edge for edge in merged["edges"] if edge["edge_type"] == "DESCRIBED_BY"]
+    described_by_edges = [edge for edge in merged.edges if edge.edge_type == "DESCRIBED_BY"]
     assert len(described_by_edges) == 1
-    assert described_by_edges[0]["from_id"] == "e1"
+    assert described_by_edges[0].from_id == "e1"
 
-    summarizes_edges = [edge for edge in merged["edges"] if edge["edge_type"] == "SUMMARIZES"]
+    summarizes_edges = [edge for edge in merged.edges if edge.edge_type == "SUMMARIZES"]
     assert len(summarizes_edges) == 2
 
 
@@ -170,8 +176,9 @@ def test_step09_merge_graph_delta_normalizes_root_parent_sentinels(root_parent:
 
     merged = _build_step_nine_merge_graph_delta(
         payload=payload,
-        step_zero_graph_delta={"entities": [], "blocks": [], "edges": [], "universes": []},
+        step_zero_graph_delta=None,
         step_two_extraction=EntityExtractionResult.model_validate({"extracted_entities": [], "extracted_universes": []}),
+        job_id="job-1",
         step_seven_relationships=[],
         step_eight_final_entity_context_graphs=[
             FinalEntityContextGraph.model_validate(
@@ -186,7 +193,7 @@ def test_step09_merge_graph_delta_normalizes_root_parent_sentinels(root_parent:
         ],
     )
 
-    described_by_edges = [edge for edge in merged["edges"] if edge["edge_type"] == "DESCRIBED_BY"]
+    described_by_edges = [edge for edge in merged.edges if edge.edge_type == "DESCRIBED_BY"]
     assert len(described_by_edges) == 1
 
 
@@ -200,8 +207,9 @@ def test_step09_merge_graph_delta_zero_root_failure_has_debug_sample() -> None:
     with pytest.raises(RuntimeError) as exc_info:
         _build_step_nine_merge_graph_delta(
             payload=payload,
-            step_zero_graph_delta={"entities": [], "blocks": [], "edges": [], "universes": []},
+            step_zero_graph_delta=None,
             step_two_extraction=EntityExtractionResult.model_validate({"extracted_entities": [], "extracted_universes": []}),
+            job_id="job-1",
             step_seven_relationships=[],
             step_eight_final_entity_context_graphs=[
                 FinalEntityContextGraph.model_validate(
@@ -236,8 +244,6 @@ class _FakeGrpcChannel:
 
 @pytest.mark.asyncio
 async def test_step10_preflight_rejects_missing_required_writable_property() -> None:
-    from app.services.grpc import knowledge_pb2
-
     channel = _FakeGrpcChannel(
         {
             "node.person": knowledge_pb2.GetEntityTypePropertyContextReply(
@@ -252,15 +258,15 @@ async def test_step10_preflight_rejects_missing_required_writable_property() ->
     with pytest.raises(RuntimeError) as exc_info:
         await _preflight_validate_graph_delta_entities(
             channel=channel,
-            graph_delta={
-                "entities": [
-                    {
-                        "id": "entity-1",
-                        "type_id": "node.person",
-                        "properties": [{"key": "aliases", "json_value": '["A"]'}],
-                    }
+            graph_delta=knowledge_pb2.UpsertGraphDeltaRequest(
+                entities=[
+                    knowledge_pb2.EntityNode(
+                        id="entity-1",
+                        type_id="node.person",
+                        properties=[knowledge_pb2.PropertyValue(key="aliases", json_value='["A"]')],
+                    )
                 ]
-            },
+            ),
             requesting_user_id="user-1",
         )
 
@@ -272,8 +278,6 @@ async def test_step10_preflight_rejects_missing_required_writable_property() ->
 
 @pytest.mark.asyncio
 async def test_step10_preflight_rejects_wrong_property_value_type() -> None:
-    from app.services.grpc import knowledge_pb2
-
     channel = _FakeGrpcChannel(
         {
             "node.person": knowledge_pb2.GetEntityTypePropertyContextReply(
@@ -288,15 +292,15 @@ async def test_step10_preflight_rejects_wrong_property_value_type() -> None:
     with pytest.raises(RuntimeError) as exc_info:
         await _preflight_validate_graph_delta_entities(
             channel=channel,
-            graph_delta={
-                "entities": [
-                    {
-                        "id": "entity-2",
-                        "type_id": "node.person",
-                        "properties": [{"key": "name", "int_value": 42}],
-                    }
+            graph_delta=knowledge_pb2.UpsertGraphDeltaRequest(
+                entities=[
+                    knowledge_pb2.EntityNode(
+                        id="entity-2",
+                        type_id="node.person",
+                        properties=[knowledge_pb2.PropertyValue(key="name", int_value=42)],
+                    )
                 ]
-            },
+            ),
             requesting_user_id="user-1",
         )
 
@@ -306,22 +310,19 @@ async def test_step10_preflight_rejects_wrong_property_value_type() -> None:
     assert "expects value_type 'string' but received 'int_value'" in message
 
 
+def _edge_delta(*properties: knowledge_pb2.PropertyValue) -> knowledge_pb2.UpsertGraphDeltaRequest:
+    return knowledge_pb2.UpsertGraphDeltaRequest(
+        edges=[knowledge_pb2.GraphEdge(from_id="a", to_id="b", edge_type="REL", properties=properties)]
+    )
+
+
 def test_step10_preflight_edges_rejects_missing_provenance_hint() -> None:
     with pytest.raises(RuntimeError) as exc_info:
         _preflight_validate_graph_delta_edges(
-            {
-                "edges": [
-                    {
-                        "from_id": "a",
-                        "to_id": "b",
-                        "edge_type": "REL",
-                        "properties": [
-                            {"key": "confidence", "float_value": 0.9},
-                            {"key": "status", "string_value": "asserted"},
-                        ],
-                    }
-                ]
-            }
+            _edge_delta(
+                knowledge_pb2.PropertyValue(key="confidence", float_value=0.9),
+                knowledge_pb2.PropertyValue(key="status", string_value="asserted"),
+            )
         )
 
     message = str(exc_info.value)
@@ -332,19 +333,10 @@ def test_step10_preflight_edges_rejects_missing_provenance_hint() -> None:
 def test_step10_preflight_edges_rejects_missing_status() -> None:
     with pytest.raises(RuntimeError) as exc_info:
         _preflight_validate_graph_delta_edges(
-            {
-                "edges": [
-                    {
-                        "from_id": "a",
-                        "to_id": "b",
-                        "edge_type": "REL",
-                        "properties": [
-                            {"key": "confidence", "float_value": 0.9},
-                            {"key": "provenance_hint", "string_value": "placeholder"},
-                        ],
-                    }
-                ]
-            }
+            _edge_delta(
+                knowledge_pb2.PropertyValue(key="confidence", float_value=0.9),
+                knowledge_pb2.PropertyValue(key="provenance_hint", string_value="placeholder"),
+            )
         )
 
     message = str(exc_info.value)
@@ -355,19 +347,10 @@ def test_step10_preflight_edges_rejects_missing_status() -> None:
 def test_step10_preflight_edges_rejects_missing_confidence() -> None:
     with pytest.raises(RuntimeError) as exc_info:
         _preflight_validate_graph_delta_edges(
-            {
-                "edges": [
-                    {
-                        "from_id": "a",
-                        "to_id": "b",
-                        "edge_type": "REL",
-                        "properties": [
-                            {"key": "status", "string_value": "asserted"},
-                            {"key": "provenance_hint", "string_value": "placeholder"},
-                        ],
-                    }
-                ]
-            }
+            _edge_delta(
+                knowledge_pb2.PropertyValue(key="status", string_value="asserted"),
+                knowledge_pb2.PropertyValue(key="provenance_hint", string_value="placeholder"),
+            )
         )
 
     message = str(exc_info.value)
@@ -377,18 +360,29 @@ def test_step10_preflight_edges_rejects_missing_confidence() -> None:
 
 def test_step10_preflight_edges_accepts_valid_metadata() -> None:
     _preflight_validate_graph_delta_edges(
-        {
-            "edges": [
-                {
-                    "from_id": "a",
-                    "to_id": "b",
-                    "edge_type": "REL",
-                    "properties": [
-                        {"key": "confidence", "int_value": 1},
-                        {"key": "status", "string_value": "asserted"},
-                        {"key": "provenance_hint", "string_value": "placeholder"},
-                    ],
-                }
-            ]
-        }
+        _edge_delta(
+                knowledge_pb2.PropertyValue(key="confidence", int_value=1),
+                knowledge_pb2.PropertyValue(key="status", string_value="asserted"),
+                knowledge_pb2.PropertyValue(key="provenance_hint", string_value="placeholder"),
+            )
     )
+
+
+def test_step09_merge_graph_delta_derives_stable_ids_for_a_job() -> None:
+    payload = KnowledgeUpdatePayload(journal_reference="journal-1", requested_by_user_id="user-1", messages=[{"role": "user", "content": "hello", "created_at": "2026-03-02T12:00:00Z"}])
+
+    def _merge(job_id: str) -> knowledge_pb2.UpsertGraphDeltaRequest:
+        return _build_step_nine_merge_graph_delta(
+            payload=payload,
+            step_zero_graph_delta=None,
+            step_two_extraction=EntityExtractionResult.model_validate({"extracted_entities": [], "extracted_universes": [{"name": "Wonderland", "description": "fictional"}]}),
+            step_seven_relationships=[],
+            step_eight_final_entity_context_graphs=[FinalEntityContextGraph.model_validate({"entity": {"entity_id": "e1", "node_type": "node.person", "name": "Alice", "universe_name": "Wonderland"}, "blocks": [{"block_id": "root", "parent_block_id": "", "text": "root"}, {"block_id": "child", "parent_block_id": "root", "text": "child"}]})],
+            job_id=job_id,
+        )
+
+    first, retried, other_job = _merge("job-1"), _merge("job-1"), _merge("job-2")
+
+    assert retried == first
+    assert other_job.universes[0].id != first.universes[0].id
+    assert {block.id for block in other_job.blocks}.isdisjoint(block.id for block in first.blocks)
@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from app.worker.jobs.knowledge_update.step_graph import StepSpec, run_step_graph
+
+
+@pytest.mark.asyncio
+async def test_run_step_graph_runs_independent_steps_concurrently() -> None:
+    started: list[str] = []
+    both_running = asyncio.Event()
+
+    async def branch(name: str, value: int) -> int:
+        started.append(name)
+        if len(started) == 2:
+            both_running.set()
+        await asyncio.wait_for(both_running.wait(), timeout=1)
+        return value * 2
+
+    steps = [
+        StepSpec(name="step left", inputs=("seed",), output="left", run=lambda seed: branch("step left", seed)),
+        StepSpec(name="step right", inputs=("seed",), output="right", run=lambda seed: branch("step right", seed + 1)),
+        StepSpec(name="step join", inputs=("left", "right"), output="joined", run=lambda left, right: left + right),
+    ]
+
+    result = await run_step_graph(steps, {"seed": 1})
+
+    assert result.values["joined"] == 6
+    assert sorted(started) == ["step left", "step right"]
+    assert [timing.name for timing in result.timings][-1] == "step join"
+    assert all(timing.finished_at >= timing.started_at for timing in result.timings)
+
+
+@pytest.mark.asyncio
+async def test_run_step_graph_reports_critical_path_through_slowest_branch() -> None:
+    async def delayed(value: str, delay: float) -> str:
+        await asyncio.sleep(delay)
+        return value
+
+    steps = [
+        StepSpec(name="step fast", inputs=("seed",), output="fast", run=lambda seed: delayed(seed, 0.0)),
+        StepSpec(name="step slow", inputs=("seed",), output="slow", run=lambda seed: delayed(seed, 0.05)),
+        StepSpec(name="step join", inputs=("fast", "slow"), output="joined", run=lambda fast, slow: fast + slow),
+    ]
+
+    result = await run_step_graph(steps, {"seed": "x"})
+
+    assert result.critical_path == ["step slow", "step join"]
+
+
+@pytest.mark.asyncio
+async def test_run_step_graph_cancels_running_steps_and_reraises_first_failure() -> None:
+    cancelled = asyncio.Event()
+
+    async def failing(seed: int) -> int:
+        raise RuntimeError("knowledge.update step three failed")
+
+    async def slow(seed: int) -> int:
+        try:
+            await asyncio.sleep(1)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+        return 0
+
+    steps = [
+        StepSpec(name="step three", inputs=("seed",), output="three", run=failing),
+        StepSpec(name="step four", inputs=("seed",), output="four", run=slow),
+    ]
+
+    with pytest.raises(RuntimeError, match="step three failed"):
+        await run_step_graph(steps, {"seed": 1})
+
+    assert cancelled.is_set()
+
+
+@pytest.mark.asyncio
+async def test_run_step_graph_rejects_unknown_inputs() -> None:
+    steps = [StepSpec(name="step two", inputs=("missing",), output="extraction", run=lambda missing: missing)]
+
+    with pytest.raises(ValueError, match="unknown inputs: missing"):
+        await run_step_graph(steps, {})
+
+
+class _InMemoryCheckpointRepository:
+    def __init__(self) -> None:
+        self.rows: dict[tuple[str, str], tuple[str, object]] = {}
+
+    async def load(self, job_id: str, step_name: str, input_hash: str) -> object | None:
+        row = self.rows.get((job_id, step_name))
+        if row is None or row[0] != input_hash:
+            return None
+        return row[1]
+
+    async def save(self, job_id: str, step_name: str, input_hash: str, output: object) -> None:
+        self.rows[(job_id, step_name)] = (input_hash, output)
+
+    async def clear(self, job_id: str) -> None:
+        self.rows = {key: value for key, value in self.rows.items() if key[0] != job_id}
+
+
+@pytest.mark.asyncio
+async def test_run_step_graph_resumes_from_first_incomplete_step() -> None:
+    from app.worker.jobs.knowledge_update.checkpoints import StepCheckpoints
+    from app.worker.jobs.knowledge_update.types import EntityExtractionResult
+
+    repository = _InMemoryCheckpointRepository()
+    calls: list[str] = []
+    fail_join = True
+
+    async def extract(batch_document: str) -> EntityExtractionResult:
+        calls.append("step two")
+        return EntityExtractionResult.model_validate({"extracted_entities": [], "extracted_universes": []})
+
+    async def join(extraction: EntityExtractionResult) -> list[str]:
+        calls.append("step three")
+        if fail_join:
+            raise RuntimeError("knowledge.update step three failed")
+        return ["done"]
+
+    steps = [
+        StepSpec(name="step two", inputs=("batch_document",), output="extraction", output_type=EntityExtractionResult, run=extract),
+        StepSpec(name="step three", inputs=("extraction",), output="joined", output_type=list[str], run=join),
+    ]
+
+    with pytest.raises(RuntimeError):
+        await run_step_graph(steps, {"batch_document": "doc"}, checkpoints=StepCheckpoints(repository, "job-1"))
+
+    fail_join = False
+    result = await run_step_graph(steps, {"batch_document": "doc"}, checkpoints=StepCheckpoints(repository, "job-1"))
+
+    assert calls == ["step two", "step three", "step three"]
+    assert isinstance(result.values["extraction"], EntityExtractionResult)
+    assert [timing.resumed for timing in result.timings] == [True, False]
+
+    changed = await run_step_graph(steps, {"batch_document": "changed"}, checkpoints=StepCheckpoints(repository, "job-1"))
+    # Step two reruns on changed input; its identical output still matches step three's checkpoint.
+    assert calls[3:] == ["step two"]
+    assert [timing.resumed for timing in changed.timings] == [False, True]
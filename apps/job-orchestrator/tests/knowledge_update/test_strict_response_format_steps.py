@@ -32,28 +32,28 @@ def _assert_strict_response_format(payload: object) -> None:
 
 @pytest.mark.asyncio
 async def test_steps_04_05_06_use_strict_response_formats(monkeypatch: pytest.MonkeyPatch) -> None:
-    import langchain.agents
+    from app.services import model_provider_structured_completion
 
     captured: list[dict[str, object]] = []
 
-    class FakeCompiledAgent:
+    class FakeCompletionClient:
         def __init__(self, response: dict[str, object]) -> None:
             self._response = response
 
         async def ainvoke(self, _payload: dict[str, object]) -> dict[str, object]:
             return {"structured_response": self._response}
 
-    def _create_agent(**kwargs):
+    def _completion_client(**kwargs):
         captured.append(kwargs)
         response_format = kwargs["response_format"]
         json_schema = response_format["json_schema"]["schema"]
         if "focused_markdown" in json_schema.get("properties", {}):
-            return FakeCompiledAgent({"focused_markdown": "# Focused\nDetails"})
+            return FakeCompletionClient({"focused_markdown": "# Focused\nDetails"})
         if "decision" in json_schema.get("properties", {}):
-            return FakeCompiledAgent({"decision": "NEW_ENTITY"})
-        return FakeCompiledAgent({"entity_pairs": [{"entity_id_1": "entity-1", "entity_id_2": "entity-2"}]})
+            return FakeCompletionClient({"decision": "NEW_ENTITY"})
+        return FakeCompletionClient({"entity_pairs": [{"entity_id_1": "entity-1", "entity_id_2": "entity-2"}]})
 
-    monkeypatch.setattr(langchain.agents, "create_agent", _create_agent)
+    monkeypatch.setattr(model_provider_structured_completion, "StructuredCompletionClient", _completion_client)
 
     settings = Settings(model_provider_base_url="http://provider")
     extraction = EntityExtractionResult.model_validate(
@@ -96,8 +96,21 @@ async def test_steps_04_05_06_use_strict_response_formats(monkeypatch: pytest.Mo
     )
     assert resolved[0].resolved_entity_id == "entity-1"
 
-    pairs = await _run_step_six_relationship_extraction(resolved, "batch", settings)
-    assert isinstance(pairs, list)
+    # Step six skips the model when fewer than two entities leave no candidate pair.
+    second_entity = ResolvedEntity(
+        entity_index=1,
+        extracted_entity=ExtractedEntity(
+            name="Bob",
+            node_type="node.person",
+            aliases=[],
+            short_description="A person",
+            universe_id=None,
+        ),
+        resolved_entity_id="entity-2",
+        resolution_status="new_entity",
+    )
+    pairs = await _run_step_six_relationship_extraction([*resolved, second_entity], "batch", settings)
+    assert pairs == [RelationshipPair(entity_id_1="entity-1", entity_id_2="entity-2")]
 
     assert len(captured) == 3
     for item in captured:
@@ -128,24 +141,24 @@ class _FakeStepSevenChannel:
 
 @pytest.mark.asyncio
 async def test_steps_07_08_10_use_strict_response_formats(monkeypatch: pytest.MonkeyPatch) -> None:
-    import langchain.agents
+    from app.services import model_provider_structured_completion
 
     captured: list[dict[str, object]] = []
 
-    class FakeCompiledAgent:
+    class FakeCompletionClient:
         def __init__(self, response: dict[str, object]) -> None:
             self._response = response
 
         async def ainvoke(self, _payload: dict[str, object]) -> dict[str, object]:
             return {"structured_response": self._response}
 
-    def _create_agent(**kwargs):
+    def _completion_client(**kwargs):
         captured.append(kwargs)
         response_format = kwargs["response_format"]
         json_schema = response_format["json_schema"]["schema"]
         properties = json_schema.get("properties", {})
         if "edge_type" in properties:
-            return FakeCompiledAgent(
+            return FakeCompletionClient(
                 {
                     "from_entity_id": "entity-1",
                     "to_entity_id": "entity-2",
@@ -154,14 +167,14 @@ async def test_steps_07_08_10_use_strict_response_formats(monkeypatch: pytest.Mo
                 }
             )
         if "mentions" in properties:
-            return FakeCompiledAgent(
+            return FakeCompletionClient(
                 {
                     "mentions": [
                         {"block_id": "block-1", "entity_id": "entity-1", "confidence": 0.8},
                     ]
                 }
             )
-        return FakeCompiledAgent(
+        return FakeCompletionClient(
             {
                 "entity_id": "entity-1",
                 "node_type": "node.person",
@@ -178,7 +191,7 @@ async def test_steps_07_08_10_use_strict_response_formats(monkeypatch: pytest.Mo
             }
         )
 
-    monkeypatch.setattr(langchain.agents, "create_agent", _create_agent)
+    monkeypatch.setattr(model_provider_structured_completion, "StructuredCompletionClient", _completion_client)
 
     settings = Settings(model_provider_base_url="http://provider")
     payload = KnowledgeUpdatePayload(
@@ -233,14 +246,28 @@ async def test_steps_07_08_10_use_strict_response_formats(monkeypatch: pytest.Mo
             settings,
         )
 
-    merged = {
-        "entities": [{"id": "entity-1", "properties": [{"key": "name", "string_value": "Alice"}]}],
-        "blocks": [{"id": "block-1", "properties": [{"key": "text", "string_value": "alice text"}]}],
-        "edges": [],
-        "universes": [],
-    }
+    merged = knowledge_pb2.UpsertGraphDeltaRequest(
+        entities=[
+            knowledge_pb2.EntityNode(
+                id="entity-1",
+                properties=[knowledge_pb2.PropertyValue(key="name", string_value="Alice")],
+            ),
+            # A second "Alice" makes the prefilter match ambiguous, so the model has to confirm it.
+            knowledge_pb2.EntityNode(
+                id="entity-2",
+                properties=[knowledge_pb2.PropertyValue(key="name", string_value="Alice")],
+            ),
+        ],
+        blocks=[
+            knowledge_pb2.BlockNode(
+                id="block-1",
+                properties=[knowledge_pb2.PropertyValue(key="text", string_value="alice text")],
+            )
+        ],
+    )
     finalized = await _run_step_ten_finalize_graph_delta(merged, settings, "user-1")
-    assert len(finalized["edges"]) == 1
+    assert len(finalized.edges) == 1
+    assert (finalized.edges[0].to_id, finalized.edges[0].edge_type) == ("entity-1", "MENTIONS")
 
     assert len(captured) == 3
     for item in captured:
@@ -1,8 +1,10 @@
 from __future__ import annotations
 
+import io
 import sys
 from types import SimpleNamespace
 
+from app.contracts import JobEnvelope
 from app.worker.jobs import knowledge_update
 
 
@@ -25,3 +27,25 @@ def test_configure_worker_logging_uses_stdout_and_force(monkeypatch) -> None:
         "stream": sys.stdout,
         "force": True,
     }
+
+
+def test_main_reads_job_envelope_from_stdin_or_file(monkeypatch, tmp_path) -> None:
+    job = JobEnvelope(job_type="knowledge.update", correlation_id="user-1", payload={"journal_reference": "j"})
+    received: list[JobEnvelope] = []
+
+    async def fake_run_standalone(envelope: JobEnvelope) -> None:
+        received.append(envelope)
+
+    monkeypatch.setattr(knowledge_update, "_configure_worker_logging", lambda: None)
+    monkeypatch.setattr(knowledge_update, "_run_standalone", fake_run_standalone)
+
+    monkeypatch.setattr(sys, "argv", ["knowledge_update", "--job-envelope-file", "-"])
+    monkeypatch.setattr(sys, "stdin", SimpleNamespace(buffer=io.BytesIO(job.model_dump_json().encode("utf-8"))))
+    knowledge_update.main()
+
+    envelope_path = tmp_path / "envelope.json"
+    envelope_path.write_text(job.model_dump_json(), encoding="utf-8")
+    monkeypatch.setattr(sys, "argv", ["knowledge_update", "--job-envelope-file", str(envelope_path)])
+    knowledge_update.main()
+
+    assert received == [job, job]
@@ -258,6 +258,7 @@ async def test_watch_job_status_retry_then_terminal_failure_closes(
                 "attempt": 1,
                 "detail": "temporary",
                 "terminal": False,
+                "next_attempt_at": "2026-01-01T00:00:30+00:00",
                 "emitted_at": datetime.now(timezone.utc).isoformat(),
             }
         ).encode("utf-8")
@@ -283,6 +284,8 @@ async def test_watch_job_status_retry_then_terminal_failure_closes(
         events.append(event)
     assert [event.state for event in events] == [job_orchestrator_pb2.RETRYING, job_orchestrator_pb2.FAILED_FINAL]
     assert events[-1].terminal is True
+    assert events[0].next_attempt_at == "2026-01-01T00:00:30+00:00"
+    assert events[-1].next_attempt_at == ""
     assert subscriptions[f"jobs.status.{job_id}"].unsubscribed is True
 
 
@@ -416,6 +419,64 @@ async def test_get_job_status_maps_snapshot_to_proto(
     assert reply.attempt == 2
 
 
+@pytest.mark.asyncio
+async def test_get_job_status_includes_recorded_job_metrics(
+    grpc_orchestrator_stub: tuple[
+        job_orchestrator_pb2_grpc.JobOrchestratorStub,
+        list[tuple[str, bytes]],
+        dict[str, _StatusSubscription],
+        dict[str, dict[str, object]],
+    ],
+) -> None:
+    stub, _, _, snapshots = grpc_orchestrator_stub
+    job_id = str(uuid4())
+    snapshots[job_id] = {
+        "job_id": job_id,
+        "status": "completed",
+        "attempt": 1,
+        "last_error": None,
+        "is_terminal": True,
+        "updated_at": "2026-01-01T00:00:00+00:00",
+        "metrics": json.dumps(
+            {
+                "wall_time_ms": 1500.0,
+                "critical_path": ["step two", "step five"],
+                "steps": [
+                    {
+                        "step": "step two",
+                        "started_at": "2026-01-01T00:00:00+00:00",
+                        "finished_at": "2026-01-01T00:00:01+00:00",
+                        "duration_ms": 1000.0,
+                    }
+                ],
+                "operations": [
+                    {
+                        "step": "step two",
+                        "operation": "entity_extraction_agent.ainvoke",
+                        "kind": "llm",
+                        "calls": 1,
+                        "attempts": 2,
+                        "total_ms": 900.0,
+                        "max_ms": 600.0,
+                        "input_tokens": 120,
+                        "output_tokens": 30,
+                    }
+                ],
+                "total_input_tokens": 120,
+                "total_output_tokens": 30,
+            }
+        ),
+    }
+
+    reply = await stub.GetJobStatus(job_orchestrator_pb2.GetJobStatusRequest(job_id=job_id))
+
+    assert reply.HasField("metrics")
+    assert list(reply.metrics.critical_path) == ["step two", "step five"]
+    assert reply.metrics.steps[0].duration_ms == 1000.0
+    assert reply.metrics.operations[0].attempts == 2
+    assert reply.metrics.total_input_tokens == 120
+
+
 @pytest.mark.asyncio
 async def test_get_job_status_returns_not_found_for_unknown_job(
     grpc_orchestrator_stub: tuple[
@@ -448,3 +509,36 @@ async def test_get_job_status_rejects_invalid_job_id(
         await stub.GetJobStatus(job_orchestrator_pb2.GetJobStatusRequest(job_id="not-a-uuid"))
 
     assert error.value.code() == grpc.StatusCode.INVALID_ARGUMENT
+
+
+@pytest.mark.asyncio
+async def test_enqueue_job_publishes_claim_checked_envelope() -> None:
+    published: list[tuple[str, bytes]] = []
+
+    async def publish(subject: str, payload: bytes) -> None:
+        published.append((subject, payload))
+
+    async def check_in(job: JobEnvelope) -> JobEnvelope:
+        return job.model_copy(update={"payload": {}, "payload_ref": "sha256-of-payload"})
+
+    servicer = JobOrchestratorServicer(publish, check_in_payload=check_in)
+
+    reply = await servicer.EnqueueJob(
+        job_orchestrator_pb2.EnqueueJobRequest(
+            job_type="knowledge.update",
+            user_id="user-1",
+            knowledge_update=job_orchestrator_pb2.KnowledgeUpdatePayload(
+                journal_reference="2026/02/24",
+                requested_by_user_id="user-1",
+                messages=[job_orchestrator_pb2.KnowledgeUpdateMessage(role="user", content="hello")],
+            ),
+        ),
+        None,
+    )
+
+    subject, data = published[0]
+    envelope = JobEnvelope.model_validate_json(data)
+    assert subject == "jobs.knowledge.update.requested"
+    assert envelope.job_id == reply.job_id
+    assert envelope.payload == {}
+    assert envelope.payload_ref == "sha256-of-payload"
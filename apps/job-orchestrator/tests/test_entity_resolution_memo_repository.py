@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import pytest
+
+from app.entity_resolution_memo_repository import EntityResolutionMemoRepository
+
+
+class FakeDatabase:
+    def __init__(self) -> None:
+        self.fetch_args: tuple[object, ...] | None = None
+        self.execute_args: tuple[object, ...] | None = None
+        self.next_fetch_result: list[dict[str, object]] = []
+
+    async def fetch(self, query: str, *args: object):
+        self.fetch_args = (query, *args)
+        return self.next_fetch_result
+
+    async def execute(self, query: str, *args: object):
+        self.execute_args = (query, *args)
+        return "INSERT 0 1"
+
+
+@pytest.mark.asyncio
+async def test_load_filters_by_user_keys_and_ttl() -> None:
+    database = FakeDatabase()
+    database.next_fetch_result = [
+        {"node_type": "node.person", "normalized_name": "anna", "entity_id": "entity-1", "confidence": 0.95}
+    ]
+    repository = EntityResolutionMemoRepository(database)  # type: ignore[arg-type]
+
+    remembered = await repository.load("user-1", [("node.person", "anna"), ("node.place", "berlin")], 3600)
+
+    assert remembered == {("node.person", "anna"): ("entity-1", 0.95)}
+    assert database.fetch_args is not None
+    assert "make_interval(secs => $4)" in str(database.fetch_args[0])
+    assert database.fetch_args[1:] == ("user-1", ["node.person", "node.place"], ["anna", "berlin"], 3600.0)
+
+
+@pytest.mark.asyncio
+async def test_save_upserts_entries_and_skips_empty_batches() -> None:
+    database = FakeDatabase()
+    repository = EntityResolutionMemoRepository(database)  # type: ignore[arg-type]
+
+    await repository.save("user-1", {})
+    assert database.execute_args is None
+
+    await repository.save("user-1", {("node.person", "anna"): ("entity-1", 1.0)})
+
+    assert database.execute_args is not None
+    assert "ON CONFLICT (user_id, node_type, normalized_name)" in str(database.execute_args[0])
+    assert database.execute_args[1:] == ("user-1", ["node.person"], ["anna"], ["entity-1"], [1.0])
+
+
+@pytest.mark.asyncio
+async def test_forget_entities_deletes_by_entity_id() -> None:
+    database = FakeDatabase()
+    repository = EntityResolutionMemoRepository(database)  # type: ignore[arg-type]
+
+    await repository.forget_entities("user-1", ["entity-1"])
+
+    assert database.execute_args is not None
+    assert "entity_id = ANY($2::text[])" in str(database.execute_args[0])
+    assert database.execute_args[1:] == ("user-1", ["entity-1"])
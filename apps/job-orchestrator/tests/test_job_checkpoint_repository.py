@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+import json
+
+import pytest
+
+from app.job_checkpoint_repository import JobCheckpointRepository
+
+
+class FakeDatabase:
+    def __init__(self) -> None:
+        self.fetchrow_args: tuple[object, ...] | None = None
+        self.execute_args: tuple[object, ...] | None = None
+        self.next_fetchrow_result: dict[str, object] | None = None
+
+    async def fetchrow(self, query: str, *args: object):
+        self.fetchrow_args = (query, *args)
+        return self.next_fetchrow_result
+
+    async def execute(self, query: str, *args: object):
+        self.execute_args = (query, *args)
+        return "INSERT 0 1"
+
+
+@pytest.mark.asyncio
+async def test_save_serializes_output_for_jsonb_and_upserts_by_job_and_step() -> None:
+    database = FakeDatabase()
+    repository = JobCheckpointRepository(database)  # type: ignore[arg-type]
+
+    await repository.save("job-1", "step two", "hash-1", {"extracted_entities": []})
+
+    assert database.execute_args is not None
+    query = str(database.execute_args[0])
+    assert "ON CONFLICT (job_id, step_name)" in query
+    assert database.execute_args[1:4] == ("job-1", "step two", "hash-1")
+    assert json.loads(str(database.execute_args[4])) == {"extracted_entities": []}
+
+
+@pytest.mark.asyncio
+async def test_load_decodes_jsonb_text_and_filters_by_input_hash() -> None:
+    database = FakeDatabase()
+    database.next_fetchrow_result = {"output": '["a", "b"]'}
+    repository = JobCheckpointRepository(database)  # type: ignore[arg-type]
+
+    output = await repository.load("job-1", "step four", "hash-2")
+
+    assert output == ["a", "b"]
+    assert database.fetchrow_args is not None
+    assert "input_hash = $3" in str(database.fetchrow_args[0])
+
+
+@pytest.mark.asyncio
+async def test_load_returns_none_without_checkpoint() -> None:
+    repository = JobCheckpointRepository(FakeDatabase())  # type: ignore[arg-type]
+
+    assert await repository.load("job-1", "step five", "hash-3") is None
@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+from nats.errors import TimeoutError as NatsTimeoutError
+
+from app.job_consumer import PullJobConsumer
+
+
+class FakeMsg:
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.subject = "jobs.knowledge.update.requested"
+        self.heartbeats = 0
+
+    async def in_progress(self) -> None:
+        self.heartbeats += 1
+
+
+class FakePullSubscription:
+    def __init__(self, messages: list[FakeMsg]) -> None:
+        self.messages = messages
+        self.batches: list[int] = []
+
+    async def fetch(self, batch: int = 1, timeout: float | None = 5) -> list[FakeMsg]:
+        self.batches.append(batch)
+        if not self.messages:
+            await asyncio.sleep(0)
+            raise NatsTimeoutError
+        fetched, self.messages = self.messages[:batch], self.messages[batch:]
+        return fetched
+
+
+@pytest.mark.asyncio
+async def test_pull_consumer_fetches_only_for_free_worker_slots() -> None:
+    subscription = FakePullSubscription([FakeMsg(name) for name in ("a", "b", "c")])
+    release = asyncio.Event()
+    handled: list[str] = []
+
+    async def handle(msg: FakeMsg) -> None:
+        handled.append(msg.name)
+        await release.wait()
+
+    consumer = asyncio.create_task(
+        PullJobConsumer(subscription, handle, max_in_flight=2, heartbeat_seconds=60).run()
+    )
+    await asyncio.sleep(0.01)
+    assert handled == ["a", "b"]
+    assert subscription.batches == [2]
+
+    release.set()
+    await asyncio.sleep(0.01)
+    consumer.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await consumer
+
+    assert handled == ["a", "b", "c"]
+    assert max(subscription.batches) == 2
+
+
+@pytest.mark.asyncio
+async def test_pull_consumer_sends_in_progress_heartbeats_while_job_runs() -> None:
+    msg = FakeMsg("long")
+    subscription = FakePullSubscription([msg])
+    done = asyncio.Event()
+
+    async def handle(_msg: FakeMsg) -> None:
+        await asyncio.sleep(0.05)
+        done.set()
+
+    consumer = asyncio.create_task(
+        PullJobConsumer(subscription, handle, max_in_flight=1, heartbeat_seconds=0.01).run()
+    )
+    await asyncio.wait_for(done.wait(), timeout=1)
+    heartbeats = msg.heartbeats
+    await asyncio.sleep(0.03)
+    consumer.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await consumer
+
+    assert heartbeats >= 2
+    assert msg.heartbeats == heartbeats
+
+
+@pytest.mark.asyncio
+async def test_pull_consumer_keeps_fetching_after_handler_failure() -> None:
+    subscription = FakePullSubscription([FakeMsg("bad"), FakeMsg("good")])
+    handled: list[str] = []
+
+    async def handle(msg: FakeMsg) -> None:
+        handled.append(msg.name)
+        if msg.name == "bad":
+            raise RuntimeError("boom")
+
+    consumer = asyncio.create_task(
+        PullJobConsumer(subscription, handle, max_in_flight=1, heartbeat_seconds=60).run()
+    )
+    await asyncio.sleep(0.01)
+    consumer.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await consumer
+
+    assert handled == ["bad", "good"]
@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import pytest
+
+from app.contracts import JobEnvelope
+from app.job_payload_repository import JobPayloadRepository, check_in_payload, check_out_payload
+
+
+class FakeDatabase:
+    def __init__(self) -> None:
+        self.rows: dict[str, tuple[str, bytes]] = {}
+        self.deleted: list[str] = []
+
+    async def fetchrow(self, query: str, job_id: str, payload_sha256: str):
+        row = self.rows.get(job_id)
+        if row is None or row[0] != payload_sha256:
+            return None
+        return {"payload": row[1]}
+
+    async def execute(self, query: str, *args: object):
+        if query.lstrip().startswith("DELETE"):
+            self.deleted.append(str(args[0]))
+            self.rows.pop(str(args[0]), None)
+            return "DELETE 1"
+        job_id, payload_sha256, payload = args
+        self.rows[str(job_id)] = (str(payload_sha256), bytes(payload))  # type: ignore[arg-type]
+        return "INSERT 0 1"
+
+
+def _job(content: str) -> JobEnvelope:
+    return JobEnvelope(
+        job_type="knowledge.update",
+        correlation_id="user-1",
+        payload={
+            "journal_reference": "2026/02/24",
+            "messages": [{"role": "user", "content": content}],
+            "requested_by_user_id": "user-1",
+        },
+    )
+
+
+@pytest.mark.asyncio
+async def test_check_in_keeps_small_payloads_inline() -> None:
+    database = FakeDatabase()
+    job = _job("hello")
+
+    assert await check_in_payload(job, JobPayloadRepository(database), threshold_bytes=1024) is job  # type: ignore[arg-type]
+    assert database.rows == {}
+
+
+@pytest.mark.asyncio
+async def test_check_in_stores_large_payload_compressed_and_check_out_restores_it() -> None:
+    database = FakeDatabase()
+    repository = JobPayloadRepository(database)  # type: ignore[arg-type]
+    job = _job("x" * 100_000)
+
+    published = await check_in_payload(job, repository, threshold_bytes=1024)
+
+    assert published.payload == {}
+    assert published.payload_ref is not None
+    assert len(published.model_dump_json()) < 1024
+    assert len(database.rows[job.job_id][1]) < 10_000
+
+    restored = await check_out_payload(published, repository)
+
+    assert restored.payload == job.payload
+    assert restored.payload_ref is None
+
+
+@pytest.mark.asyncio
+async def test_check_out_rejects_missing_or_mismatched_payload() -> None:
+    database = FakeDatabase()
+    repository = JobPayloadRepository(database)  # type: ignore[arg-type]
+    published = await check_in_payload(_job("x" * 2048), repository, threshold_bytes=1024)
+
+    await repository.delete(published.job_id)
+
+    with pytest.raises(RuntimeError, match="is missing"):
+        await check_out_payload(published, repository)
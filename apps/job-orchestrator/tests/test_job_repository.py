@@ -1,10 +1,11 @@
 from __future__ import annotations
 
 import json
+from datetime import datetime, timezone
 
 import pytest
 
-from app.contracts import JobEnvelope
+from app.contracts import JobEnvelope, JobMetrics
 from app.job_repository import JobRepository
 
 
@@ -51,13 +52,15 @@ async def test_mark_retrying_failure_persists_non_terminal_state() -> None:
     database = FakeDatabase()
     repository = JobRepository(database)  # type: ignore[arg-type]
 
-    await repository.mark_retrying_failure("job-1", "boom")
+    next_attempt_at = datetime(2026, 1, 1, 0, 0, 30, tzinfo=timezone.utc)
+    await repository.mark_retrying_failure("job-1", "boom", next_attempt_at)
 
     assert database.execute_args is not None
     query = str(database.execute_args[0])
     assert "status = 'failed'" in query
     assert "is_terminal = FALSE" in query
-    assert database.execute_args[1:] == ("job-1", "boom")
+    assert "next_attempt_at = $3" in query
+    assert database.execute_args[1:] == ("job-1", "boom", next_attempt_at)
 
 
 @pytest.mark.asyncio
@@ -108,3 +111,44 @@ async def test_fetch_status_by_job_id_delegates_to_get_status() -> None:
     assert status == {"job_id": "job-1"}
     assert database.fetchrow_args is not None
     assert database.fetchrow_args[1:] == ("job-1",)
+
+
+@pytest.mark.asyncio
+async def test_record_metrics_serializes_metrics_for_jsonb() -> None:
+    database = FakeDatabase()
+    repository = JobRepository(database)  # type: ignore[arg-type]
+
+    await repository.record_metrics("job-1", JobMetrics(wall_time_ms=12.5, critical_path=["step two"]))
+
+    assert database.execute_args is not None
+    assert "SET metrics = $2::jsonb" in str(database.execute_args[0])
+    assert database.execute_args[1] == "job-1"
+    assert json.loads(str(database.execute_args[2]))["critical_path"] == ["step two"]
+
+
+@pytest.mark.asyncio
+async def test_record_follow_up_payload_serializes_payload_and_clears_with_null() -> None:
+    database = FakeDatabase()
+    repository = JobRepository(database)  # type: ignore[arg-type]
+
+    await repository.record_follow_up_payload("job-1", {"journal_reference": "2026/02/24"})
+
+    assert database.execute_args is not None
+    assert "SET follow_up_payload = $2::jsonb" in str(database.execute_args[0])
+    assert json.loads(str(database.execute_args[2])) == {"journal_reference": "2026/02/24"}
+
+    await repository.record_follow_up_payload("job-1", None)
+
+    assert database.execute_args[1:] == ("job-1", None)
+
+
+@pytest.mark.asyncio
+async def test_fetch_follow_up_payload_decodes_jsonb_text() -> None:
+    database = FakeDatabase()
+    repository = JobRepository(database)  # type: ignore[arg-type]
+
+    database.next_fetchrow_result = {"follow_up_payload": '{"journal_reference": "2026/02/24"}'}
+    assert await repository.fetch_follow_up_payload("job-1") == {"journal_reference": "2026/02/24"}
+
+    database.next_fetchrow_result = {"follow_up_payload": None}
+    assert await repository.fetch_follow_up_payload("job-1") is None
@@ -227,3 +227,53 @@ def test_model_provider_chat_model_unwraps_json_schema_tool_parameters() -> None
         "properties": {"id": {"type": "string"}},
         "required": ["id"],
     }
+
+
+@pytest.mark.asyncio
+async def test_model_provider_chat_model_uses_shared_client_with_per_request_timeout(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    import app.services.model_provider_chat_model as model_provider_chat_model
+
+    timeouts: list[dict[str, float | None]] = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        timeouts.append(request.extensions["timeout"])
+        return httpx.Response(
+            200,
+            json={
+                "id": "chat_shared",
+                "model": "worker",
+                "message": {"role": "assistant", "content": [{"type": "text", "text": "ok"}]},
+                "finish_reason": "stop",
+            },
+        )
+
+    shared = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(model_provider_chat_model, "_build_shared_http_client", lambda: shared)
+
+    first = ModelProviderChatModel(model="worker", base_url="http://test/v1", timeout=12.0)
+    second = ModelProviderChatModel(model="reasoner", base_url="http://test/v1", timeout=34.0)
+    await first.ainvoke([HumanMessage(content="hello")])
+    await second.ainvoke([HumanMessage(content="hello")])
+
+    assert model_provider_chat_model.get_shared_http_client() is shared
+    assert [item["read"] for item in timeouts] == [12.0, 34.0]
+
+    await model_provider_chat_model.aclose_shared_http_client()
+    assert shared.is_closed
+
+
+@pytest.mark.asyncio
+async def test_shared_http_client_is_rebuilt_after_close() -> None:
+    from app.services.model_provider_chat_model import aclose_shared_http_client, get_shared_http_client
+
+    first = get_shared_http_client()
+    assert get_shared_http_client() is first
+
+    await aclose_shared_http_client()
+    second = get_shared_http_client()
+
+    assert first.is_closed
+    assert second is not first
+    await aclose_shared_http_client()
@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import json
+
+import httpx
+import pytest
+
+from app.services.model_provider_chat_model import build_strict_response_format
+from app.services.model_provider_structured_completion import StructuredCompletionClient
+
+_SCHEMA = {
+    "title": "decision_result",
+    "type": "object",
+    "properties": {"decision": {"type": "string"}},
+    "required": ["decision"],
+    "additionalProperties": False,
+}
+
+
+def _client(handler) -> StructuredCompletionClient:
+    return StructuredCompletionClient(
+        model="worker",
+        base_url="http://test/v1",
+        system_prompt="Decide.",
+        response_format=build_strict_response_format(_SCHEMA),
+        async_http_client=httpx.AsyncClient(transport=httpx.MockTransport(handler), base_url="http://test"),
+    )
+
+
+def _reply(text: str) -> httpx.Response:
+    return httpx.Response(
+        200,
+        json={
+            "id": "chat_1",
+            "model": "worker",
+            "message": {"role": "assistant", "content": [{"type": "text", "text": text}]},
+            "finish_reason": "stop",
+            "usage": {"input_tokens": 12, "output_tokens": 3, "total_tokens": 15},
+        },
+    )
+
+
+@pytest.mark.asyncio
+async def test_structured_completion_posts_native_structured_output_request() -> None:
+    captured: dict[str, object] = {}
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        captured["path"] = request.url.path
+        captured.update(json.loads(request.content))
+        return _reply('{"decision": "NEW_ENTITY"}')
+
+    reply = await _client(handler).ainvoke({"messages": [{"role": "user", "content": "hello"}]})
+
+    assert captured["path"] == "/v1/internal/chat/messages"
+    assert captured["structured_output"] == {"name": "decision_result", "schema": _SCHEMA, "strict": True}
+    assert captured["messages"] == [
+        {"role": "system", "content": [{"type": "text", "text": "Decide."}]},
+        {"role": "user", "content": [{"type": "text", "text": "hello"}]},
+    ]
+    assert "tools" not in captured
+    assert reply == {
+        "structured_response": {"decision": "NEW_ENTITY"},
+        "usage": {"input_tokens": 12, "output_tokens": 3, "total_tokens": 15},
+    }
+
+
+@pytest.mark.asyncio
+async def test_structured_completion_returns_no_structured_response_for_non_json_text() -> None:
+    async def handler(_request: httpx.Request) -> httpx.Response:
+        return _reply("I think it is a new entity.")
+
+    reply = await _client(handler).ainvoke({"messages": [{"role": "user", "content": "hello"}]})
+
+    assert reply["structured_response"] is None
+
+
+@pytest.mark.asyncio
+async def test_structured_completion_raises_for_error_status() -> None:
+    async def handler(_request: httpx.Request) -> httpx.Response:
+        return httpx.Response(503, json={"detail": "unavailable"})
+
+    with pytest.raises(httpx.HTTPStatusError):
+        await _client(handler).ainvoke({"messages": [{"role": "user", "content": "hello"}]})
@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+import socket
+
+import pytest
+
+from app.contracts import JobEnvelope
+from app.worker.pool_runner import PooledProcessWorkerRunner
+
+
+def _free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return int(sock.getsockname()[1])
+
+
+def _job() -> JobEnvelope:
+    return JobEnvelope(
+        job_type="knowledge.update",
+        correlation_id="user-1",
+        payload={
+            "journal_reference": "2026/02/24",
+            "messages": [{"role": "user", "content": "hello", "created_at": "2026-02-24T00:00:00Z"}],
+            "requested_by_user_id": "user-1",
+        },
+    )
+
+
+@pytest.mark.asyncio
+async def test_pool_runner_reuses_worker_process_and_surfaces_job_traceback(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("KNOWLEDGE_INTERFACE_GRPC_TARGET", f"127.0.0.1:{_free_port()}")
+    monkeypatch.setenv("KNOWLEDGE_INTERFACE_CONNECT_TIMEOUT_SECONDS", "0.1")
+
+    runner = PooledProcessWorkerRunner(max_workers=1, max_jobs_per_process=10, max_rss_bytes=2**40)
+    try:
+        await runner.start()
+        executor = runner._executor
+        for _ in range(2):
+            with pytest.raises(RuntimeError) as exc_info:
+                await runner.run_job(_job())
+            assert "knowledge-interface connection timed out" in str(exc_info.value)
+            assert "Traceback" in str(exc_info.value)
+        assert runner._executor is executor
+    finally:
+        runner.close()
+
+
+@pytest.mark.asyncio
+async def test_pool_runner_recycles_pool_when_memory_cap_exceeded(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("KNOWLEDGE_INTERFACE_GRPC_TARGET", f"127.0.0.1:{_free_port()}")
+    monkeypatch.setenv("KNOWLEDGE_INTERFACE_CONNECT_TIMEOUT_SECONDS", "0.1")
+
+    runner = PooledProcessWorkerRunner(max_workers=1, max_jobs_per_process=10, max_rss_bytes=1)
+    try:
+        await runner.start()
+        with pytest.raises(RuntimeError):
+            await runner.run_job(_job())
+        assert runner._executor is None
+    finally:
+        runner.close()
+
+
+@pytest.mark.asyncio
+async def test_pool_runner_rejects_unknown_job_type() -> None:
+    runner = PooledProcessWorkerRunner(max_workers=1, max_jobs_per_process=1, max_rss_bytes=2**30)
+    job = JobEnvelope(job_type="unknown.job", correlation_id="user-1", payload={})
+
+    with pytest.raises(ValueError):
+        await runner.run_job(job)
@@ -1,22 +1,49 @@
 from __future__ import annotations
 
 import asyncio
+import gzip
 import logging
 
 import pytest
 
 from app.contracts import JobEnvelope
-from app.worker.process_runner import LocalProcessWorkerRunner
+from app.worker.process_runner import LocalProcessWorkerRunner, _iter_stream_lines, _RotatingJobLogFile
+
+
+def _stream(data: bytes) -> asyncio.StreamReader:
+    stream = asyncio.StreamReader()
+    stream.feed_data(data)
+    stream.feed_eof()
+    return stream
+
+
+class _FakeStdin:
+    def __init__(self) -> None:
+        self.data = bytearray()
+        self.closed = False
+
+    def write(self, data: bytes) -> None:
+        self.data.extend(data)
+
+    async def drain(self) -> None:
+        return None
+
+    def close(self) -> None:
+        self.closed = True
+
+    async def wait_closed(self) -> None:
+        return None
 
 
 class _FakeProcess:
     def __init__(self, *, returncode: int = 0, stdout: bytes = b"", stderr: bytes = b"") -> None:
         self.returncode = returncode
-        self._stdout = stdout
-        self._stderr = stderr
+        self.stdin = _FakeStdin()
+        self.stdout = _stream(stdout)
+        self.stderr = _stream(stderr)
 
-    async def communicate(self):
-        return self._stdout, self._stderr
+    async def wait(self) -> int:
+        return self.returncode
 
 
 @pytest.mark.asyncio
@@ -129,3 +156,94 @@ async def test_process_runner_writes_worker_output_to_job_log_file(
     assert "job-output" in content
     assert "--- stderr ---" in content
     assert "job-warning" in content
+
+
+@pytest.mark.asyncio
+async def test_process_runner_keeps_only_stderr_tail_for_failure(
+    monkeypatch: pytest.MonkeyPatch,
+    caplog: pytest.LogCaptureFixture,
+    tmp_path,
+) -> None:
+    async def fake_create_subprocess_exec(*args, **kwargs):
+        stderr = b"".join(f"noise-{index}\n".encode() for index in range(10)) + b"Traceback\nfatal-worker-error\n"
+        return _FakeProcess(returncode=1, stderr=stderr)
+
+    monkeypatch.setattr(asyncio, "create_subprocess_exec", fake_create_subprocess_exec)
+    monkeypatch.chdir(tmp_path)
+
+    runner = LocalProcessWorkerRunner(stderr_tail_lines=2)
+    job = JobEnvelope(
+        job_type="knowledge.update",
+        correlation_id="user-1",
+        payload={
+            "journal_reference": "2026/02/24",
+            "messages": [{"role": "user", "content": "hello"}],
+            "requested_by_user_id": "user-1",
+        },
+    )
+
+    with caplog.at_level(logging.INFO, logger="app.worker.process_runner"):
+        with pytest.raises(RuntimeError) as exc_info:
+            await runner.run_job(job)
+
+    assert str(exc_info.value) == "Traceback\nfatal-worker-error"
+    stderr_messages = [record.getMessage() for record in caplog.records if "stderr" in record.getMessage()]
+    assert not any("noise-" in message for message in stderr_messages)
+    content = next((tmp_path / "logs" / "jobs").glob("*.log")).read_text(encoding="utf-8")
+    assert "noise-0" in content
+    assert content.rstrip().endswith("returncode=1")
+
+
+@pytest.mark.asyncio
+async def test_iter_stream_lines_splits_chunks_and_bounds_long_lines() -> None:
+    stream = asyncio.StreamReader()
+    stream.feed_data(b"first\r\nsec")
+    stream.feed_data(b"ond\n" + b"x" * 10)
+    stream.feed_eof()
+
+    lines = [line async for line in _iter_stream_lines(stream, max_line_bytes=4)]
+
+    assert lines == ["first", "second", "xxxx", "xxxx", "xx"]
+
+
+def test_rotating_job_log_file_compresses_rolled_over_segments(tmp_path) -> None:
+    log_file = _RotatingJobLogFile(tmp_path / "job.log", max_bytes=10, backup_count=2)
+    for chunk in (b"aaaaaaaa\n", b"bbbbbbbb\n", b"cccccccc\n", b"dddddddd\n"):
+        log_file.write(chunk)
+    log_file.close()
+
+    assert (tmp_path / "job.log").read_bytes() == b"dddddddd\n"
+    assert gzip.decompress((tmp_path / "job.log.1.gz").read_bytes()) == b"cccccccc\n"
+    assert gzip.decompress((tmp_path / "job.log.2.gz").read_bytes()) == b"bbbbbbbb\n"
+    assert not (tmp_path / "job.log.3.gz").exists()
+
+
+@pytest.mark.asyncio
+async def test_process_runner_streams_job_envelope_over_stdin(monkeypatch: pytest.MonkeyPatch, tmp_path) -> None:
+    spawned: dict[str, object] = {}
+
+    async def fake_create_subprocess_exec(*args, **kwargs):
+        spawned["args"] = args
+        spawned["process"] = _FakeProcess()
+        return spawned["process"]
+
+    monkeypatch.setattr(asyncio, "create_subprocess_exec", fake_create_subprocess_exec)
+    monkeypatch.chdir(tmp_path)
+
+    runner = LocalProcessWorkerRunner()
+    job = JobEnvelope(
+        job_type="knowledge.update",
+        correlation_id="user-1",
+        payload={
+            "journal_reference": "2026/02/24",
+            "messages": [{"role": "user", "content": "x" * 200_000}],
+            "requested_by_user_id": "user-1",
+        },
+    )
+
+    await runner.run_job(job)
+
+    assert spawned["args"][-2:] == ("--job-envelope-file", "-")
+    stdin = spawned["process"].stdin
+    assert stdin.closed is True
+    assert JobEnvelope.model_validate_json(bytes(stdin.data)) == job
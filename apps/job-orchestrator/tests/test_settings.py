@@ -50,6 +50,12 @@ def test_settings_defaults_consumer_ack_wait_seconds() -> None:
     assert settings.job_consumer_ack_wait_seconds == 150.0
 
 
+def test_settings_defaults_to_push_consumer_mode() -> None:
+    settings = Settings()
+    assert settings.job_consumer_mode == "push"
+    assert settings.job_consumer_heartbeat_seconds == 30.0
+
+
 def test_settings_normalizes_localhost_knowledge_interface_target() -> None:
     settings = Settings(KNOWLEDGE_INTERFACE_GRPC_TARGET="localhost:50051")
     assert settings.knowledge_interface_grpc_target == "127.0.0.1:50051"
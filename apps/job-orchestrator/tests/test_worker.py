@@ -1,18 +1,21 @@
 from __future__ import annotations
 
 import json
+from datetime import datetime, timedelta, timezone
 from types import SimpleNamespace
 
 import pytest
 
 from app.contracts import JobEnvelope
 from app.orchestrator import JobOrchestrator
+from app.worker.job_registry import RetryBackoff
 
 
 class FakeRepo:
     def __init__(self, inserted: bool = True) -> None:
         self.inserted = inserted
         self.calls: list[tuple[str, str]] = []
+        self.follow_up_payload: dict[str, object] | None = None
 
     async def register_requested(self, job: JobEnvelope) -> bool:
         self.calls.append(("register", job.job_id))
@@ -24,12 +27,16 @@ class FakeRepo:
     async def mark_completed(self, job_id: str) -> None:
         self.calls.append(("completed", job_id))
 
-    async def mark_retrying_failure(self, job_id: str, error_message: str) -> None:
+    async def mark_retrying_failure(self, job_id: str, error_message: str, next_attempt_at: datetime | None = None) -> None:
         self.calls.append(("retrying_failed", job_id))
+        self.next_attempt_at = next_attempt_at
 
     async def mark_terminal_failure(self, job_id: str, error_message: str, terminal_reason: str) -> None:
         self.calls.append(("terminal_failed", f"{job_id}:{terminal_reason}"))
 
+    async def fetch_follow_up_payload(self, job_id: str) -> dict[str, object] | None:
+        return self.follow_up_payload
+
 
 class FakeRunner:
     def __init__(self, should_fail: bool = False) -> None:
@@ -47,12 +54,14 @@ class FakeMsg:
         self.subject = subject
         self.acked = False
         self.nacked = False
+        self.nak_delay: float | None = None
 
     async def ack(self) -> None:
         self.acked = True
 
-    async def nak(self) -> None:
+    async def nak(self, delay: float | None = None) -> None:
         self.nacked = True
+        self.nak_delay = delay
 
 
 def _build_worker(repo: FakeRepo, runner: FakeRunner, publish):
@@ -105,6 +114,100 @@ async def test_worker_marks_completed_for_new_job() -> None:
     ]
 
 
+@pytest.mark.asyncio
+async def test_worker_enqueues_follow_up_job_for_quarantined_items() -> None:
+    published: list[tuple[str, bytes]] = []
+
+    async def publish(subject: str, data: bytes) -> None:
+        published.append((subject, data))
+
+    repo = FakeRepo(inserted=True)
+    follow_up_payload = {**_valid_payload()["payload"], "quarantine": {"source_job_id": "job-1", "extracted_entities": []}}
+    repo.follow_up_payload = follow_up_payload
+    worker = _build_worker(repo, FakeRunner(), publish)
+
+    msg = FakeMsg(_valid_payload())
+    await worker.process_message(msg)
+
+    assert msg.acked is True
+    follow_up = JobEnvelope.model_validate_json(next(data for subject, data in published if subject == "jobs.knowledge.update.requested"))
+    assert follow_up.job_id != "job-1"
+    assert follow_up.correlation_id == "corr-1"
+    assert follow_up.payload == follow_up_payload
+    succeeded = json.loads(published[-1][1])
+    assert succeeded["state"] == "SUCCEEDED"
+    assert follow_up.job_id in succeeded["detail"]
+
+
+@pytest.mark.asyncio
+async def test_worker_runs_claim_checked_job_and_releases_its_payload() -> None:
+    runs: list[JobEnvelope] = []
+    deleted: list[str] = []
+
+    class RecordingRunner:
+        async def run_job(self, job: JobEnvelope) -> None:
+            runs.append(job)
+
+    class FakePayloadRepository:
+        async def delete(self, job_id: str) -> None:
+            deleted.append(job_id)
+
+    async def publish(_: str, __: bytes) -> None:
+        return None
+
+    repo = FakeRepo(inserted=True)
+    worker = JobOrchestrator(
+        repository=repo,
+        runner=RecordingRunner(),
+        events_subject_prefix="jobs.events",
+        dlq_subject="jobs.dlq",
+        max_attempts=3,
+        dlq_raw_message_max_chars=128,
+        publish_event=publish,
+        payload_repository=FakePayloadRepository(),  # type: ignore[arg-type]
+    )
+
+    msg = FakeMsg({**_valid_payload(), "payload": {}, "payload_ref": "sha256-of-payload"})
+    await worker.process_message(msg)
+
+    assert msg.acked is True
+    assert ("completed", "job-1") in repo.calls
+    assert runs[0].payload_ref == "sha256-of-payload"
+    assert deleted == ["job-1"]
+
+
+@pytest.mark.asyncio
+async def test_worker_keeps_claim_checked_payload_of_dead_lettered_job() -> None:
+    published: list[tuple[str, bytes]] = []
+    deleted: list[str] = []
+
+    class FakePayloadRepository:
+        async def delete(self, job_id: str) -> None:
+            deleted.append(job_id)
+
+    async def publish(subject: str, data: bytes) -> None:
+        published.append((subject, data))
+
+    worker = JobOrchestrator(
+        repository=FakeRepo(inserted=True),
+        runner=FakeRunner(should_fail=True),
+        events_subject_prefix="jobs.events",
+        dlq_subject="jobs.dlq",
+        max_attempts=3,
+        dlq_raw_message_max_chars=4096,
+        publish_event=publish,
+        payload_repository=FakePayloadRepository(),  # type: ignore[arg-type]
+    )
+
+    msg = FakeMsg({**_valid_payload(), "payload": {}, "payload_ref": "sha256-of-payload"}, delivery_attempt=3)
+    await worker.process_message(msg)
+
+    assert msg.acked is True
+    assert deleted == []
+    dead_letter = json.loads(next(data for subject, data in published if subject == "jobs.dlq"))
+    assert JobEnvelope.model_validate_json(dead_letter["raw_message"]).payload_ref == "sha256-of-payload"
+
+
 @pytest.mark.asyncio
 async def test_worker_retries_invalid_envelope_before_dlq() -> None:
     events: list[str] = []
@@ -196,6 +299,59 @@ async def test_worker_naks_on_retryable_failure() -> None:
     assert events == ["jobs.status.job-1", "jobs.status.job-1", "jobs.status.job-1"]
 
 
+@pytest.mark.asyncio
+async def test_worker_schedules_retry_with_exponential_backoff() -> None:
+    published: list[bytes] = []
+
+    async def publish(_: str, data: bytes) -> None:
+        published.append(data)
+
+    repo = FakeRepo(inserted=True)
+    worker = _build_worker(repo, FakeRunner(should_fail=True), publish)
+    msg = FakeMsg(_valid_payload(), delivery_attempt=2)
+
+    before = datetime.now(timezone.utc)
+    await worker.process_message(msg)
+
+    # knowledge.update backs off from 30s, so the second failed attempt waits 60s plus up to 20% jitter.
+    assert msg.nak_delay is not None
+    assert 60.0 <= msg.nak_delay <= 72.0
+    assert repo.next_attempt_at is not None
+    assert repo.next_attempt_at - before >= timedelta(seconds=msg.nak_delay)
+    retrying = json.loads(published[-1])
+    assert retrying["state"] == "RETRYING"
+    assert datetime.fromisoformat(retrying["next_attempt_at"]) == repo.next_attempt_at
+
+
+@pytest.mark.asyncio
+async def test_worker_caps_retry_delay_for_unregistered_job_types() -> None:
+    async def publish(_: str, __: bytes) -> None:
+        return None
+
+    orchestrator = JobOrchestrator(
+        repository=FakeRepo(),
+        runner=FakeRunner(),
+        events_subject_prefix="jobs.events",
+        dlq_subject="jobs.dlq",
+        max_attempts=10,
+        dlq_raw_message_max_chars=128,
+        publish_event=publish,
+        retry_backoff=RetryBackoff(base_delay_seconds=5.0, max_delay_seconds=20.0),
+    )
+
+    assert 5.0 <= orchestrator._retry_delay_seconds("report.render", 1) <= 6.0
+    assert 20.0 <= orchestrator._retry_delay_seconds("report.render", 6) <= 24.0
+    assert JobOrchestrator(
+        repository=FakeRepo(),
+        runner=FakeRunner(),
+        events_subject_prefix="jobs.events",
+        dlq_subject="jobs.dlq",
+        max_attempts=10,
+        dlq_raw_message_max_chars=128,
+        publish_event=publish,
+    )._retry_delay_seconds("report.render", 3) == 0.0
+
+
 @pytest.mark.asyncio
 async def test_worker_dlqs_when_max_attempts_reached() -> None:
     events: list[str] = []